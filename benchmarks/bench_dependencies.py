@@ -0,0 +1,93 @@
+"""
+Benchmark of `Workflow._get_affected_atoms` on 5k-atom DAGs against the previous
+scanning traversal.
+
+The previous traversal found the consumers of each dequeued atom by scanning the
+`dependencies` of every atom in the workflow, which is O(V*E) per widget change.
+The workflow now reads consumers and producers from its adjacency index. Run with:
+
+    python benchmarks/bench_dependencies.py
+"""
+
+import logging
+import random
+import time
+
+from preswald.interfaces.workflow import Workflow
+
+
+def scan_affected_atoms(workflow: Workflow, changed_atoms: set[str]) -> set[str]:
+    """The traversal `_get_affected_atoms` used before the adjacency index."""
+    affected = set()
+    queue = list(changed_atoms)
+    queued = set(queue)
+
+    while queue:
+        current = queue.pop()
+        if current in affected:
+            continue
+        affected.add(current)
+
+        for atom_name, atom in workflow.atoms.items():
+            if current in atom.dependencies and atom_name not in queued:
+                queue.append(atom_name)
+                queued.add(atom_name)
+
+        for dep in workflow.atoms[current].dependencies:
+            if dep not in queued:
+                queue.append(dep)
+                queued.add(dep)
+
+    return affected
+
+
+def build_workflow(groups: int, atoms_per_group: int, seed: int = 0) -> Workflow:
+    """
+    A dashboard-shaped DAG: each group is a widget feeding `atoms_per_group` atoms,
+    each of which reads one to three earlier atoms of its group.
+    """
+    rng = random.Random(seed)
+    workflow = Workflow()
+    for group in range(groups):
+        names = [f"widget_{group}"]
+        workflow.atom(name=names[0], dependencies=[])(lambda: 0)
+        for i in range(atoms_per_group):
+            name = f"atom_{group}_{i}"
+            deps = rng.sample(names[-10:], min(len(names[-10:]), rng.randint(1, 3)))
+            workflow.atom(name=name, dependencies=deps)(lambda *args: 0)
+            names.append(name)
+    return workflow
+
+
+def best_of(func, repeat: int = 5) -> float:
+    """Fastest of `repeat` calls, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    logging.disable(logging.INFO)
+    shapes = {
+        "1 group x 5000 atoms": (1, 4999),
+        "50 groups x 100 atoms": (50, 99),
+        "500 groups x 10 atoms": (500, 9),
+    }
+
+    print(f"{'DAG':<26}{'affected':>10}{'scan':>12}{'index':>12}")
+    for label, (groups, atoms_per_group) in shapes.items():
+        workflow = build_workflow(groups, atoms_per_group)
+        changed = {"widget_0"}
+        expected = scan_affected_atoms(workflow, changed)
+        assert workflow._get_affected_atoms(changed) == expected
+
+        scanned = best_of(lambda: scan_affected_atoms(workflow, changed), repeat=1 if groups == 1 else 5)
+        indexed = best_of(lambda: workflow._get_affected_atoms(changed))
+        print(f"{label:<26}{len(expected):>10}{scanned:>10.2f}ms{indexed:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Microbenchmarks of atom input fingerprinting against the previous pickle path.
+
+The previous `AtomCache._hash_value` pickled every dependency value and hashed
+the bytes. Run with:
+
+    python benchmarks/bench_fingerprint.py
+"""
+
+import hashlib
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from preswald.interfaces.fingerprint import fingerprint
+
+
+def pickle_hash(value) -> str:
+    return hashlib.sha256(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+def best_of(func, repeat: int = 5) -> float:
+    """Fastest of `repeat` calls, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    rows = 1_000_000
+    df = pd.DataFrame(
+        {
+            "x": rng.normal(size=rows),
+            "y": rng.integers(0, 1000, rows),
+            "category": rng.choice(["a", "b", "c", "d"], rows),
+        }
+    )
+    cases = {
+        "DataFrame 1M rows": df,
+        "ndarray 10M float64": rng.normal(size=10_000_000),
+        "str 10 MB": "x" * 10_000_000,
+        "dict of 10k scalars": {f"key{i}": i * 0.5 for i in range(10_000)},
+        "plotly scatter 50k points": px.scatter(df.head(50_000), x="x", y="y"),
+    }
+
+    print(f"{'value':<28}{'pickle':>12}{'fingerprint':>14}{'versioned':>12}")
+    for name, value in cases.items():
+        pickled = best_of(lambda: pickle_hash(value))
+        fingerprinted = best_of(lambda: fingerprint(value))
+        # the workflow passes a version token that only changes when the value does
+        fingerprint(value, version=1)
+        versioned = best_of(lambda: fingerprint(value, version=1))
+        print(f"{name:<28}{pickled:>10.2f}ms{fingerprinted:>12.2f}ms{versioned:>10.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
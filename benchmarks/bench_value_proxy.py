@@ -0,0 +1,98 @@
+"""
+Microbenchmark of per-access overhead of `TrackedValue` and `ComponentReturn`
+against the previous `TrackedValue`.
+
+The previous `TrackedValue` had no `__slots__`, logged at INFO on every
+construction and logged a warning on every read outside an atom. Reads are
+timed outside an atom, which is the common case in scripts, and inside one,
+where every read registers a dependency. Run with:
+
+    python benchmarks/bench_value_proxy.py
+"""
+
+import io
+import logging
+import timeit
+
+from preswald.interfaces.component_return import ComponentReturn
+from preswald.interfaces.dependency_tracker import pop_context, push_context
+from preswald.interfaces.tracked_value import TrackedValue
+from preswald.interfaces.workflow import AtomContext, Workflow
+
+legacy_logger = logging.getLogger("bench.legacy")
+
+
+def legacy_track_dependency(dep_name: str, ctx=None):
+    if ctx:
+        legacy_logger.debug(f"[DAG] Registered dynamic dependency {{atom={ctx.atom_name}, dep={dep_name}}}")
+        ctx.workflow.register_dependency(ctx.atom_name, dep_name)
+    else:
+        legacy_logger.warning(f"[DAG] Dependency tracking failed (no context) {{dep={dep_name}}}")
+
+
+class LegacyTrackedValue:
+    """The previous `TrackedValue`, reduced to the members timed here."""
+
+    def __init__(self, value, atom_name):
+        self._value = value
+        self._atom_name = atom_name
+        if legacy_logger.isEnabledFor(logging.DEBUG):
+            legacy_logger.debug(f"[Dependency Tracking] Created TrackedValue {self._value=} {self._atom_name=}")
+        else:
+            legacy_logger.info(f"[Dependency Tracking] Created TrackedValue {self._atom_name=}")
+
+    @property
+    def value(self):
+        legacy_track_dependency(self._atom_name)
+        return self._value
+
+    def __gt__(self, other):
+        legacy_track_dependency(self._atom_name)
+        return self.value > other
+
+
+def per_call(stmt, number: int = 200_000, **namespace) -> float:
+    """Fastest of five runs, in microseconds per call."""
+    return min(timeit.repeat(stmt, globals=namespace, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    # log at INFO like a server would, formatting records into memory
+    logging.basicConfig(level=logging.INFO, stream=io.StringIO())
+    logging.getLogger("preswald").setLevel(logging.WARNING)
+
+    legacy = LegacyTrackedValue(5, "producer")
+    tracked = TrackedValue(5, "producer")
+    component = ComponentReturn(5, {"id": "slider-1"})
+
+    print(f"{'operation':<34}{'previous':>12}{'current':>12}")
+    rows = [
+        ("construct TrackedValue", "LegacyTrackedValue(5, 'a')", "TrackedValue(5, 'a')"),
+        ("read .value outside an atom", "legacy.value", "tracked.value"),
+        ("compare (> 3) outside an atom", "legacy > 3", "tracked > 3"),
+        ("add (+ 1) outside an atom", "legacy.value + 1", "tracked + 1"),
+        ("ComponentReturn add (+ 1)", None, "component + 1"),
+    ]
+    namespace = {
+        "LegacyTrackedValue": LegacyTrackedValue,
+        "TrackedValue": TrackedValue,
+        "legacy": legacy,
+        "tracked": tracked,
+        "component": component,
+    }
+    for label, before, after in rows:
+        previous = f"{per_call(before, **namespace):>10.3f}us" if before else f"{'-':>12}"
+        print(f"{label:<34}{previous}{per_call(after, **namespace):>10.3f}us")
+
+    workflow = Workflow()
+    workflow.atom(name="producer", dependencies=[])(lambda: 5)
+    workflow.atom(name="consumer", dependencies=[])(lambda: 0)
+    token = push_context(AtomContext(workflow, "consumer"))
+    try:
+        print(f"{'read .value inside an atom':<34}{'-':>12}{per_call('tracked.value', **namespace):>10.3f}us")
+    finally:
+        pop_context(token)
+
+
+if __name__ == "__main__":
+    main()
@@ -376,6 +376,11 @@ const MemoizedComponent = memo(
   },
   (prevProps, nextProps) => {
     // Custom comparison function for memoization
+    const prevRevision = prevProps.component.revision;
+    if (prevRevision && prevRevision === nextProps.component.revision) {
+      // Same content fingerprint as the last render
+      return prevProps.index === nextProps.index;
+    }
     return (
       !prevProps.component.shouldRender &&
       prevProps.component.value === nextProps.component.value &&
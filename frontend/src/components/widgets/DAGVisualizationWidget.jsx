@@ -69,10 +69,25 @@ const getStatusStyles = (status) => {
   };
 };
 
+const NodeLabel = ({ data }) => {
+  const lookups = (data.cache_hits || 0) + (data.cache_misses || 0);
+  return (
+    <div>
+      <div>{data.name}</div>
+      {lookups > 0 && (
+        <div className="text-[10px] font-normal text-gray-500">
+          cache {data.cache_hits || 0} hit / {data.cache_misses || 0} miss
+        </div>
+      )}
+    </div>
+  );
+};
+
 const DAGVisualizationWidget = ({ id, data: rawData, error, className = '' }) => {
   const [nodes, setNodes] = useNodesState([]);
   const [edges, setEdges] = useEdgesState([]);
   const [isLoading, setIsLoading] = useState(true);
+  const caches = rawData?.caches || [];
 
   useEffect(() => {
     if (rawData?.data) {
@@ -84,7 +99,7 @@ const DAGVisualizationWidget = ({ id, data: rawData, error, className = '' }) =>
         id: data.name,
         position: positions[index] || { x: index * 150, y: index * 60 },
         data: {
-          label: data.name,
+          label: <NodeLabel data={data} />,
           status: data.status,
         },
         style: getStatusStyles(data.status),
@@ -158,6 +173,18 @@ const DAGVisualizationWidget = ({ id, data: rawData, error, className = '' }) =>
           className="bg-white"
         />
       </div>
+      {caches.length > 0 && (
+        <div className="border-t px-4 py-2 text-xs text-gray-600">
+          {caches.map((cache) => (
+            <div key={cache.name} className="flex justify-between gap-4">
+              <span className="truncate font-mono">{cache.name}</span>
+              <span className="whitespace-nowrap">
+                {cache.hits} hit / {cache.misses} miss · {cache.entries} cached
+              </span>
+            </div>
+          ))}
+        </div>
+      )}
     </Card>
   );
 };
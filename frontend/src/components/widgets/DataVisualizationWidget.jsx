@@ -15,6 +15,7 @@ import { FEATURES } from '../../config/features';
 import {
   debounce,
   decompressData,
+  isArrayLike,
   processDataInChunks,
   sampleData,
 } from '../../utils/dataProcessing';
@@ -80,7 +81,7 @@ const DataVisualizationWidget = ({ id, data: rawData, content, error, className
 
         // Process numerical arrays for optimization
         ['x', 'y', 'lat', 'lon'].forEach((key) => {
-          if (Array.isArray(trace[key])) {
+          if (isArrayLike(trace[key])) {
             processedTrace[key] = sampleData(trace[key], threshold);
           }
         });
@@ -89,7 +90,7 @@ const DataVisualizationWidget = ({ id, data: rawData, content, error, className
         if (trace.marker) {
           processedTrace.marker = { ...trace.marker };
           ['size', 'color'].forEach((key) => {
-            if (Array.isArray(trace.marker[key])) {
+            if (isArrayLike(trace.marker[key])) {
               processedTrace.marker[key] = sampleData(trace.marker[key], threshold);
             }
           });
@@ -122,7 +123,7 @@ const DataVisualizationWidget = ({ id, data: rawData, content, error, className
 
         traces.forEach((trace) => {
           ['x', 'y', 'lat', 'lon'].forEach((key) => {
-            if (Array.isArray(trace[key])) {
+            if (isArrayLike(trace[key])) {
               totalPoints += trace[key].length;
             }
           });
@@ -139,7 +140,7 @@ const DataVisualizationWidget = ({ id, data: rawData, content, error, className
           }));
 
           processedPoints += chunk.reduce((acc, trace) => {
-            return acc + (Array.isArray(trace.x) ? trace.x.length : 0);
+            return acc + (isArrayLike(trace.x) ? trace.x.length : 0);
           }, 0);
 
           setLoadedDataPercentage((processedPoints / totalPoints) * 100);
@@ -14,8 +14,11 @@ export const decompressData = (compressedData) => {
 };
 
 // Utility function to sample data points with smart sampling
+// Arrays and the TypedArrays numeric arrays are decoded to from binary frames
+export const isArrayLike = (value) => Array.isArray(value) || ArrayBuffer.isView(value);
+
 export const sampleData = (data, threshold) => {
-  if (!Array.isArray(data) || data.length <= threshold) return data;
+  if (!isArrayLike(data) || data.length <= threshold) return data;
 
   // Use LTTB (Largest-Triangle-Three-Buckets) algorithm for time series
   if (typeof data[0] === 'number') {
@@ -1,5 +1,6 @@
 import { createWorker } from '../backend/service';
-import { decode } from '@msgpack/msgpack';
+import { decode, ExtensionCodec } from '@msgpack/msgpack';
+import pako from 'pako';
 
 /**
  * Message types used throughout the Preswald communication system
@@ -9,6 +10,8 @@ const MessageType = {
   COMPONENT_RENDER: 'component_render',
   COMPONENT_UPDATE: 'component_update',
   COMPONENTS: 'components',
+  LAYOUT_PATCH: 'layout_patch',
+  LAYOUT_RESYNC: 'layout_resync',
   ERROR: 'error',
   HEARTBEAT: 'heartbeat',
   BULK_UPDATE: 'bulk_update',
@@ -21,6 +24,78 @@ const MessageType = {
   CONFIG: 'config'
 };
 
+/**
+ * Version of the layout patch protocol this client understands, sent when connecting
+ */
+const LAYOUT_PROTOCOL_VERSION = 1;
+
+/**
+ * msgpack extension type of numeric arrays in binary frames, decoded to TypedArrays
+ */
+const TYPED_ARRAY_EXT_TYPE = 1;
+
+const TYPED_ARRAYS = {
+  f8: Float64Array,
+  f4: Float32Array,
+  i4: Int32Array,
+  u4: Uint32Array,
+  i2: Int16Array,
+  u2: Uint16Array,
+  i1: Int8Array,
+  u1: Uint8Array,
+};
+
+/**
+ * Decode a typed array extension: a two byte dtype code, the number of dimensions,
+ * each dimension as a little-endian uint32, then the little-endian array data.
+ * Arrays with more than one dimension become nested arrays of TypedArray rows.
+ */
+function decodeTypedArray(payload) {
+  const view = new DataView(payload.buffer, payload.byteOffset, payload.byteLength);
+  const TypedArray = TYPED_ARRAYS[String.fromCharCode(payload[0], payload[1])];
+  const ndim = payload[2];
+  const shape = [];
+  for (let i = 0; i < ndim; i++) {
+    shape.push(view.getUint32(3 + 4 * i, true));
+  }
+
+  // copy the data so it starts on an aligned offset of its own buffer
+  const array = new TypedArray(payload.slice(3 + 4 * ndim).buffer);
+
+  const reshape = (offset, dim) => {
+    if (dim === ndim - 1) {
+      return array.subarray(offset, offset + shape[dim]);
+    }
+    const stride = shape.slice(dim + 1).reduce((a, b) => a * b, 1);
+    return Array.from({ length: shape[dim] }, (_, i) => reshape(offset + i * stride, dim + 1));
+  };
+  return reshape(0, 0);
+}
+
+const wireExtensionCodec = new ExtensionCodec();
+wireExtensionCodec.register({
+  type: TYPED_ARRAY_EXT_TYPE,
+  encode: () => null,
+  decode: decodeTypedArray,
+});
+
+// first byte of zlib streams; msgpack maps never start with it
+const ZLIB_HEADER_BYTE = 0x78;
+const JSON_OBJECT_START = 0x7b;
+
+/**
+ * Decode a binary frame: a msgpack message, or a zlib-compressed msgpack or JSON message
+ */
+function decodeBinaryFrame(bytes) {
+  if (bytes[0] === ZLIB_HEADER_BYTE) {
+    bytes = pako.inflate(bytes);
+    if (bytes[0] === JSON_OBJECT_START) {
+      return JSON.parse(new TextDecoder('utf-8').decode(bytes));
+    }
+  }
+  return decode(bytes, { extensionCodec: wireExtensionCodec });
+}
+
 /**
  * Priority:
  * 1. URL parameter: ?server=<server_url> or ?preswald_server=<server_url>
@@ -1058,6 +1133,9 @@ class BaseCommunicationClient extends IPreswaldCommunicator {
     this.lastActivity = 0;
     this.connections = [];
 
+    // Last full layout received, kept to apply versioned layout patches on top of
+    this.layout = { version: null, components: new Map() };
+
     // Initialize ComponentStateManager for enhanced bulk operations
     this.stateManager = new ComponentStateManager({
       maxBulkSize: 1000,
@@ -1118,6 +1196,68 @@ class BaseCommunicationClient extends IPreswaldCommunicator {
     });
   }
 
+  /**
+   * Remember a full layout (`components` or `errors:result` message) and its version
+   */
+  _recordLayout(data) {
+    const components = new Map();
+    (data.components?.rows || []).forEach((row) => {
+      row.forEach((component) => {
+        if (component?.id) {
+          components.set(component.id, component);
+        }
+      });
+    });
+    this.layout = { version: data.version ?? null, components };
+  }
+
+  /**
+   * Apply a `layout_patch` message to the last layout.
+   *
+   * Returns an equivalent `components` message carrying the full rows, where
+   * unchanged components keep their previous objects so memoized renders are
+   * skipped. Returns null and requests a full snapshot if the patch does not
+   * apply to the layout we have.
+   */
+  _applyLayoutPatch(data) {
+    if (this.layout.version === null || data.base_version !== this.layout.version) {
+      console.warn(
+        `[${this.constructor.name}] Layout patch ${data.base_version}->${data.version} does not apply to version ${this.layout.version}, resyncing`
+      );
+      this._requestLayoutResync();
+      return null;
+    }
+
+    const components = new Map(this.layout.components);
+    (data.removed || []).forEach((componentId) => components.delete(componentId));
+    Object.entries(data.components || {}).forEach(([componentId, component]) => {
+      components.set(componentId, component);
+    });
+
+    const rows = [];
+    for (const rowIds of data.rows || []) {
+      const row = [];
+      for (const componentId of rowIds) {
+        const component = components.get(componentId);
+        if (!component) {
+          console.warn(`[${this.constructor.name}] Layout patch references unknown component ${componentId}, resyncing`);
+          this._requestLayoutResync();
+          return null;
+        }
+        row.push(component);
+      }
+      rows.push(row);
+    }
+
+    this.layout = { version: data.version, components };
+    return { type: MessageType.COMPONENTS, errors: [], components: { rows }, version: data.version };
+  }
+
+  /**
+   * Ask the server for a full layout snapshot; implemented by transports supporting patches
+   */
+  _requestLayoutResync() {}
+
   /**
    * Enhanced state management with ComponentStateManager
    */
@@ -1396,7 +1536,7 @@ class WebSocketClient extends BaseCommunicationClient {
 
       const wsProtocol = serverUrl.startsWith('https:') ? 'wss:' : 'ws:';
       const serverHost = serverUrl.replace(/^https?:\/\//, '');
-      const wsUrl = `${wsProtocol}//${serverHost}/ws/${this.clientId}`;
+      const wsUrl = `${wsProtocol}//${serverHost}/ws/${this.clientId}?layout=${LAYOUT_PROTOCOL_VERSION}&encoding=msgpack&compression=zlib`;
 
       console.log(`[WebSocket] Connecting to: ${wsUrl} (resolved from: ${serverUrl})`);
 
@@ -1450,9 +1590,9 @@ class WebSocketClient extends BaseCommunicationClient {
 
         this.socket.onmessage = async (event) => {
           try {
+            let data;
             if (typeof event.data === 'string') {
               // Use MessageEncoder for consistent parsing with fallback to legacy
-              let data;
               try {
                 data = MessageEncoder.decode(event.data);
                 // If it's a new format message, extract payload
@@ -1464,107 +1604,15 @@ class WebSocketClient extends BaseCommunicationClient {
                 console.warn('[WebSocket] Using legacy JSON parsing:', decodeError.message);
                 data = JSON.parse(event.data);
               }
-
-              console.log('[WebSocket] Message received:', {
-                ...data,
-                timestamp: new Date().toISOString(),
-              });
-
-              switch (data.type) {
-                case 'initial_state':
-                  // Use ComponentStateManager for bulk initial state loading
-                  if (data.states) {
-                    this.stateManager.bulkSetState(data.states);
-                    console.log('[WebSocket] Initial states loaded via ComponentStateManager:', Object.keys(data.states).length, 'components');
-                  }
-                  // Legacy compatibility
-                  this.componentStates = { ...data.states };
-                  break;
-
-                case 'state_update':
-                  if (data.component_id) {
-                    // Use ComponentStateManager for individual updates
-                    this.stateManager.setState(data.component_id, data.value);
-                    console.log('[WebSocket] Component state updated:', {
-                      componentId: data.component_id,
-                      value: data.value,
-                    });
-                  }
-                  break;
-
-                case 'bulk_update':
-                  if (data.states) {
-                    // Handle bulk updates efficiently
-                    const bulkResult = this.stateManager.bulkSetState(data.states);
-                    console.log('[WebSocket] Bulk state update processed:', {
-                      totalCount: bulkResult.totalCount,
-                      changedCount: bulkResult.changedCount,
-                      duration: bulkResult.duration
-                    });
-                  }
-                  break;
-
-                case 'bulk_update_ack':
-                  // Handle server acknowledgment of bulk updates
-                  console.log('[WebSocket] Bulk update acknowledged by server:', {
-                    totalCount: data.total_count,
-                    changedCount: data.changed_count,
-                    processingTime: data.processing_time,
-                    validationErrors: data.validation_errors,
-                    success: data.success
-                  });
-
-                  // Update connection metrics with server performance data
-                  if (this.metrics) {
-                    this.metrics.lastLatency = data.processing_time * 1000; // Convert to ms
-                    this.metrics.lastBulkProcessed = data.total_count;
-                    this.metrics.lastBulkChanged = data.changed_count;
-                    this.metrics.bulkUpdatesProcessed++;
-                    this.metrics.totalBulkChanges += data.changed_count;
-
-                    // Calculate rolling average of bulk processing times
-                    const currentAvg = this.metrics.avgBulkProcessingTime;
-                    const count = this.metrics.bulkUpdatesProcessed;
-                    this.metrics.avgBulkProcessingTime = ((currentAvg * (count - 1)) + (data.processing_time * 1000)) / count;
-                  }
-                  break;
-
-                case 'components':
-                  if (data.components?.rows) {
-                    // Extract state updates from component data for bulk processing
-                    const stateUpdates = new Map();
-                    data.components.rows.forEach((row) => {
-                      row.forEach((component) => {
-                        if (component.id && 'value' in component) {
-                          stateUpdates.set(component.id, component.value);
-                        }
-                      });
-                    });
-
-                    if (stateUpdates.size > 0) {
-                      const bulkResult = this.stateManager.bulkSetState(stateUpdates);
-                      console.log('[WebSocket] Component states bulk updated:', {
-                        totalCount: bulkResult.totalCount,
-                        changedCount: bulkResult.changedCount,
-                        duration: bulkResult.duration
-                      });
-                    }
-                  }
-                  break;
-
-                case 'connections_update':
-                  this.connections = data.connections || [];
-                  console.log('[WebSocket] Connections updated:', this.connections);
-                  break;
-              }
-
-              this._notifySubscribers(data);
             } else if (event.data instanceof Blob) {
+              // msgpack frames: image updates, and every message for clients that
+              // asked for `encoding=msgpack`, with numeric arrays as TypedArrays;
+              // messages above the server's size threshold arrive zlib-compressed
               const buffer = await event.data.arrayBuffer();
-              const decoded = decode(new Uint8Array(buffer));
+              data = decodeBinaryFrame(new Uint8Array(buffer));
 
-              if (decoded?.type === 'image_update' && decoded.format === 'png') {
-                const { component_id, data: binaryData, label } = decoded;
+              if (data?.type === 'image_update' && data.format === 'png') {
+                const { component_id, data: binaryData, label } = data;
 
                 // Convert image data (Uint8Array) to base64
                 const base64 = `data:image/png;base64,${btoa(
@@ -1582,12 +1630,116 @@ class WebSocketClient extends BaseCommunicationClient {
                   value: base64,
                   label,
                 });
-              } else {
-                console.warn('[WebSocket] Unknown binary message format:', decoded);
+                return;
               }
             } else {
               console.warn('[WebSocket] Unrecognized message format:', event.data);
+              return;
+            }
+
+            console.log('[WebSocket] Message received:', {
+              ...data,
+              timestamp: new Date().toISOString(),
+            });
+
+            if (data.type === MessageType.LAYOUT_PATCH) {
+              data = this._applyLayoutPatch(data);
+              if (!data) {
+                return;
+              }
+            } else if (data.type === MessageType.COMPONENTS || data.type === MessageType.ERRORS_RESULT) {
+              this._recordLayout(data);
             }
+
+            switch (data.type) {
+              case 'initial_state':
+                // Use ComponentStateManager for bulk initial state loading
+                if (data.states) {
+                  this.stateManager.bulkSetState(data.states);
+                  console.log('[WebSocket] Initial states loaded via ComponentStateManager:', Object.keys(data.states).length, 'components');
+                }
+                // Legacy compatibility
+                this.componentStates = { ...data.states };
+                break;
+
+              case 'state_update':
+                if (data.component_id) {
+                  // Use ComponentStateManager for individual updates
+                  this.stateManager.setState(data.component_id, data.value);
+                  console.log('[WebSocket] Component state updated:', {
+                    componentId: data.component_id,
+                    value: data.value,
+                  });
+                }
+                break;
+
+              case 'bulk_update':
+                if (data.states) {
+                  // Handle bulk updates efficiently
+                  const bulkResult = this.stateManager.bulkSetState(data.states);
+                  console.log('[WebSocket] Bulk state update processed:', {
+                    totalCount: bulkResult.totalCount,
+                    changedCount: bulkResult.changedCount,
+                    duration: bulkResult.duration
+                  });
+                }
+                break;
+
+              case 'bulk_update_ack':
+                // Handle server acknowledgment of bulk updates
+                console.log('[WebSocket] Bulk update acknowledged by server:', {
+                  totalCount: data.total_count,
+                  changedCount: data.changed_count,
+                  processingTime: data.processing_time,
+                  validationErrors: data.validation_errors,
+                  success: data.success
+                });
+
+                // Update connection metrics with server performance data
+                if (this.metrics) {
+                  this.metrics.lastLatency = data.processing_time * 1000; // Convert to ms
+                  this.metrics.lastBulkProcessed = data.total_count;
+                  this.metrics.lastBulkChanged = data.changed_count;
+                  this.metrics.bulkUpdatesProcessed++;
+                  this.metrics.totalBulkChanges += data.changed_count;
+
+                  // Calculate rolling average of bulk processing times
+                  const currentAvg = this.metrics.avgBulkProcessingTime;
+                  const count = this.metrics.bulkUpdatesProcessed;
+                  this.metrics.avgBulkProcessingTime = ((currentAvg * (count - 1)) + (data.processing_time * 1000)) / count;
+                }
+                break;
+
+              case 'components':
+                if (data.components?.rows) {
+                  // Extract state updates from component data for bulk processing
+                  const stateUpdates = new Map();
+                  data.components.rows.forEach((row) => {
+                    row.forEach((component) => {
+                      if (component.id && 'value' in component) {
+                        stateUpdates.set(component.id, component.value);
+                      }
+                    });
+                  });
+
+                  if (stateUpdates.size > 0) {
+                    const bulkResult = this.stateManager.bulkSetState(stateUpdates);
+                    console.log('[WebSocket] Component states bulk updated:', {
+                      totalCount: bulkResult.totalCount,
+                      changedCount: bulkResult.changedCount,
+                      duration: bulkResult.duration
+                    });
+                  }
+                }
+                break;
+
+              case 'connections_update':
+                this.connections = data.connections || [];
+                console.log('[WebSocket] Connections updated:', this.connections);
+                break;
+            }
+
+            this._notifySubscribers(data);
           } catch (error) {
             console.error('[WebSocket] Error processing message:', error);
             this._handleError(error, 'Message processing');
@@ -1648,6 +1800,13 @@ class WebSocketClient extends BaseCommunicationClient {
 
   // subscribe, _notifySubscribers, getComponentState are inherited from BaseCommunicationClient
 
+  _requestLayoutResync() {
+    this.layout = { version: null, components: new Map() };
+    if (this.socket && this.socket.readyState === WebSocket.OPEN) {
+      this._sendImmediateMessage({ type: MessageType.LAYOUT_RESYNC });
+    }
+  }
+
   async updateComponentState(componentId, value) {
     if (!this.socket || this.socket.readyState !== WebSocket.OPEN) {
       this.pendingUpdates[componentId] = value;
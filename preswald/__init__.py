@@ -13,4 +13,4 @@ __all__ = _interfaces.__all__
 # Lazy getter to avoid circular import at startup
 def get_workflow():
     from preswald.engine.service import PreswaldService
-    return PreswaldService.get_instance()._workflow
+    return PreswaldService.get_instance().get_workflow()
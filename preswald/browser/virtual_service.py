@@ -37,8 +37,14 @@ class VirtualWebSocket:
         console.log(f"[Communication] is browser mode: {self.is_browser_mode}")
 
     async def send_json(self, data: dict[str, Any]):
+        """Sends a JSON-serializable dictionary to the JavaScript frontend."""
+        import json
+
+        await self.send_text(json.dumps(data))
+
+    async def send_text(self, text: str):
         """
-        Sends a JSON-serializable dictionary to the JavaScript frontend.
+        Sends a JSON document to the JavaScript frontend.
 
         Uses postMessage or handlePythonMessage depending on the environment.
         Logs only a summary of the data payload when debug logging is enabled.
@@ -53,18 +59,12 @@ class VirtualWebSocket:
         debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
         try:
-            import json
-
             from js import JSON
 
-            json_str = json.dumps(data)
-            js_data = JSON.parse(json_str)
+            js_data = JSON.parse(text)
 
             if debug_enabled:
-                summary = {
-                    "keys": list(data.keys()),
-                    "types": {k: type(v).__name__ for k, v in data.items()},
-                }
+                summary = {"length": len(text)}
 
             if self.is_browser_mode:
                 from js import self as js_self  # type: ignore
@@ -7,18 +7,19 @@ from threading import Lock
 from typing import Any, Callable, Dict, Optional
 from contextlib import contextmanager
 
+from preswald.engine.executor import get_execution_backend
 from preswald.engine.runner import ScriptRunner
+from preswald.engine.session import Session, get_current_session
 from preswald.engine.utils import (
-    RenderBuffer,
-    clean_nan_values,
-    compress_data,
-    optimize_plotly_data,
+    WireFormat,
+    to_serializable,
 )
 from preswald.interfaces.workflow import Workflow, Atom
 from preswald.interfaces.component_return import ComponentReturn
 from preswald.interfaces.render.error_registry import get_errors, clear_errors
+from preswald.utils import read_compression_config
 from .managers.data import DataManager
-from .managers.layout import LayoutManager
+from .managers.layout import LAYOUT_PROTOCOL_VERSION
 
 
 logger = logging.getLogger(__name__)
@@ -28,11 +29,17 @@ class BasePreswaldService:
     """
     Abstract base class for shared PreswaldService logic.
     Manages component states, diffing, and render buffer.
+
+    Workflow, layout, render buffer and widget state are owned by a `Session`
+    per client. Accessors such as `get_workflow()` resolve the session that is
+    active in the current context and fall back to a default session for code
+    running outside any client (e.g. CLI export).
     """
 
     _not_initialized_msg = "Base service not initialized."
 
     def __init__(self):
+        # Shared, read-only defaults for widget state. Sessions layer their own values on top.
         self._component_states: dict[str, Any] = {}
         self._lock = Lock()
 
@@ -42,18 +49,47 @@ class BasePreswaldService:
         # Initialize service state
         self._script_path: str | None = None
         self._is_shutting_down: bool = False
-        self._render_buffer = RenderBuffer()
-
-        # DAG workflow engine
-        self._workflow = Workflow(service=self)
-        self._current_atom: Optional[str] = None
-        self._reactivity_enabled = True
 
         # Initialize session tracking
         self.script_runners: dict[str, ScriptRunner] = {}
+        self.sessions: dict[str, Session] = {}
+        self._wire_formats: dict[str, WireFormat] = {}  # client ID -> how its messages are encoded
+        self._default_session = Session("default", service=self, shared_states=self._component_states)
+
+    @property
+    def session(self) -> Session:
+        """The session active in the current context, or the default session."""
+        return get_current_session() or self._default_session
 
-        # Layout management
-        self._layout_manager = LayoutManager()
+    @property
+    def _workflow(self) -> Workflow:
+        return self.session.workflow
+
+    @property
+    def _layout_manager(self):
+        return self.session.layout_manager
+
+    @property
+    def _render_buffer(self):
+        return self.session.render_buffer
+
+    @property
+    def _current_atom(self) -> Optional[str]:
+        return self.session.current_atom
+
+    def create_session(self, session_id: str) -> Session:
+        """Create (or replace) the isolated session for a client."""
+        if previous := self.sessions.get(session_id):
+            previous.close()
+        session = Session(session_id, service=self, shared_states=self._component_states)
+        self.sessions[session_id] = session
+        logger.info(f"[Session] Created session {session_id=}")
+        return session
+
+    def close_session(self, session_id: str):
+        """Drop a client's session along with its DAG and layout."""
+        if session := self.sessions.pop(session_id, None):
+            session.close()
 
     @contextmanager
     def active_atom(self, atom_name: str):
@@ -69,12 +105,27 @@ class BasePreswaldService:
             atom_name (str): The name of the atom that is being executed.
         """
 
-        previous_atom = self._current_atom
-        self._current_atom = atom_name
+        with self.session.active_atom(atom_name):
+            yield
+
+    @contextmanager
+    def render_pass(self, atom_name: str):
+        """
+        Context manager wrapping one execution of an atom, after which the components
+        the atom rendered in earlier executions but not in this one are removed from
+        the layout.
+
+        Args:
+            atom_name (str): The name of the atom that is being executed.
+        """
+        layout_manager = self._layout_manager
+        layout_manager.begin_pass(atom_name)
         try:
             yield
         finally:
-            self._current_atom = previous_atom
+            for component_id in layout_manager.end_pass(atom_name):
+                # render it again if it comes back, even with the same content
+                self._render_buffer.forget(component_id)
 
     @classmethod
     def get_instance(cls):
@@ -106,7 +157,7 @@ class BasePreswaldService:
 
     @property
     def is_reactivity_enabled(self):
-        return self._reactivity_enabled
+        return self.session.reactivity_enabled
 
     def _ensure_dummy_atom(self, atom_name: str):
         """
@@ -138,11 +189,11 @@ class BasePreswaldService:
             )
 
             dummy_func = lambda **kwargs: None
-            self._workflow.atoms[atom_name] = Atom(
+            self._workflow.register_atom(Atom(
                 name=atom_name,
                 func=dummy_func,
                 original_func=dummy_func,
-            )
+            ))
 
     def append_component(self, component):
         """
@@ -153,7 +204,8 @@ class BasePreswaldService:
 
         - Components are validated for structure and type.
         - Redundant re-renders are avoided via intelligent patching.
-        - Cleaned, normalized data (e.g., no NaNs) is sent to the frontend.
+        - Cleaned, normalized data (e.g., no NaNs) is sent to the frontend, with
+          numeric arrays kept binary for clients receiving msgpack frames.
         - Dynamic layout updates are handled efficiently.
 
         Components may originate from user code, reactive atoms, or system-level updates.
@@ -163,6 +215,15 @@ class BasePreswaldService:
                 The component to append. Can be either a raw dictionary following the
                 component protocol or a wrapped `ComponentReturn` object.
         """
+        if atom_name := self._current_atom:
+            self._workflow.mark_rendered(atom_name)
+
+        sink = self.session.component_sink
+        if sink is not None:
+            # appended later, in execution order, by the parallel workflow executor
+            sink.append(component)
+            return
+
         try:
             # TODO: Investigate stricter type checking for component unwrapping.
             # We currently unwrap any object with a `_preswald_component` attribute,
@@ -185,7 +246,8 @@ class BasePreswaldService:
             component_type = component.get("type")
             logger.info(f"[APPEND] Appending component {component_id=} {component_type=}")
 
-            cleaned_component = clean_nan_values(component)
+            # values are converted for the wire when sent, see `_create_send_callback`
+            cleaned_component = dict(component)
 
             if "id" in cleaned_component:
                 # Attempt to patch; if no match, add it
@@ -201,6 +263,10 @@ class BasePreswaldService:
         except Exception as e:
             logger.error(f"[APPEND] Error adding component: {e}", exc_info=True)
 
+    def capture_components(self):
+        """Context manager collecting appended components instead of adding them to the layout."""
+        return self.session.capture_components()
+
     def clear_components(self):
         """
         Clear all rendered components from the layout manager.
@@ -210,13 +276,15 @@ class BasePreswaldService:
         """
         logger.info("[LAYOUT] Clearing all components from layout manager")
         self._layout_manager.clear_layout()
+        # cleared components must render again even if their content is unchanged
+        self._render_buffer.clear()
 
     def disable_reactivity(self):
-        self._reactivity_enabled = False
+        self.session.reactivity_enabled = False
         logger.info("[SERVICE] Reactivity disabled for fallback execution")
 
     def enable_reactivity(self):
-        self._reactivity_enabled = True
+        self.session.reactivity_enabled = True
         logger.info("[SERVICE] Reactivity re-enabled")
 
     def force_recompute(self, atom_names: set[str]) -> None:
@@ -268,7 +336,7 @@ class BasePreswaldService:
             Any: The current value associated with the component ID.
         """
         with self._lock:
-            value = self._component_states.get(component_id, default)
+            value = self.session.widget_states.get(component_id, default)
 
             if logger.isEnabledFor(logging.DEBUG):
                 logger.debug(f"[STATE] Retrieved component state {component_id=} {value=}")
@@ -293,9 +361,8 @@ class BasePreswaldService:
                 if logger.isEnabledFor(logging.DEBUG):
                     logger.debug(f"[DAG] Registering dynamic dependency {self._current_atom=} {producer=}")
 
-                atom = self._workflow.atoms[self._current_atom]
-                if producer not in atom.dependencies and producer in self._workflow.atoms:
-                    atom.dependencies.append(producer)
+                if producer in self._workflow.atoms:
+                    self._workflow.add_dependency(self._current_atom, producer)
             else:
                 logger.info(f"[DAG] Producer matches current atom; skipping dependency {self._current_atom=} {component_id=}")
 
@@ -306,6 +373,10 @@ class BasePreswaldService:
         rows = self._layout_manager.get_layout()
         return {"rows": rows}
 
+    def take_layout_changes(self) -> set[int] | None:
+        """Indices of layout rows patched since the last call, or None if rows were added, removed or moved."""
+        return self._layout_manager.take_changes()
+
     def get_errors(self, type: str | None = None, filename: str | None = None):
         return get_errors(type=type, filename=filename)
 
@@ -323,13 +394,18 @@ class BasePreswaldService:
         start_time = time.time()
         try:
             msg_type = message.get("type")
-
-            if msg_type == "component_update":
-                await self._handle_component_update(client_id, message)
-            elif msg_type == "bulk_update":
-                await self._handle_bulk_component_update(client_id, message)
-            else:
-                logger.warning(f"Unknown message type: {msg_type}")
+            session = self.sessions.get(client_id, self._default_session)
+
+            with session.activate():
+                if msg_type == "component_update":
+                    await self._handle_component_update(client_id, message)
+                elif msg_type == "bulk_update":
+                    await self._handle_bulk_component_update(client_id, message)
+                elif msg_type == "layout_resync":
+                    if runner := self.script_runners.get(client_id):
+                        await runner.resend_layout()
+                else:
+                    logger.warning(f"Unknown message type: {msg_type}")
 
         except Exception as e:
             logger.error(f"Error handling message from {client_id}: {e}")
@@ -341,8 +417,17 @@ class BasePreswaldService:
 
     def should_render(self, component_id: str, new_value: Any) -> bool:
         """Determine if a component should re-render based on its new value."""
+        self._layout_manager.mark_rendered(component_id, self._current_atom)
         return self._render_buffer.should_render(component_id, new_value)
 
+    def render_revision(self, component_id: str) -> str | None:
+        """Fingerprint of the last rendered value of a component, sent as its revision."""
+        return self._render_buffer.revision(component_id)
+
+    def has_state_changed(self, component_id: str, new_value: Any) -> bool:
+        """Determine if a widget value sent by a client differs from the last one received."""
+        return self._render_buffer.has_state_changed(component_id, new_value)
+
     async def shutdown(self):
         """Shut down the service"""
         self._is_shutting_down = True
@@ -352,6 +437,8 @@ class BasePreswaldService:
         for client_id in list(self.websocket_connections.keys()):
             await self.unregister_client(client_id)
 
+        get_execution_backend().shutdown(wait=False)
+
     async def unregister_client(self, client_id: str):
         """Clean up resources for a disconnected client"""
         try:
@@ -367,102 +454,66 @@ class BasePreswaldService:
                         f"Websocket already closed for client {client_id}: {e}"
                     )
 
-            self._layout_manager.clear_layout()
+            self._wire_formats.pop(client_id, None)
 
-            # Clean up script runner
+            # Clean up script runner and its session
             if runner := self.script_runners.pop(client_id, None):
                 await runner.stop()
 
+            self.close_session(client_id)
+
         except Exception as e:
             logger.error(f"Error unregistering client {client_id}: {e}")
 
-    def _create_send_callback(self, websocket: Any) -> Callable:
-        """Create a message sending callback for a specific websocket"""
+    def _create_send_callback(self, websocket: Any, wire: WireFormat | None = None) -> Callable:
+        """Create a message sending callback for a specific websocket, encoding messages with `wire`"""
+        wire = wire or WireFormat()
 
         async def send_message(msg: dict[str, Any]):
             if not self._is_shutting_down:
                 try:
-                    await websocket.send_json(msg)
+                    await self._send_frame(websocket, wire.encode(msg))
                 except Exception as e:
                     logger.error(f"Error sending message: {e}")
 
         return send_message
 
-    async def _broadcast_state_updates(
-        self, states: dict[str, Any], exclude_client: str | None = None
-    ):
-        """Broadcast state updates to all clients except the sender"""
-
-        for component_id, value in states.items():
-            if isinstance(value, dict) and "data" in value and "layout" in value:
-                value = optimize_plotly_data(value)
-
-            # Compress the data
-            compressed_value = compress_data(value)
-
-            message = {
-                "type": "state_update",
-                "component_id": component_id,
-                "value": compressed_value,
-                "compressed": True,
-            }
-
-            for client_id, websocket in self.websocket_connections.items():
-                if client_id != exclude_client:
-                    try:
-                        await websocket.send_bytes(compress_data(message))
-                    except Exception as e:
-                        logger.error(f"Error broadcasting to {client_id}: {e}")
-
-    async def _broadcast_bulk_state_updates(
-        self, states: dict[str, Any], exclude_client: str | None = None
-    ):
-        """Broadcast bulk state updates to all clients except the sender (optimized for bulk operations)"""
-
-        # Prepare bulk update message with compression
-        processed_states = {}
-        for component_id, value in states.items():
-            if isinstance(value, dict) and "data" in value and "layout" in value:
-                value = optimize_plotly_data(value)
-            processed_states[component_id] = value
-
-        # Single bulk message instead of individual messages
-        bulk_message = {
-            "type": "bulk_update",
-            "states": processed_states,
-            "count": len(processed_states),
-            "compressed": True,
-        }
-
-        # Compress the entire bulk message for better network efficiency
-        compressed_bulk_message = compress_data(bulk_message)
-
-        # Broadcast to all clients except sender
-        broadcast_tasks = []
-        for client_id, websocket in self.websocket_connections.items():
-            if client_id != exclude_client:
-                broadcast_tasks.append(self._send_bulk_message(websocket, compressed_bulk_message, client_id))
-
-        # Send all broadcasts concurrently for better performance
-        if broadcast_tasks:
-            results = await asyncio.gather(*broadcast_tasks, return_exceptions=True)
-            
-            # Log any errors
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    client_ids = [cid for cid in self.websocket_connections.keys() if cid != exclude_client]
-                    if i < len(client_ids):
-                        logger.error(f"Error broadcasting bulk update to {client_ids[i]}: {result}")
-
-        logger.info(f"[BULK_BROADCAST] Sent bulk update with {len(processed_states)} states to {len(broadcast_tasks)} clients")
-
-    async def _send_bulk_message(self, websocket, compressed_message: bytes, client_id: str):
-        """Send compressed bulk message to a specific websocket"""
-        try:
-            await websocket.send_bytes(compressed_message)
-        except Exception as e:
-            logger.error(f"Error sending bulk message to {client_id}: {e}")
-            raise  # Re-raise for gather() to catch
+    @staticmethod
+    async def _send_frame(websocket: Any, frame: str | bytes):
+        """Send a frame encoded by `WireFormat.encode`"""
+        if isinstance(frame, str):
+            await websocket.send_text(frame)
+        else:
+            await websocket.send_bytes(frame)
+
+    async def _broadcast(self, message: dict[str, Any], exclude_client: str | None = None) -> int:
+        """
+        Send a message to all clients except `exclude_client`.
+
+        The message is encoded once per wire format in use, not once per client, and
+        the resulting frames are sent to all clients concurrently.
+
+        Returns:
+            The number of clients the message was sent to.
+        """
+        frames: dict[WireFormat, str | bytes] = {}
+        recipients = []
+        sends = []
+        for client_id, websocket in list(self.websocket_connections.items()):
+            if client_id == exclude_client:
+                continue
+            wire = self._wire_formats.get(client_id) or WireFormat()
+            frame = frames.get(wire)
+            if frame is None:
+                frame = frames[wire] = wire.encode(message)
+            recipients.append(client_id)
+            sends.append(self._send_frame(websocket, frame))
+
+        results = await asyncio.gather(*sends, return_exceptions=True)
+        for client_id, result in zip(recipients, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error broadcasting to {client_id}: {result}")
+        return len(sends)
 
     async def _handle_component_update(self, client_id: str, message: dict[str, Any]):
         """Handle component state update messages"""
@@ -472,7 +523,7 @@ class BasePreswaldService:
             raise ValueError("Component update missing states")
 
         # Only rerun if any state actually changed
-        changed_states = {k: v for k, v in states.items() if self.should_render(k, v)}
+        changed_states = {k: v for k, v in states.items() if self.has_state_changed(k, v)}
 
         if not changed_states:
             logger.info("[STATE] No actual state changes detected. Skipping rerun.")
@@ -481,13 +532,11 @@ class BasePreswaldService:
         # Update only changed states
         self._update_component_states(changed_states)
 
-        # Update states and trigger script rerun
+        # Queue a rerun without blocking the client's message loop, so that rapid
+        # updates coalesce into the latest state instead of queueing behind each other
         runner = self.script_runners.get(client_id)
         if runner:
-            await runner.rerun(changed_states)
-
-        # Broadcast updates to other clients
-        await self._broadcast_state_updates(changed_states, exclude_client=client_id)
+            runner.schedule_rerun(changed_states)
 
     async def _handle_bulk_component_update(self, client_id: str, message: dict[str, Any]):
         """Handle bulk component state update messages with production-ready optimized processing"""
@@ -521,7 +570,7 @@ class BasePreswaldService:
                     continue
                     
                 try:
-                    if self.should_render(component_id, new_value):
+                    if self.has_state_changed(component_id, new_value):
                         changed_states[component_id] = new_value
                 except Exception as e:
                     validation_errors.append(f"Error validating {component_id}: {str(e)}")
@@ -559,14 +608,11 @@ class BasePreswaldService:
         runner = self.script_runners.get(client_id)
         if runner:
             try:
-                # Production safety: timeout for script reruns to prevent hanging
-                await asyncio.wait_for(runner.rerun(changed_states), timeout=30.0)
+                # The rerun enforces the configured deadline itself, marking atoms it
+                # could not finish FAILED or SKIPPED instead of hanging here
+                await runner.schedule_rerun(changed_states)
                 rerun_time = time.time() - rerun_start
                 logger.info(f"[BULK_UPDATE] Script rerun completed in {rerun_time:.3f}s")
-            except asyncio.TimeoutError:
-                logger.error(f"[BULK_UPDATE] Script rerun timed out for client {client_id}")
-                await self._send_error(client_id, "Script rerun timed out")
-                raise
             except Exception as e:
                 logger.error(f"[BULK_UPDATE] Script rerun failed for client {client_id}: {e}")
                 await self._send_error(client_id, f"Script rerun failed: {str(e)}")
@@ -574,16 +620,6 @@ class BasePreswaldService:
         else:
             logger.warning(f"[BULK_UPDATE] No script runner found for client {client_id}")
 
-        # Enhanced bulk broadcast with error resilience
-        broadcast_start = time.time()
-        try:
-            await self._broadcast_bulk_state_updates(changed_states, exclude_client=client_id)
-            broadcast_time = time.time() - broadcast_start
-            logger.info(f"[BULK_UPDATE] Broadcast completed in {broadcast_time:.3f}s")
-        except Exception as e:
-            # Log but don't fail the entire operation if broadcast fails
-            logger.error(f"[BULK_UPDATE] Broadcast failed: {e}")
-
         # Send success acknowledgment with detailed metrics
         total_processing_time = time.time() - start_time
         await self._send_bulk_update_ack(
@@ -596,7 +632,7 @@ class BasePreswaldService:
         
         # Enhanced performance logging for production monitoring
         logger.info(f"[BULK_UPDATE] Completed in {total_processing_time:.3f}s for {len(changed_states)} changes")
-        logger.info(f"[BULK_UPDATE] Performance breakdown - Change detection: {change_detection_time:.3f}s, State update: {update_time:.3f}s, Script rerun: {rerun_time:.3f}s, Broadcast: {broadcast_time:.3f}s")
+        logger.info(f"[BULK_UPDATE] Performance breakdown - Change detection: {change_detection_time:.3f}s, State update: {update_time:.3f}s, Script rerun: {rerun_time:.3f}s")
 
     def connect_data_manager(self):
         """Connect the data manager"""
@@ -618,10 +654,15 @@ class BasePreswaldService:
 
         self.websocket_connections[client_id] = websocket
 
+        # clients opt into versioned layout patches with `?layout=<protocol version>`
+        query_params = getattr(websocket, "query_params", None) or {}
+        layout_patches = query_params.get("layout") == LAYOUT_PROTOCOL_VERSION
+        wire = self._wire_formats[client_id] = self._negotiate_wire_format(query_params)
+
         runner = ScriptRunner(
             session_id=client_id,
-            send_message_callback=self._create_send_callback(websocket),
-            initial_states=self._component_states,
+            send_message_callback=self._create_send_callback(websocket, wire),
+            layout_patches=layout_patches,
         )
         self.script_runners[client_id] = runner
 
@@ -632,6 +673,28 @@ class BasePreswaldService:
 
         return runner
 
+    @staticmethod
+    def _negotiate_wire_format(query_params) -> WireFormat:
+        """
+        Pick the wire format a connecting client asked for.
+
+        Clients opt into binary msgpack frames with `?encoding=msgpack` and into zlib
+        compression with `?compression=zlib`, which the [compression] section of
+        preswald.toml can disable.
+        """
+        binary = query_params.get("encoding") == "msgpack"
+        if query_params.get("compression") != "zlib":
+            return WireFormat(binary=binary)
+
+        config = read_compression_config()
+        if not config["enabled"]:
+            return WireFormat(binary=binary)
+        return WireFormat(
+            binary=binary,
+            compression_level=int(config["level"]),
+            min_compress_bytes=int(config["min_bytes"]),
+        )
+
     async def _send_error(self, client_id: str, message: str):
         """Send error message to a client"""
         if websocket := self.websocket_connections.get(client_id):
@@ -673,17 +736,18 @@ class BasePreswaldService:
             logger.error(f"Error sending initial states: {e}")
 
     def _update_component_states(self, states: dict[str, Any]):
-        """Update internal state dictionary with cleaned component values."""
+        """Update the active session's widget states with cleaned component values."""
+        widget_states = self.session.widget_states
         with self._lock:
             logger.info("[STATE] Updating states")
             for component_id, new_value in states.items():
-                old_value = self._component_states.get(component_id)
+                old_value = widget_states.get(component_id)
 
-                cleaned_new_value = clean_nan_values(new_value)
-                cleaned_old_value = clean_nan_values(old_value)
+                cleaned_new_value = to_serializable(new_value)
+                cleaned_old_value = to_serializable(old_value)
 
                 if cleaned_old_value != cleaned_new_value:
-                    self._component_states[component_id] = cleaned_new_value
+                    widget_states[component_id] = cleaned_new_value
                     logger.info(f"[STATE] State changed for {component_id=}")
                     if logger.isEnabledFor(logging.DEBUG):
                         logger.debug(f"[STATE]  - {cleaned_old_value=}\n  - {cleaned_new_value=}")
@@ -0,0 +1,133 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from preswald.utils import IS_PYODIDE, read_execution_config
+
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_BACKENDS = ("thread", "inline")
+
+
+class ExecutionBackend:
+    """
+    Runs blocking script and DAG evaluation work off the asyncio event loop.
+
+    The default "thread" backend submits work to a bounded thread pool so that a
+    slow atom in one session never stalls websocket I/O for other sessions. The
+    "inline" backend runs work directly on the loop, which is the only option in
+    Pyodide where threads are unavailable.
+
+    Work always runs inside a copy of the caller's context, so the active session
+    and other context variables are visible to the script.
+    """
+
+    def __init__(
+        self,
+        backend: str = "thread",
+        max_workers: int | None = None,
+        parallel_atoms: bool = False,
+        max_atom_workers: int | None = None,
+        atom_timeout: float | None = None,
+        rerun_timeout: float | None = None,
+        precise_recompute: bool = False,
+    ):
+        if backend == "subprocess":
+            # Atoms close over in-process service state (session, layout, data manager),
+            # so they cannot be marshalled to a worker process. Use threads instead.
+            logger.warning("[Executor] Subprocess execution is not supported; using thread backend")
+            backend = "thread"
+        elif backend not in SUPPORTED_BACKENDS:
+            logger.warning(f"[Executor] Unknown execution backend {backend=}; using thread backend")
+            backend = "thread"
+
+        if backend == "thread" and IS_PYODIDE:
+            backend = "inline"
+
+        self.backend = backend
+        self.max_workers = max_workers
+        self.parallel_atoms = parallel_atoms and backend == "thread"
+        self.max_atom_workers = max_atom_workers
+        self.atom_timeout = atom_timeout
+        self.rerun_timeout = rerun_timeout
+        self.precise_recompute = precise_recompute
+        self._pool: ThreadPoolExecutor | None = None
+        self._atom_pool: ThreadPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+        logger.info(f"[Executor] Using {backend} execution backend {max_workers=} parallel_atoms={self.parallel_atoms}")
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="preswald-exec"
+                    )
+        return self._pool
+
+    def atom_executor(self) -> ThreadPoolExecutor | None:
+        """
+        Thread pool for running independent atoms concurrently, or None if parallel
+        atom execution is disabled.
+
+        This is a separate pool from the one running scripts, so a script waiting on
+        its atoms can never starve them of workers.
+        """
+        if not self.parallel_atoms:
+            return None
+        if self._atom_pool is None:
+            with self._pool_lock:
+                if self._atom_pool is None:
+                    self._atom_pool = ThreadPoolExecutor(
+                        max_workers=self.max_atom_workers, thread_name_prefix="preswald-atom"
+                    )
+        return self._atom_pool
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `func(*args, **kwargs)` on the configured backend and return its result."""
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, func, *args, **kwargs)
+
+        if self.backend == "inline":
+            return call()
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), call)
+
+    def shutdown(self, wait: bool = False):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
+            if self._atom_pool is not None:
+                self._atom_pool.shutdown(wait=wait)
+                self._atom_pool = None
+
+
+_backend: ExecutionBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def get_execution_backend() -> ExecutionBackend:
+    """Return the process-wide execution backend, configured from preswald.toml on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                config = read_execution_config()
+                _backend = ExecutionBackend(
+                    backend=config["backend"],
+                    max_workers=config.get("max_workers"),
+                    parallel_atoms=bool(config.get("parallel_atoms")),
+                    max_atom_workers=config.get("max_atom_workers"),
+                    atom_timeout=config.get("atom_timeout"),
+                    rerun_timeout=config.get("rerun_timeout"),
+                    precise_recompute=bool(config.get("precise_recompute")),
+                )
+    return _backend
@@ -1,83 +1,330 @@
 import logging
+import threading
+import uuid
+
+from preswald.interfaces.fingerprint import UnfingerprintableError, fingerprint
 
 
 logger = logging.getLogger(__name__)
 
+# Version of the `layout_patch` protocol, as requested by clients in the websocket URL
+LAYOUT_PROTOCOL_VERSION = "1"
+
 
 class LayoutManager:
-    """Manages the layout of components in rows based on their sizes"""
+    """
+    Manages the layout of components in rows based on their sizes.
+
+    Components are kept in render order, keyed by ID, together with a compact
+    row structure of keys and a key-to-row index. Patching a component whose
+    size did not change replaces it in place in constant time. Appending fills
+    the last row, and removing a component or changing its size repacks the rows.
+    Reading the layout never modifies it.
+
+    Rows whose components were patched are tracked as dirty, and a flag records
+    whether the row structure itself changed, so that layout diffs only need to
+    look at what changed (see `take_changes`).
+
+    Components rendered while an atom executes are owned by that atom. Render
+    passes (`begin_pass`/`end_pass`) bracket an atom's execution, and components
+    the atom owned but did not render again are removed at the end of its pass.
+    """
 
     def __init__(self):
-        self.rows = []
-        self.current_row = []
-        self.current_row_size = 0.0
-        self.seen_ids = set()
+        self._components: dict[str, dict] = {}  # key -> component, in render order
+        self._sizes: dict[str, float] = {}
+        self._rows: list[list[str]] = []
+        self._row_sizes: list[float] = []
+        self._row_of: dict[str, int] = {}
+        self._anonymous = 0
+        self._dirty_rows: set[int] = set()
+        self._structure_changed = True
+        self._owners: dict[str, str] = {}  # component ID -> atom that rendered it
+        self._owned: dict[str, set[str]] = {}  # atom -> IDs of the components it rendered
+        self._passes: dict[str, set[str]] = {}  # atom -> IDs rendered during its current pass
+        self._lock = threading.RLock()
 
     def add_component(self, component):
-        """Add a component to the layout"""
-        size = float(component.get("size", 1.0))
-
-        if "id" in component:
-            self.seen_ids.add(component["id"])
+        """Add a component to the layout, or patch it in place if its ID is already present."""
+        with self._lock:
+            if self.patch_component(component):
+                return
 
-        # Handle separator component type which forces a new row
-        if component.get("type") == "separator":
-            self.finish_current_row()
-            # Add separator in its own row
-            self.rows.append([component])
-            return
+            if "id" in component:
+                key = component["id"]
+            else:
+                key = f"__anonymous_{self._anonymous}"
+                self._anonymous += 1
 
-        # If component size is greater than remaining space, start new row
-        if self.current_row_size + size > 1.0:
-            self.finish_current_row()
+            size = float(component.get("size", 1.0))
+            self._components[key] = component
+            self._sizes[key] = size
+            self._place(key, size)
+            self._structure_changed = True
 
-        # Add component to current row
-        self.current_row.append(component)
-        self.current_row_size += size
+    def patch_component(self, updated_component) -> bool:
+        """Patch an existing component in the layout if it exists by ID."""
+        component_id = updated_component.get("id")
+        with self._lock:
+            if component_id is None or component_id not in self._components:
+                return False  # cannot patch if component is not existing
 
-        # If row is exactly full, finish it
-        if self.current_row_size >= 1.0:
-            self.finish_current_row()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"[PATCH] Patching existing component { component_id }")
 
-    def finish_current_row(self):
-        """Complete current row and start a new one"""
-        if self.current_row:
-            # Calculate flex values for the row
-            total_size = sum(float(c.get("size", 1.0)) for c in self.current_row)
-            for component in self.current_row:
-                component_size = float(component.get("size", 1.0))
-                component["flex"] = component_size / total_size
+            size = float(updated_component.get("size", 1.0))
+            self._components[component_id] = updated_component
+            if size != self._sizes[component_id]:
+                self._sizes[component_id] = size
+                self._repack()
+            else:
+                row = self._row_of[component_id]
+                self._set_flex(row, updated_component)
+                self._dirty_rows.add(row)
+            return True
 
-            self.rows.append(self.current_row)
-            self.current_row = []
-            self.current_row_size = 0.0
+    def remove_component(self, component_id: str) -> bool:
+        """Remove a component from the layout. Returns False if it was not present."""
+        with self._lock:
+            if self._components.pop(component_id, None) is None:
+                return False
+            del self._sizes[component_id]
+            if owner := self._owners.pop(component_id, None):
+                self._owned[owner].discard(component_id)
+            self._repack()
+            logger.debug(f"[LAYOUT] Removed component {component_id}")
+            return True
 
     def get_layout(self):
-        """Get the final layout with all components organized in rows"""
-        self.finish_current_row()  # Ensure any remaining components are added
-        return self.rows
+        """Get the layout with all components organized in rows"""
+        with self._lock:
+            return [[self._components[key] for key in row] for row in self._rows]
 
     def clear_layout(self):
         """Clear the layout"""
-        self.rows.clear()
-        self.current_row.clear()
-        self.current_row_size = 0.0
-        self.seen_ids = set()
+        with self._lock:
+            self._components.clear()
+            self._sizes.clear()
+            self._rows.clear()
+            self._row_sizes.clear()
+            self._row_of.clear()
+            self._owners.clear()
+            self._owned.clear()
+            self._dirty_rows.clear()
+            self._structure_changed = True
 
-    def patch_component(self, updated_component):
-        """Patch an existing component in the layout if it exists by ID."""
-        if "id" not in updated_component or updated_component["id"] not in self.seen_ids:
-            return False  # cannot patch if component is not existing
+    def take_changes(self) -> set[int] | None:
+        """
+        Return the indices of rows patched since the last call, or None if rows
+        were added, removed or repacked since then, and reset the tracking.
+        """
+        with self._lock:
+            dirty = None if self._structure_changed else self._dirty_rows
+            self._dirty_rows = set()
+            self._structure_changed = False
+            return dirty
+
+    def begin_pass(self, owner: str):
+        """Start recording the components `owner` renders."""
+        with self._lock:
+            self._passes[owner] = set()
+
+    def mark_rendered(self, component_id: str, owner: str | None):
+        """Record that `owner` rendered a component, whether or not it changed."""
+        if owner is None:
+            return
+        with self._lock:
+            rendered = self._passes.get(owner)
+            if rendered is None:
+                return
+            rendered.add(component_id)
+            previous = self._owners.get(component_id)
+            if previous != owner:
+                if previous is not None:
+                    self._owned[previous].discard(component_id)
+                self._owners[component_id] = owner
+                self._owned.setdefault(owner, set()).add(component_id)
+
+    def end_pass(self, owner: str) -> list[str]:
+        """
+        Finish recording for `owner`, removing the components it rendered in an
+        earlier pass but not in this one.
+
+        Returns:
+            The IDs of the removed components.
+        """
+        with self._lock:
+            rendered = self._passes.pop(owner, None)
+            if rendered is None:
+                return []
+            stale = [component_id for component_id in self._owned.get(owner, ()) if component_id not in rendered]
+            for component_id in stale:
+                self.remove_component(component_id)
+                self._owners.pop(component_id, None)
+            if stale:
+                logger.info(f"[LAYOUT] Reclaimed components no longer rendered by {owner}: {stale}")
+            return stale
+
+    def _place(self, key: str, size: float):
+        """Append a component to the last row if it fits there, or start a new row."""
+        component = self._components[key]
+        is_separator = component.get("type") == "separator"
+        if (
+            self._rows
+            and not is_separator
+            and not self._is_closed(len(self._rows) - 1)
+            and self._row_sizes[-1] + size <= 1.0
+        ):
+            self._rows[-1].append(key)
+            self._row_sizes[-1] += size
+        else:
+            # separators always sit in their own row, which nothing joins
+            self._rows.append([key])
+            self._row_sizes.append(size)
+        row = len(self._rows) - 1
+        self._row_of[key] = row
+        for k in self._rows[row]:
+            self._set_flex(row, self._components[k])
+
+    def _is_closed(self, row: int) -> bool:
+        if self._row_sizes[row] >= 1.0:
+            return True
+        first = self._components[self._rows[row][0]]
+        return first.get("type") == "separator"
+
+    def _set_flex(self, row: int, component: dict):
+        total = self._row_sizes[row]
+        size = float(component.get("size", 1.0))
+        component["flex"] = size / total if total else 1.0
+
+    def _repack(self):
+        self._rows = []
+        self._row_sizes = []
+        self._row_of = {}
+        for key, size in self._sizes.items():
+            self._place(key, size)
+        self._structure_changed = True
+
+
+class LayoutDiffer:
+    """
+    Tracks the layout last sent to one client and computes patches against it.
+
+    Each layout sent to the client gets a version. A patch lists the component IDs
+    of every row, which covers inserted and moved components, the full dicts of
+    components that are new or whose content revision changed, and the IDs of
+    removed components. Clients apply a patch only on top of its `base_version`
+    and request a full snapshot otherwise.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._rows: list[list[str]] = []
+        self._keys: dict[str, tuple] = {}
+
+    def snapshot(self, rows: list[list[dict]]) -> int:
+        """Record `rows` as sent in full and return their version."""
+        self._rows, self._keys = self._index(rows) or ([], {})
+        self.version += 1
+        return self.version
+
+    def diff(self, rows: list[list[dict]], dirty_rows: set[int] | None = None) -> dict | None:
+        """
+        Compute a patch from the last sent layout to `rows` and record it as sent.
+
+        Args:
+            rows: The current layout.
+            dirty_rows: Indices of the rows patched since the last sent layout, when
+                the row structure is known not to have changed since then (see
+                `LayoutManager.take_changes`). Only these rows are compared.
+
+        Returns:
+            The patch message, or None if the layout cannot be patched (e.g. a
+            component has no ID, or nothing was sent yet) and a full snapshot
+            must be sent instead. A patch without changes is not sent by callers.
+        """
+        if not self.version:
+            return None
+        if dirty_rows is not None and len(rows) == len(self._rows):
+            return self._diff_rows(rows, dirty_rows)
+        index = self._index(rows)
+        if index is None:
+            return None
+        row_ids, keys = index
+
+        changed = {}
+        for row in rows:
+            for component in row:
+                component_id = component["id"]
+                if self._keys.get(component_id) != keys[component_id]:
+                    changed[component_id] = component
+        removed = [component_id for component_id in self._keys if component_id not in keys]
+
+        base_version = self.version
+        if changed or removed or row_ids != self._rows:
+            self.version += 1
+        self._rows, self._keys = row_ids, keys
+        return {
+            "type": "layout_patch",
+            "version": self.version,
+            "base_version": base_version,
+            "rows": row_ids,
+            "components": changed,
+            "removed": removed,
+        }
+
+    @staticmethod
+    def is_empty(patch: dict) -> bool:
+        return patch["version"] == patch["base_version"]
+
+    def _diff_rows(self, rows: list[list[dict]], dirty_rows: set[int]) -> dict | None:
+        changed = {}
+        keys = {}
+        for i in dirty_rows:
+            if i >= len(rows) or len(rows[i]) != len(self._rows[i]):
+                return self.diff(rows)
+            for component, sent_id in zip(rows[i], self._rows[i]):
+                if component.get("id") != sent_id:
+                    return self.diff(rows)
+                key = self._key(component)
+                if self._keys[sent_id] != key:
+                    changed[sent_id] = component
+                    keys[sent_id] = key
 
-        component_id = updated_component["id"]
-        logger.debug(f"[PATCH] Patching existing component { component_id }")
+        base_version = self.version
+        if changed:
+            self.version += 1
+            self._keys.update(keys)
+        return {
+            "type": "layout_patch",
+            "version": self.version,
+            "base_version": base_version,
+            "rows": self._rows,
+            "components": changed,
+            "removed": [],
+        }
 
-        for row in self.rows:
-            for i, existing in enumerate(row):
-                if existing.get("id") == component_id:
-                    row[i] = updated_component
-                    return True
+    @staticmethod
+    def _key(component: dict) -> tuple:
+        revision = component.get("revision")
+        if not revision:
+            try:
+                revision = fingerprint(component)
+            except UnfingerprintableError:
+                revision = uuid.uuid4().hex  # always resent
+        return (revision, component.get("flex"), component.get("error"))
 
-        # Component id was seen, but not found in rows. This could be a layout bug
-        logger.warning(f"[PATCH] Component id {component_id} was seen but not found in layout rows")
-        return False
+    @classmethod
+    def _index(cls, rows: list[list[dict]]) -> tuple[list[list[str]], dict[str, tuple]] | None:
+        row_ids = []
+        keys = {}
+        for row in rows:
+            ids = []
+            for component in row:
+                component_id = component.get("id")
+                if not component_id or component_id in keys:
+                    return None
+                keys[component_id] = cls._key(component)
+                ids.append(component_id)
+            row_ids.append(ids)
+        return row_ids, keys
@@ -82,9 +82,11 @@ def with_render_tracking(component_type: str):
 
                 return_value = result.value if isinstance(result, ComponentReturn) else result
 
-                component['shouldRender'] = service.should_render(component_id, component)
+                should_render = service.should_render(component_id, component)
+                component['shouldRender'] = should_render
+                component['revision'] = service.render_revision(component_id)
                 # Skip DAG logic, but still respect RenderBuffer diffing
-                if service.should_render(component_id, component):
+                if should_render:
                     service.append_component(component)
                 else:
                     logger.info(f"[{component_type}] Fallback: No changes detected. Skipping append {component_id=}")
@@ -92,7 +94,7 @@ def with_render_tracking(component_type: str):
                 return return_value
 
             # Run the component function within the atom context (if not already active)
-            current_atom = service._workflow._current_atom
+            current_atom = service.get_workflow()._current_atom
             if current_atom:
                 context = contextlib.nullcontext()
             else:
@@ -114,11 +116,13 @@ def with_render_tracking(component_type: str):
                 return_value = result.value if isinstance(result, ComponentReturn) else result
 
                 # Register the producer for this component ID
-                service._workflow.register_component_producer(component_id, atom_name)
+                service.get_workflow().register_component_producer(component_id, atom_name)
 
-                component['shouldRender'] = service.should_render(component_id, component)
+                should_render = service.should_render(component_id, component)
+                component['shouldRender'] = should_render
+                component['revision'] = service.render_revision(component_id)
                 # Append component only if changed
-                if service.should_render(component_id, component):
+                if should_render:
                     if logger.isEnabledFor(logging.DEBUG):
                         logger.debug(f"[{component_type}] Created component {component=}")
                     service.append_component(component)
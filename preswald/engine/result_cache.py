@@ -0,0 +1,429 @@
+import copy
+import importlib.util
+import logging
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from preswald.utils import read_cache_config
+
+
+logger = logging.getLogger(__name__)
+
+_HAS_PARQUET = importlib.util.find_spec("pyarrow") is not None
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+
+class DiskResultCache:
+    """
+    Size-bounded, on-disk store of atom results that survives server restarts.
+
+    Results are keyed by the atom's input hash, which covers the atom name, its
+    compiled source and the fingerprints of its inputs, so a changed script or
+    changed inputs never replay a stale value. DataFrames are written as Parquet
+    when pyarrow is available and everything else is pickled. Reads refresh an
+    entry's modification time and the least recently used entries are evicted
+    once the directory grows past `max_bytes`.
+
+    Entry sizes and recency are tracked in an in-memory index, built by scanning
+    the directory once when it is configured and updated on every read, write and
+    eviction, so writes do not rescan the directory.
+
+    The store is disabled until a directory is configured (see `configure`).
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, directory: str | None = None, max_bytes: int = DEFAULT_MAX_BYTES, min_seconds: float = 0.0):
+        self._directory = directory
+        self.max_bytes = max_bytes
+        self.min_seconds = min_seconds
+        self._lock = threading.Lock()
+        # entry path -> size in bytes, least recently used first
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._scan()
+
+    @classmethod
+    def get_instance(cls) -> "DiskResultCache":
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def configure(self, directory: str | None, max_bytes: int = DEFAULT_MAX_BYTES, min_seconds: float = 0.0):
+        """Point the store at `directory`, or disable it with None."""
+        changed = directory != self._directory
+        self._directory = directory
+        self.max_bytes = max_bytes
+        self.min_seconds = min_seconds
+        if changed:
+            self._scan()
+        logger.info(f"[ResultCache] Configured {directory=} {max_bytes=} {min_seconds=}")
+
+    @property
+    def enabled(self) -> bool:
+        return self._directory is not None
+
+    def _scan(self):
+        """Rebuild the index from the directory, ordered by modification time."""
+        entries = []
+        if self._directory is not None:
+            try:
+                entries = [
+                    (entry.stat().st_mtime, entry.path, entry.stat().st_size)
+                    for entry in os.scandir(self._directory)
+                    if entry.is_file() and not entry.name.endswith(".tmp")
+                ]
+            except FileNotFoundError:
+                pass
+
+        with self._lock:
+            self._index = OrderedDict((path, size) for _, path, size in sorted(entries))
+            self._total_bytes = sum(self._index.values())
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes, "evictions": self.evictions}
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """Return `(True, value)` for a stored result, `(False, None)` otherwise."""
+        if not self.enabled:
+            return False, None
+
+        for path, reader in ((self._path(key, "parquet"), pd.read_parquet), (self._path(key, "pkl"), _read_pickle)):
+            if not os.path.exists(path):
+                continue
+            try:
+                value = reader(path)
+                os.utime(path)  # mark as recently used, also across restarts
+            except Exception as e:
+                logger.warning(f"[ResultCache] Ignoring unreadable entry {path}: {e}")
+                continue
+            with self._lock:
+                if path in self._index:
+                    self._index.move_to_end(path)
+            self.hits += 1
+            logger.info(f"[ResultCache] Hit key={key[:12]}")
+            return True, value
+
+        self.misses += 1
+        return False, None
+
+    def put(self, key: str, value: Any, compute_time: float | None = None) -> bool:
+        """
+        Store a result. Results computed faster than `min_seconds` are not worth a disk
+        round trip and are skipped, as are values that cannot be serialized.
+
+        Returns:
+            True if the result was written.
+        """
+        if not self.enabled:
+            return False
+        if compute_time is not None and compute_time < self.min_seconds:
+            return False
+
+        os.makedirs(self._directory, exist_ok=True)
+        if isinstance(value, pd.DataFrame) and _HAS_PARQUET and self._write(key, "parquet", value.to_parquet):
+            return True
+        return self._write(key, "pkl", lambda path: _write_pickle(value, path))
+
+    def _write(self, key: str, extension: str, writer) -> bool:
+        path = self._path(key, extension)
+        if os.path.exists(path):
+            return True
+
+        # write to a temp file first so concurrent readers never see a partial entry
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            writer(tmp_path)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.debug(f"[ResultCache] Could not write {extension} entry key={key[:12]}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+        self.writes += 1
+        logger.info(f"[ResultCache] Stored key={key[:12]} as {extension}")
+        with self._lock:
+            self._total_bytes += size - self._index.pop(path, 0)
+            self._index[path] = size
+        self._evict()
+        return True
+
+    def _evict(self):
+        """Remove least recently used entries until the store fits in `max_bytes`."""
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return
+
+            while self._index and self._total_bytes > self.max_bytes:
+                path, size = self._index.popitem(last=False)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                self._total_bytes -= size
+                self.evictions += 1
+            logger.info(f"[ResultCache] Evicted entries down to {self._total_bytes} bytes {self.stats()=}")
+
+    def clear(self):
+        if not self.enabled or not os.path.isdir(self._directory):
+            return
+        for entry in os.scandir(self._directory):
+            if entry.is_file():
+                os.remove(entry.path)
+        with self._lock:
+            self._index.clear()
+            self._total_bytes = 0
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self._directory, f"{key}.{extension}")
+
+
+def _read_pickle(path: str) -> Any:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _write_pickle(value: Any, path: str):
+    with open(path, "wb") as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def get_disk_result_cache() -> DiskResultCache:
+    return DiskResultCache.get_instance()
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate in-memory size of a value in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if _depth < 4:
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return sys.getsizeof(value) + sum(estimate_size(item, _depth + 1) for item in value)
+        if isinstance(value, dict):
+            return sys.getsizeof(value) + sum(
+                estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items()
+            )
+    return sys.getsizeof(value)
+
+
+def _is_immutable(value: Any, _depth: int = 0) -> bool:
+    """Whether a value is a scalar, or a tuple or frozenset of them, that cannot be changed in place."""
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+        return True
+    if isinstance(value, (tuple, frozenset)) and _depth < 4:
+        return all(_is_immutable(item, _depth + 1) for item in value)
+    return False
+
+
+def _backing_arrays(value: Any) -> list | None:
+    """The arrays holding a numpy array's or DataFrame's data, or None for other values."""
+    if isinstance(value, np.ndarray):
+        return [value]
+    if isinstance(value, pd.DataFrame):
+        return [block.values for block in value._mgr.blocks]
+    return None
+
+
+def _is_read_only(value: Any) -> bool:
+    """Whether a value is a numpy array or DataFrame whose arrays are all read-only and hold no objects."""
+    arrays = _backing_arrays(value)
+    return arrays is not None and all(
+        isinstance(array, np.ndarray) and not array.dtype.hasobject and not array.flags.writeable
+        for array in arrays
+    )
+
+
+def _share(value: Any) -> Any:
+    """
+    A value for another session: read-only values are shared, anything else is copied.
+
+    Stored arrays own their (read-only) data and are handed out as views, which
+    cannot be made writable again; DataFrames as shallow copies of their blocks.
+    """
+    if _is_immutable(value):
+        return value
+    if _is_read_only(value):
+        return value.view() if isinstance(value, np.ndarray) else value.copy(deep=False)
+    return copy.deepcopy(value)
+
+
+class SharedResultCache:
+    """
+    Process-wide, in-memory store of atom results shared by all sessions.
+
+    Every client runs the same script, usually with the same default widget values,
+    so identical atoms produce identical input hashes across sessions. The first
+    session to compute a result publishes it here and later sessions reuse it.
+    While one session is computing a key, other sessions asking for the same key
+    wait for it (up to `wait_seconds`) instead of computing it again.
+
+    Entries are evicted by least recent ("lru") or least frequent ("lfu") use once
+    their estimated size exceeds `max_bytes`. Values are copied when stored and
+    when returned, so a session mutating its result in place never changes what
+    other sessions get. Immutable values are not copied, and neither are arrays
+    and DataFrames already marked read-only, which are returned as read-only views.
+    """
+
+    POLICIES = ("lru", "lfu")
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024, policy: str = "lru", wait_seconds: float = 10.0):
+        if policy not in self.POLICIES:
+            logger.warning(f"[SharedResultCache] Unknown eviction policy {policy=}; using lru")
+            policy = "lru"
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.wait_seconds = wait_seconds
+
+        # key -> (value, size, use count), in recency order
+        self._entries: OrderedDict[str, tuple[Any, int, int]] = OrderedDict()
+        self._inflight: dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """
+        Return `(True, value)` for a cached result, `(False, None)` otherwise.
+
+        A miss claims the key for the caller, who is expected to `put` or `release`
+        it. A caller missing a key claimed by someone else waits for that result.
+        """
+        with self._lock:
+            found, value = self._lookup(key)
+            event = None if found else self._inflight.get(key)
+            if not found and event is None:
+                self._inflight[key] = threading.Event()
+                self.misses += 1
+                return False, None
+        if found:
+            # copied outside the lock, so every session gets an object of its own
+            return True, _share(value)
+
+        logger.info(f"[SharedResultCache] Waiting for result computed by another session key={key[:12]}")
+        event.wait(self.wait_seconds)
+        with self._lock:
+            found, value = self._lookup(key)
+            if not found:
+                self.misses += 1
+                return False, None
+        return True, _share(value)
+
+    def put(self, key: str, value: Any, compute_time: float | None = None) -> bool:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            self.release(key)
+            logger.info(f"[SharedResultCache] Result too large to share key={key[:12]} {size=}")
+            return False
+
+        # the computing session keeps its own object and may go on mutating it, or
+        # flip a read-only array it owns back to writable
+        if not _is_immutable(value):
+            read_only = _is_read_only(value)
+            value = copy.deepcopy(value)
+            if read_only:
+                for array in _backing_arrays(value):
+                    array.flags.writeable = False
+        with self._lock:
+            self._settle(key)
+            if key in self._entries:
+                return True
+            self._entries[key] = (value, size, 0)
+            self.size += size
+            self._evict()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[SharedResultCache] Stored key={key[:12]} {size=} {self.stats()=}")
+        return True
+
+    def release(self, key: str):
+        """Give up a claim on `key` without storing a result."""
+        with self._lock:
+            self._settle(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _lookup(self, key: str) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        value, size, uses = entry
+        self._entries[key] = (value, size, uses + 1)
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def _settle(self, key: str):
+        event = self._inflight.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._entries:
+            if self.policy == "lfu":
+                # ties go to the least recently used entry, which comes first
+                victim = min(self._entries, key=lambda k: self._entries[k][2])
+            else:
+                victim = next(iter(self._entries))
+            _, size, _ = self._entries.pop(victim)
+            self.size -= size
+            self.evictions += 1
+
+
+_shared_cache: SharedResultCache | None = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_result_cache() -> SharedResultCache | None:
+    """
+    Return the process-wide shared result cache configured from preswald.toml,
+    or None if sharing results between sessions is disabled.
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                config = read_cache_config()
+                _shared_cache = SharedResultCache(
+                    max_bytes=int(float(config["shared_max_mb"]) * 1024 * 1024) if config.get("shared") else 0,
+                    policy=config["shared_policy"],
+                )
+    return _shared_cache if _shared_cache.enabled else None
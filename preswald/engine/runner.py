@@ -8,16 +8,70 @@ import time
 import traceback
 from collections.abc import Callable
 from contextlib import contextmanager
+from contextvars import ContextVar
 from enum import Enum
 from pathlib import Path
 from typing import Any
 
-from preswald.engine.transformers.reactive_runtime import transform_source
-from preswald.utils import reactivity_explicitly_disabled
+from preswald.engine.executor import get_execution_backend
+from preswald.engine.managers.layout import LayoutDiffer
+from preswald.engine.result_cache import get_disk_result_cache
+from preswald.engine.scheduler import RerunScheduler
+from preswald.engine.transformers.cache import get_transform_cache
+from preswald.interfaces.workflow import WorkflowCancelledError
+from preswald.utils import read_cache_config, reactivity_explicitly_disabled
 
 
 logger = logging.getLogger(__name__)
 
+# Output stream of the script running in the current context. Scripts from several
+# sessions may run concurrently on worker threads, so stdout is routed per context
+# rather than by swapping `sys.stdout` for the whole process.
+_output_stream: ContextVar[Any] = ContextVar("preswald_output_stream", default=None)
+
+# Scripts are executed from their own directory. All sessions run the same script,
+# so the working directory is entered by the first concurrent run and restored by the last.
+_working_dir_lock = threading.Lock()
+_working_dir_refcount = 0
+_working_dir_restore: str | None = None
+
+
+class _ContextStdout:
+    """`sys.stdout` proxy that forwards to the output stream of the current context."""
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+
+    def _target(self):
+        return _output_stream.get() or self._fallback
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+
+@contextmanager
+def _script_working_dir(script_dir: str):
+    global _working_dir_refcount, _working_dir_restore
+    with _working_dir_lock:
+        if _working_dir_refcount == 0:
+            _working_dir_restore = os.getcwd()
+            os.chdir(script_dir)
+        _working_dir_refcount += 1
+    try:
+        yield
+    finally:
+        with _working_dir_lock:
+            _working_dir_refcount -= 1
+            if _working_dir_refcount == 0 and _working_dir_restore:
+                os.chdir(_working_dir_restore)
+                _working_dir_restore = None
+
 
 class ScriptState(Enum):
     """Manages the state of a running script."""
@@ -34,27 +88,37 @@ class ScriptRunner:
         session_id: str,
         send_message_callback: Callable,
         initial_states: dict | None = None,
+        layout_patches: bool = False,
     ):
         """Initialize the ScriptRunner with enhanced state management.
 
         Args:
             session_id: Unique identifier for this session
             send_message_callback: Async callback to send messages to frontend
-            initial_states: Initial widget states if any
+            initial_states: Initial widget states if any, layered over the service defaults
+            layout_patches: Whether the frontend applies `layout_patch` messages, in
+                which case only changed components are sent after the first render
         """
         self.session_id = session_id
         self._send_message_callback = send_message_callback
+        self._layout = LayoutDiffer() if layout_patches else None
         self.script_path: str | None = None
-        self.widget_states = initial_states or {}
         self._state = ScriptState.INITIAL
-        self._last_run_time = 0
         self._run_count = 0
         self._lock = threading.Lock()
         self._script_globals = {}
+        self._executor = get_execution_backend()
+        self.scheduler = RerunScheduler(self.rerun)
 
         from .service import PreswaldService # deferred import to avoid cyclic dependency
         self._service = PreswaldService.get_instance()
 
+        # Each runner executes against its own isolated workflow, layout and widget state
+        self.session = self._service.create_session(session_id)
+        if initial_states:
+            self.session.set_widget_states(initial_states)
+        self.widget_states = self.session.widget_states
+
         logger.info(f"[ScriptRunner] Initialized with session_id: {session_id}")
         if initial_states:
             logger.info(f"[ScriptRunner] Loaded initial states: {initial_states}")
@@ -66,6 +130,49 @@ class ScriptRunner:
         except Exception as e:
             logger.error(f"[ScriptRunner] Error sending message: {e}")
 
+    async def send_components(self, components: dict, errors: list, full: bool = False):
+        """
+        Send the rendered layout to the frontend.
+
+        Clients supporting layout patches get only what changed since the last
+        layout they received. Errors are always sent with the full layout.
+
+        Args:
+            components: The layout, as returned by `get_rendered_components`
+            errors: Transform errors to report along with the layout
+            full: Send the full layout even if the client supports patches
+        """
+        dirty_rows = self._service.take_layout_changes()
+        if self._layout is not None and not errors and not full:
+            patch = self._layout.diff(components.get("rows", []), dirty_rows)
+            if patch is not None:
+                if LayoutDiffer.is_empty(patch):
+                    logger.info("[ScriptRunner] Layout unchanged. Nothing to send")
+                    return
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        f"[ScriptRunner] Sending layout patch version={patch['version']} "
+                        f"changed={list(patch['components'])} removed={patch['removed']}"
+                    )
+                await self.send_message(patch)
+                return
+
+        message = {
+            "type": "errors:result" if len(errors) else "components",
+            "errors": errors or [],
+            "components": components or [],
+        }
+        if self._layout is not None:
+            message["version"] = self._layout.snapshot(components.get("rows", []))
+        await self.send_message(message)
+
+    async def resend_layout(self):
+        """Send the full current layout, e.g. when the frontend lost track of patches."""
+        logger.info(f"[ScriptRunner] Resending full layout {self.session_id=}")
+        components = self._service.get_rendered_components()
+        errors = self._service.get_errors(filename=self.script_path)
+        await self.send_components(components, errors, full=True)
+
     @property
     def is_running(self) -> bool:
         """Thread-safe check if script is running."""
@@ -91,10 +198,13 @@ class ScriptRunner:
             self._state = ScriptState.RUNNING
             self._run_count = 0
 
-        if reactivity_explicitly_disabled():
-           self._service.disable_reactivity()
-        else:
-            logger.info("[ScriptRunner] Reactivity is disabled by configuration")
+        with self.session.activate():
+            if reactivity_explicitly_disabled():
+               self._service.disable_reactivity()
+            else:
+                logger.info("[ScriptRunner] Reactivity is disabled by configuration")
+
+        self._configure_caches()
 
         try:
             await self.run_script()
@@ -108,12 +218,42 @@ class ScriptRunner:
             logger.info(f"[ScriptRunner] Stopping script for session {self.session_id}")
 
             self._state = ScriptState.STOPPED
+            await self.scheduler.close()
             logger.info(f"[ScriptRunner] Script stopped for session {self.session_id}")
         except Exception as e:
             logger.error(f"[ScriptRunner] Error stopping script: {e}")
             raise
 
-    async def rerun(self, new_widget_states: dict[str, Any] | None = None):
+    def schedule_rerun(self, new_widget_states: dict[str, Any]) -> asyncio.Future:
+        """
+        Queue a rerun for updated widget state on this session's latest-wins scheduler.
+
+        States submitted while a rerun is pending are merged, and an in-flight rerun
+        made obsolete by newer state is abandoned at the next atom boundary.
+
+        Returns:
+            A future resolved once a rerun including these states has completed.
+        """
+        return self.scheduler.submit(new_widget_states)
+
+    async def rerun(
+        self,
+        new_widget_states: dict[str, Any] | None = None,
+        should_cancel: Callable[[], bool] | None = None,
+    ):
+        """
+        Rerun the script in response to updated widget state, within this runner's session.
+
+        See `_rerun` for details.
+        """
+        with self.session.activate():
+            return await self._rerun(new_widget_states, should_cancel=should_cancel)
+
+    async def _rerun(
+        self,
+        new_widget_states: dict[str, Any] | None = None,
+        should_cancel: Callable[[], bool] | None = None,
+    ):
         """
         Rerun the script in response to updated widget state.
 
@@ -124,13 +264,10 @@ class ScriptRunner:
 
         Args:
             new_widget_states (dict[str, Any] | None): Updated component states (by ID).
+            should_cancel (Callable[[], bool] | None): Polled before each atom; when it
+                returns True the rerun stops and `WorkflowCancelledError` propagates.
         """
-
-        # Basic debouncing - skip if last run was too recent
         current_time = time.time()
-        if current_time - self._last_run_time < 0.1:
-            logger.info("[ScriptRunner] Skipping rerun due to debounce")
-            return
 
         if not new_widget_states:
             logger.info("[ScriptRunner] No new states for rerun")
@@ -148,7 +285,6 @@ class ScriptRunner:
                     if logger.isEnabledFor(logging.DEBUG):
                         logger.debug(f"[ScriptRunner] Updated state: {component_id=} -> {value=} (was {old_value=})")
                 self._run_count += 1
-                self._last_run_time = current_time
 
             # determine affected components and force recomputation
             changed_component_ids = set(new_widget_states.keys())
@@ -192,8 +328,16 @@ class ScriptRunner:
                 logger.debug(f"[ScriptRunner] Rerun using DAG reactivity with {len(affected_atoms)} affected atoms")
                 logger.debug(f"[ScriptRunner] {changed_atoms=}, {affected_atoms=}")
 
-            self._service.force_recompute(affected_atoms)
-            results = workflow.execute(recompute_atoms=affected_atoms)
+            # Only the producers of changed widgets are forced; other affected atoms
+            # are skipped by the workflow cache unless their inputs changed.
+            results = await self._executor.run(
+                workflow.execute,
+                recompute_atoms=changed_atoms,
+                should_cancel=should_cancel,
+                timeout=self._executor.rerun_timeout,
+            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"[ScriptRunner] Atom cache stats {workflow.cache.stats()}")
 
             # Ensure layout rendering happens for all atoms
             for atom_name, result in results.items():
@@ -204,6 +348,10 @@ class ScriptRunner:
                             hasattr(value, "_preswald_component_type")  # identifies a component created by with_render_tracking
                             or (isinstance(value, dict) and "type" in value)  # fallback safety
                         ):
+                            component = getattr(value, "_preswald_component", value)
+                            if isinstance(component, dict) and component.get("shouldRender") is False:
+                                # unchanged since it was last rendered, and still in the layout
+                                continue
                             self._service.append_component(value)
                         else:
                             logger.info(f"[ScriptRunner] Skipping non-component value for {atom_name=}")
@@ -214,14 +362,9 @@ class ScriptRunner:
             logger.info(f"[ScriptRunner] Rendered {len(components)} components (rerun)")
 
             errors = self._service.get_errors(filename=self.script_path)
-            message_type = "errors:result" if len(errors) else "components"
 
             if len(components) or len(errors):
-                await self.send_message({
-                    "type": message_type,
-                    "errors": errors or [],
-                    "components": components or []
-                })
+                await self.send_components(components, errors)
                 if logger.isEnabledFor(logging.DEBUG):
                     logger.debug(f"[ScriptRunner] Sent components to frontend {components=}")
                 else:
@@ -230,6 +373,9 @@ class ScriptRunner:
             logger.info(f"[ScriptRunner] Rerun completed in {time.time() - current_time:.2f}s (total)")
             workflow.debug_print_dag()
 
+        except WorkflowCancelledError:
+            logger.info("[ScriptRunner] Rerun superseded by newer widget state")
+            raise
         except Exception as e:
             error_msg = f"Error updating widget states: {e!s}"
             logger.error(f"[ScriptRunner] {error_msg}", exc_info=True)
@@ -258,10 +404,23 @@ class ScriptRunner:
         logger.debug("[ScriptRunner] Setting up stdout redirection")
 
         class PreswaldOutputStream:
-            def __init__(self, callback):
+            def __init__(self, callback, loop):
                 self.callback = callback
                 self.buffer = ""
                 self._lock = threading.Lock()
+                self._loop = loop
+
+            def _emit(self, message):
+                # Scripts may write from an executor thread; hand the send back to the loop
+                coro = self.callback(message)
+                try:
+                    running_loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    running_loop = None
+                if running_loop is self._loop:
+                    asyncio.create_task(coro)  # noqa: RUF006
+                else:
+                    asyncio.run_coroutine_threadsafe(coro, self._loop)
 
             def write(self, text):
                 with self._lock:
@@ -272,11 +431,7 @@ class ScriptRunner:
                             if line.strip():
                                 if logger.isEnabledFor(logging.DEBUG):
                                     logger.debug(f"[ScriptRunner] Captured output: {line}")
-                                asyncio.create_task(  # noqa: RUF006
-                                    self.callback(
-                                        {"type": "output", "content": line + "\n"}
-                                    )
-                                )
+                                self._emit({"type": "output", "content": line + "\n"})
                         self.buffer = lines[-1]
 
             def flush(self):
@@ -287,21 +442,19 @@ class ScriptRunner:
                                 logger.debug(
                                     f"[ScriptRunner] Flushing output: {self.buffer}"
                                 )
-                            asyncio.create_task(  # noqa: RUF006
-                                self.callback(
-                                    {"type": "output", "content": self.buffer}
-                                )
-                            )
+                            self._emit({"type": "output", "content": self.buffer})
                         self.buffer = ""
 
-        old_stdout = sys.stdout
-        output_stream = PreswaldOutputStream(self.send_message)
-        sys.stdout = output_stream
+        if not isinstance(sys.stdout, _ContextStdout):
+            sys.stdout = _ContextStdout(sys.stdout)
+
+        output_stream = PreswaldOutputStream(self.send_message, asyncio.get_running_loop())
+        token = _output_stream.set(output_stream)
         try:
             yield
         finally:
             output_stream.flush()
-            sys.stdout = old_stdout
+            _output_stream.reset(token)
             logger.debug("[ScriptRunner] Restored stdout")
 
     def run_sync(self, script_path: str):
@@ -311,11 +464,43 @@ class ScriptRunner:
         self.script_path = script_path
         self._state = ScriptState.RUNNING
         self._run_count = 1
+        self._configure_caches()
 
         # block on the async `run_script()` method
         asyncio.run(self.run_script())
 
+    def _configure_caches(self):
+        """Point the shared transform and atom result caches at the on-disk directory from preswald.toml, if enabled."""
+        cache_config = read_cache_config()
+        cache_dir = None
+        if self.script_path:
+            script_dir = os.path.dirname(os.path.realpath(self.script_path))
+            cache_dir = os.path.join(script_dir, cache_config["directory"])
+
+        disk_dir = cache_dir if cache_config.get("disk") else None
+        get_transform_cache().set_disk_dir(disk_dir)
+        get_transform_cache().set_snapshot_dags(bool(cache_config.get("dag_snapshots")))
+        get_transform_cache().set_max_entries(int(cache_config["transforms_max_entries"]))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[ScriptRunner] Transform cache configured {disk_dir=}")
+
+        atoms_dir = os.path.join(cache_dir, "atoms") if cache_dir and cache_config.get("atoms") else None
+        get_disk_result_cache().configure(
+            atoms_dir,
+            max_bytes=int(float(cache_config["atoms_max_mb"]) * 1024 * 1024),
+            min_seconds=float(cache_config["atoms_min_seconds"]),
+        )
+
     async def run_script(self):
+        """
+        Execute the user script within this runner's session.
+
+        See `_run_script` for details.
+        """
+        with self.session.activate():
+            return await self._run_script()
+
+    async def _run_script(self):
         """
         Execute the user script with a clean workflow state, AST transformation,
         dependency tracking, and final component collection.
@@ -343,56 +528,72 @@ class ScriptRunner:
             # Prepare script execution environment
             self._script_globals = {"widget_states": self.widget_states}
 
-            # Capture script output
-            with self._redirect_stdout():
-                with open(self.script_path, encoding="utf-8") as f:
-                    raw_code = f.read()
+            with open(self.script_path, encoding="utf-8") as f:
+                raw_code = f.read()
 
-                current_working_dir = os.getcwd()
-                script_dir = os.path.dirname(os.path.realpath(self.script_path))
-                os.chdir(script_dir)
+            script_dir = os.path.dirname(os.path.realpath(self.script_path))
 
-                def compile_and_run(src_code, script_path, script_globals, execution_context):
-                    code = compile(src_code, script_path, "exec")
-                    logger.debug(f"[ScriptRunner] Script compiled {script_path=}")
-                    exec(code, script_globals)
-                    logger.debug(f"[ScriptRunner] Script executed {execution_context}")
+            def compile_and_run(src_code, script_path, script_globals, execution_context):
+                code = compile(src_code, script_path, "exec")
+                logger.debug(f"[ScriptRunner] Script compiled {script_path=}")
+                exec(code, script_globals)
+                logger.debug(f"[ScriptRunner] Script executed {execution_context}")
 
-                try:
-                    if self._service.is_reactivity_enabled:
-                        # Attempt reactive transformation
-                        tree, _ = transform_source(raw_code, filename=self.script_path)
-                        self._script_globals["workflow"] = workflow
-                        if tree:
-                            compile_and_run(tree, self.script_path, self._script_globals, "(reactive)")
-                            workflow.execute_relevant_atoms()
-                    else:
-                        compile_and_run(raw_code, self.script_path, self._script_globals, "(non-reactive)")
-                        workflow.reset() # just to be safe
-
-                except Exception as transform_error:
-                    if logger.isEnabledFor(logging.WARNING):
-                        logger.warning(
-                            "[ScriptRunner] AST transform or reactive execution failed. Falling back to full script rerun\n%s",
-                            traceback.format_exc()
-                        )
-
-                    self._service.disable_reactivity()
-                    workflow.reset()
-                    self._service.clear_components()
-                    self._script_globals = {
-                        "__file__": self.script_path,
-                        "workflow": workflow,
-                        "widget_states": self.widget_states,
-                    }
+            def execute_script():
+                with _script_working_dir(script_dir):
                     try:
-                        compile_and_run(raw_code, self.script_path, self._script_globals, "(fallback, non-reactive)")
-                    except Exception as e:
-                        logger.error('[ScriptRunner] Full script rerun fallback failed', traceback.format_exc() );
-                        if not self._service.has_errors():
-                            raise e
+                        if self._service.is_reactivity_enabled:
+                            # Attempt reactive transformation, reusing a cached transform of identical source
+                            transform_cache = get_transform_cache()
+                            transformed = transform_cache.get_or_transform(raw_code, filename=self.script_path)
+                            self._script_globals["workflow"] = workflow
+                            snapshot = transformed.snapshot if transform_cache.snapshot_dags else None
+                            if snapshot is not None:
+                                # Same transformed script as an earlier session: restore its DAG
+                                # instead of re-running the module to re-register every atom
+                                workflow.restore(snapshot, self._script_globals)
+                                # one pass over the restored DAG runs every atom, the
+                                # top-level ones included
+                                workflow.execute()
+                                logger.debug("[ScriptRunner] Script executed (restored DAG)")
+                            elif transformed.code:
+                                exec(transformed.code, self._script_globals)
+                                logger.debug("[ScriptRunner] Script executed (reactive)")
+                                workflow.execute_relevant_atoms()
+                                # only an error-free run is a safe template for other sessions
+                                if transform_cache.snapshot_dags and not workflow.has_failures():
+                                    transformed.snapshot = workflow.snapshot(
+                                        self._script_globals, session_names=("widget_states",)
+                                    )
+                        else:
+                            compile_and_run(raw_code, self.script_path, self._script_globals, "(non-reactive)")
+                            workflow.reset() # just to be safe
+
+                    except Exception as transform_error:
+                        if logger.isEnabledFor(logging.WARNING):
+                            logger.warning(
+                                "[ScriptRunner] AST transform or reactive execution failed. Falling back to full script rerun\n%s",
+                                traceback.format_exc()
+                            )
 
-                os.chdir(current_working_dir)
+                        self._service.disable_reactivity()
+                        workflow.reset()
+                        self._service.clear_components()
+                        self._script_globals = {
+                            "__file__": self.script_path,
+                            "workflow": workflow,
+                            "widget_states": self.widget_states,
+                        }
+                        try:
+                            compile_and_run(raw_code, self.script_path, self._script_globals, "(fallback, non-reactive)")
+                        except Exception as e:
+                            logger.error('[ScriptRunner] Full script rerun fallback failed', traceback.format_exc() );
+                            if not self._service.has_errors():
+                                raise e
+
+            # Capture script output and run the script off the event loop
+            with self._redirect_stdout():
+                await self._executor.run(execute_script)
 
             # Collect and process rendered components
             components = self._service.get_rendered_components()
@@ -414,14 +615,9 @@ class ScriptRunner:
                         continue
 
             errors = self._service.get_errors(filename=self.script_path)
-            message_type = "errors:result" if len(errors) else "components"
 
             if (components and row_count) or len(errors):
-                await self.send_message({
-                    "type": message_type,
-                    "errors": errors or [],
-                    "components": components or []
-                })
+                await self.send_components(components, errors)
                 if logger.isEnabledFor(logging.DEBUG):
                     logger.debug(f"[ScriptRunner] Components sent to frontend {components=}")
             workflow.debug_print_dag()
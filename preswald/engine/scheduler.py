@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from preswald.interfaces.workflow import WorkflowCancelledError
+
+
+logger = logging.getLogger(__name__)
+
+
+class RerunScheduler:
+    """
+    Per-session, latest-wins scheduler for widget-driven reruns.
+
+    Widget states submitted while a rerun is pending are merged into a single
+    batch, later values overwriting earlier ones, so the session always runs
+    the newest merged state exactly once. When new states arrive while a
+    rerun is in flight, that rerun is asked to stop at the next atom boundary
+    and its states are requeued underneath the newer ones.
+
+    Attributes:
+        submitted (int): Number of state batches submitted.
+        coalesced (int): Submissions merged into an already pending batch.
+        runs (int): Reruns that completed.
+        cancelled (int): In-flight reruns abandoned in favor of newer state.
+    """
+
+    def __init__(self, run: Callable[[dict[str, Any], Callable[[], bool]], Awaitable[Any]]):
+        """
+        Args:
+            run: Coroutine function executing one rerun. It receives the merged widget
+                states and a `should_cancel` callable to poll at atom boundaries, and
+                raises `WorkflowCancelledError` if it stopped early.
+        """
+        self._run = run
+        self._pending: dict[str, Any] = {}
+        self._pending_waiters: list[asyncio.Future] = []
+        self._task: asyncio.Task | None = None
+        self._in_flight = False
+        self._cancel_requested = False
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.runs = 0
+        self.cancelled = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of submissions waiting for a rerun that has not started yet."""
+        return len(self._pending_waiters)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queue_depth": self.queue_depth,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "runs": self.runs,
+            "cancelled": self.cancelled,
+        }
+
+    def should_cancel(self) -> bool:
+        """Polled by the running rerun; True once newer state has superseded it."""
+        return self._cancel_requested
+
+    def submit(self, states: dict[str, Any]) -> asyncio.Future:
+        """
+        Queue widget states for a rerun.
+
+        Returns:
+            A future resolved once a rerun including these states has completed.
+        """
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+
+        self.submitted += 1
+        if self._pending_waiters:
+            self.coalesced += 1
+        self._pending.update(states)
+        self._pending_waiters.append(waiter)
+
+        if self._in_flight:
+            self._cancel_requested = True
+
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._drain())
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[RerunScheduler] Submitted states {list(states)} {self.stats()=}")
+        return waiter
+
+    async def _drain(self):
+        while self._pending_waiters:
+            states, waiters = self._pending, self._pending_waiters
+            self._pending, self._pending_waiters = {}, []
+            self._cancel_requested = False
+            self._in_flight = True
+
+            try:
+                await self._run(states, self.should_cancel)
+            except WorkflowCancelledError:
+                self.cancelled += 1
+                # newer pending values win over the abandoned batch
+                self._pending = {**states, **self._pending}
+                self._pending_waiters = waiters + self._pending_waiters
+                logger.info(f"[RerunScheduler] Superseded rerun cancelled {self.stats()=}")
+                continue
+            except asyncio.CancelledError:
+                for waiter in waiters:
+                    waiter.cancel()
+                raise
+            except Exception as e:
+                logger.error(f"[RerunScheduler] Rerun failed: {e}", exc_info=True)
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+                        # mark retrieved for fire-and-forget submitters
+                        waiter.exception()
+                continue
+            finally:
+                self._in_flight = False
+
+            self.runs += 1
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+            logger.info(f"[RerunScheduler] Rerun complete {self.stats()=}")
+
+    async def close(self):
+        """Cancel any queued or in-flight rerun."""
+        self._cancel_requested = True
+        for waiter in self._pending_waiters:
+            if not waiter.done():
+                waiter.cancel()
+        self._pending, self._pending_waiters = {}, []
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
@@ -71,13 +71,7 @@ class ServerPreswaldService(BasePreswaldService):
                 connection_list.append(connection_info)
 
             # Broadcast to all connected clients
-            for websocket in self.websocket_connections.values():
-                try:
-                    await websocket.send_json(
-                        {"type": "connections_update", "connections": connection_list}
-                    )
-                except Exception as e:
-                    logger.error(f"Error sending connection update to client: {e}")
+            await self._broadcast({"type": "connections_update", "connections": connection_list})
 
         except Exception as e:
             logger.error(f"Error broadcasting connections: {e}")
@@ -0,0 +1,120 @@
+import logging
+from collections import ChainMap
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from preswald.engine.executor import get_execution_backend
+from preswald.engine.result_cache import get_disk_result_cache, get_shared_result_cache
+from preswald.engine.utils import RenderBuffer
+from preswald.interfaces.workflow import Workflow
+
+from .managers.layout import LayoutManager
+
+
+logger = logging.getLogger(__name__)
+
+# The session whose script is executing in the current context. Set by the
+# ScriptRunner around script execution and by the service around client messages.
+_current_session: ContextVar["Session | None"] = ContextVar("preswald_session", default=None)
+
+# The atom executing in the current context. Atoms of one session may run
+# concurrently on several threads, each in its own copy of the context.
+_current_atom: ContextVar["str | None"] = ContextVar("preswald_current_atom", default=None)
+
+# When set, components appended in the current context are collected here instead of
+# going straight to the layout (see `Session.capture_components`).
+_component_sink: ContextVar["list | None"] = ContextVar("preswald_component_sink", default=None)
+
+
+class Session:
+    """
+    Per-client execution state.
+
+    Each connected client gets its own workflow DAG, layout, render buffer and
+    widget state, so reruns in one session never reset or overwrite another
+    session's state. Widget state is an overlay on top of the service-wide
+    defaults: reads fall through to the shared defaults, writes only ever land
+    in the session's own layer.
+
+    Attributes:
+        session_id (str): Identifier of the client owning this session.
+        workflow (Workflow): The session's DAG of atoms.
+        layout_manager (LayoutManager): Rows of rendered components for this session.
+        render_buffer (RenderBuffer): Render diffing state for this session.
+        widget_states (ChainMap): Session widget values layered over shared defaults.
+        current_atom (str | None): Atom executing in the current context.
+        reactivity_enabled (bool): False once this session fell back to full reruns.
+    """
+
+    def __init__(self, session_id: str, service: Any, shared_states: dict[str, Any] | None = None):
+        self.session_id = session_id
+        backend = get_execution_backend()
+        self.workflow = Workflow(
+            service=service,
+            executor=backend.atom_executor(),
+            atom_timeout=backend.atom_timeout,
+            precise_recompute=backend.precise_recompute,
+            result_stores=[
+                store for store in (get_shared_result_cache(), get_disk_result_cache()) if store is not None
+            ],
+        )
+        self.layout_manager = LayoutManager()
+        self.render_buffer = RenderBuffer()
+        self.widget_states: ChainMap = ChainMap({}, shared_states if shared_states is not None else {})
+        self.reactivity_enabled = True
+
+    @property
+    def current_atom(self) -> str | None:
+        return _current_atom.get()
+
+    @contextmanager
+    def active_atom(self, atom_name: str | None):
+        """Mark `atom_name` as the atom executing in the current context."""
+        token = _current_atom.set(atom_name)
+        try:
+            yield
+        finally:
+            _current_atom.reset(token)
+
+    @contextmanager
+    def capture_components(self):
+        """Collect components appended in the current context into a list instead of the layout."""
+        components: list = []
+        token = _component_sink.set(components)
+        try:
+            yield components
+        finally:
+            _component_sink.reset(token)
+
+    @property
+    def component_sink(self) -> list | None:
+        return _component_sink.get()
+
+    @contextmanager
+    def activate(self):
+        """Make this session the current one for the duration of the block."""
+        token = _current_session.set(self)
+        try:
+            yield self
+        finally:
+            _current_session.reset(token)
+
+    def set_widget_states(self, states: dict[str, Any]):
+        """Write widget values into this session's overlay, leaving shared defaults untouched."""
+        self.widget_states.maps[0].update(states)
+
+    def close(self):
+        """Release the session's layout and DAG."""
+        self.layout_manager.clear_layout()
+        self.workflow.reset()
+        self.widget_states.maps[0].clear()
+        logger.info(f"[Session] Closed session {self.session_id=}")
+
+    def __repr__(self):
+        return f"Session(session_id={self.session_id!r})"
+
+
+def get_current_session() -> "Session | None":
+    """Return the session active in the current context, if any."""
+    return _current_session.get()
@@ -0,0 +1,253 @@
+import hashlib
+import importlib.util
+import logging
+import marshal
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from importlib.metadata import PackageNotFoundError, version
+from types import CodeType
+
+from preswald.engine.transformers.reactive_runtime import replay_registry_calls, transform_source
+from preswald.interfaces import components
+from preswald.interfaces.render.error_registry import get_errors, register_error
+from preswald.interfaces.render.registry import registry_fingerprint
+from preswald.interfaces.workflow import DagSnapshot
+
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the output of `transform_source` changes shape for the same input,
+# so that stale on-disk entries are never replayed by a newer transformer.
+TRANSFORM_SCHEMA_VERSION = 3
+
+try:
+    _PRESWALD_VERSION = version("preswald")
+except PackageNotFoundError:
+    _PRESWALD_VERSION = "unknown"
+
+
+@dataclass
+class TransformCacheEntry:
+    """
+    Result of transforming and compiling a single script.
+
+    Attributes:
+        key: Content hash the entry is stored under.
+        code: Compiled code object for the transformed module, or None if the
+            transform failed.
+        atoms: Atom names generated by the transformer.
+        errors: `ast_transform` errors registered while transforming, replayed
+            on every cache hit so the frontend sees the same diagnostics.
+        registry_calls: Registry calls the transformer applied statically,
+            replayed when the entry is loaded from disk so a warm start has the
+            same renderers and resolvers as a fresh transform.
+        snapshot: DAG registered by the first successful run of `code`, which
+            later sessions restore instead of executing the module again. Only
+            kept in memory, and only when DAG snapshots are enabled.
+    """
+
+    key: str
+    code: CodeType | None
+    atoms: list[str] = field(default_factory=list)
+    errors: list[dict] = field(default_factory=list)
+    registry_calls: list[tuple[str, tuple, dict]] = field(default_factory=list)
+    snapshot: DagSnapshot | None = None
+
+    def replay_errors(self):
+        for error in self.errors:
+            register_error(**error)
+
+
+class TransformCache:
+    """
+    Content-addressed cache for AST-transformed and compiled user scripts.
+
+    Entries are keyed by a hash of the script source, its filename, the preswald
+    version, the Python bytecode magic number, the known component set and the
+    render registry. The most recently used `max_entries` entries are kept in
+    memory and, when a disk directory is configured, every entry is also written
+    as a marshalled code object so that restarts are warm.
+
+    With `snapshot_dags` enabled, entries also carry a snapshot of the DAG their
+    code registers, so new sessions skip executing the module top level.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, disk_dir: str | None = None, max_entries: int = 64):
+        self._entries: OrderedDict[str, TransformCacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_dir = disk_dir
+        self.max_entries = max_entries
+        self.snapshot_dags = False
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def get_instance(cls) -> "TransformCache":
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def set_disk_dir(self, disk_dir: str | None):
+        self._disk_dir = disk_dir
+
+    def set_max_entries(self, max_entries: int):
+        with self._lock:
+            self.max_entries = max_entries
+            self._evict()
+
+    def set_snapshot_dags(self, enabled: bool):
+        self.snapshot_dags = enabled
+        if not enabled:
+            with self._lock:
+                for entry in self._entries.values():
+                    entry.snapshot = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def compute_key(self, source: str, filename: str) -> str:
+        known_components = sorted(
+            name
+            for name in dir(components)
+            if getattr(getattr(components, name, None), "_preswald_component_type", None) is not None
+        )
+        hasher = hashlib.sha256()
+        for part in (
+            str(TRANSFORM_SCHEMA_VERSION),
+            _PRESWALD_VERSION,
+            importlib.util.MAGIC_NUMBER.hex(),
+            os.path.abspath(filename),
+            ",".join(known_components),
+            registry_fingerprint(),
+            source,
+        ):
+            hasher.update(part.encode("utf-8"))
+            hasher.update(b"\0")
+        return hasher.hexdigest()
+
+    def get_or_transform(self, source: str, filename: str) -> TransformCacheEntry:
+        """
+        Return the cached transform for `source`, transforming and compiling it on a miss.
+
+        Transform errors are captured into the entry and replayed on later hits.
+        """
+        key = self.compute_key(source, filename)
+
+        entry = self._get(key)
+        if entry is not None:
+            self.hits += 1
+            logger.info(f"[TransformCache] Hit {filename=} key={key[:12]}")
+            entry.replay_errors()
+            return entry
+
+        self.misses += 1
+        logger.info(f"[TransformCache] Miss {filename=} key={key[:12]}")
+
+        registry_calls: list[tuple[str, tuple, dict]] = []
+        tree, atoms = transform_source(source, filename=filename, registry_calls=registry_calls)
+        code = compile(tree, filename, "exec") if tree else None
+        errors = [
+            {k: v for k, v in error.items() if k != "count"}
+            for error in get_errors(type="ast_transform")
+            if error.get("filename") == filename
+        ]
+        entry = TransformCacheEntry(
+            key=key, code=code, atoms=list(atoms), errors=errors, registry_calls=registry_calls
+        )
+        self._put(key, entry)
+
+        # The transformer statically applies registry calls found in the script, which
+        # changes the registry fingerprint. Store the entry under the post-transform key
+        # as well so the next client in this process hits immediately.
+        post_key = self.compute_key(source, filename)
+        if post_key != key:
+            self._put(post_key, entry)
+
+        return entry
+
+    def _get(self, key: str) -> TransformCacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._load_from_disk(key)
+        if entry is not None:
+            # the transformer's static registry calls did not run in this process
+            replay_registry_calls(entry.registry_calls)
+            with self._lock:
+                self._entries[key] = entry
+                self._evict()
+        return entry
+
+    def _put(self, key: str, entry: TransformCacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+        self._write_to_disk(key, entry)
+
+    def _evict(self):
+        """Drop least recently used entries beyond `max_entries`. Callers hold `_lock`."""
+        while len(self._entries) > max(self.max_entries, 0):
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str | None:
+        if not self._disk_dir:
+            return None
+        return os.path.join(self._disk_dir, "transforms", f"{key}.bin")
+
+    def _load_from_disk(self, key: str) -> TransformCacheEntry | None:
+        path = self._disk_path(key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                payload = pickle.load(f)
+            code = marshal.loads(payload["code"]) if payload["code"] is not None else None
+            logger.debug(f"[TransformCache] Loaded entry from disk {path=}")
+            return TransformCacheEntry(
+                key=key,
+                code=code,
+                atoms=payload["atoms"],
+                errors=payload["errors"],
+                registry_calls=payload["registry_calls"],
+            )
+        except Exception as e:
+            logger.warning(f"[TransformCache] Ignoring unreadable cache entry {path}: {e}")
+            return None
+
+    def _write_to_disk(self, key: str, entry: TransformCacheEntry):
+        path = self._disk_path(key)
+        if not path or os.path.exists(path):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            payload = {
+                "code": marshal.dumps(entry.code) if entry.code is not None else None,
+                "atoms": entry.atoms,
+                "errors": entry.errors,
+                "registry_calls": entry.registry_calls,
+            }
+            # write to a temp file first so concurrent readers never see a partial entry
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            logger.debug(f"[TransformCache] Wrote entry to disk {path=}")
+        except Exception as e:
+            logger.warning(f"[TransformCache] Could not write cache entry {path}: {e}")
+
+
+def get_transform_cache() -> TransformCache:
+    return TransformCache.get_instance()
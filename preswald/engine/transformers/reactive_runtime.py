@@ -77,6 +77,8 @@ class AutoAtomTransformer(ast.NodeTransformer):
         self._variable_class_map = {}
         self._module: ast.Module | None = None
         self._used_display_renderer_fns: set[str] = set()
+        # registry calls applied while transforming, as (registrar name, args, kwargs)
+        self.registry_calls: list[tuple[str, tuple, dict]] = []
 
         try:
             with open(filename) as f:
@@ -110,6 +112,7 @@ class AutoAtomTransformer(ast.NodeTransformer):
         self._variable_class_map = {}
         self._module: ast.Module | None = None
         self._used_display_renderer_fns: set[str] = set()
+        self.registry_calls = []
 
     def _safe_register_error(self,
         *,
@@ -481,8 +484,17 @@ class AutoAtomTransformer(ast.NodeTransformer):
             *,
             return_target: str | list[str] | tuple[str, ...] | ast.expr | None = None,
             callsite_node: ast.AST | None = None,
+            side_effects: bool = False,
         ) -> ast.FunctionDef:
-        func = self._build_atom_function(atom_name, component_id, callsite_deps, call_expr, return_target=return_target, callsite_node=callsite_node)
+        func = self._build_atom_function(
+            atom_name,
+            component_id,
+            callsite_deps,
+            call_expr,
+            return_target=return_target,
+            callsite_node=callsite_node,
+            side_effects=side_effects,
+        )
         if func is not None:
             self._finalize_atom_deps(func)
             self._current_frame.generated_atoms.append(func)
@@ -831,7 +843,7 @@ class AutoAtomTransformer(ast.NodeTransformer):
 
             component_id, atom_name = self.generate_component_and_atom_name("sideeffect", stmt)
             atom_body = [ast.Expr(value=patched_call)]
-            self._finalize_and_register_atom(atom_name, component_id, callsite_deps, atom_body, callsite_node=stmt)
+            self._finalize_and_register_atom(atom_name, component_id, callsite_deps, atom_body, callsite_node=stmt, side_effects=True)
             logger.debug('[AST] lifted side effect statement into atom %s -> %s', component_id, atom_name)
 
         except Exception as e:
@@ -1106,7 +1118,8 @@ class AutoAtomTransformer(ast.NodeTransformer):
                 deps,
                 [patched_stmt],
                 return_target=return_target,
-                callsite_node=stmt
+                callsite_node=stmt,
+                side_effects=True,
             )
             logger.info("[AST] lifted subscript assignment into atom %s -> %s", component_id, new_atom_name)
             return
@@ -1502,6 +1515,9 @@ class AutoAtomTransformer(ast.NodeTransformer):
                         compiled = compile(lambda_code, filename="<resolver>", mode="eval")
                         resolver_fn = eval(compiled, {"__builtins__": __builtins__})  # only eval the lambda
                         register_display_dependency_resolver(func_name, resolver_fn)  # then call actual registrar
+                        self.registry_calls.append(
+                            ("register_display_dependency_resolver", (func_name, ast.unparse(resolver_node)), {})
+                        )
                         logger.debug(f"[AST] Registered display dependency resolver for {func_name=}")
                     except Exception as e:
                         source_text = ast.unparse(stmt)
@@ -1867,9 +1883,13 @@ class AutoAtomTransformer(ast.NodeTransformer):
                                 f"[AST] No component registered for mimetype={mimetype!r}, defaulting to 'generic'"
                             )
                             register_mimetype_component_type(mimetype, component_type="generic")
+                            self.registry_calls.append(
+                                ("register_mimetype_component_type", (mimetype,), {"component_type": "generic"})
+                            )
 
                 registrar = known_registrars[func_name]
                 registrar(*args, **kwargs)
+                self.registry_calls.append((func_name, tuple(args), kwargs))
                 logger.debug(f"[AST] Applied static registry call: {func_name}(*{args}, **{kwargs})")
 
             except Exception as e:
@@ -2465,6 +2485,7 @@ class AutoAtomTransformer(ast.NodeTransformer):
         *,
         return_target: str | list[str] | tuple[str, ...] | ast.expr | None = None,
         callsite_node: ast.AST | None = None,
+        side_effects: bool = False,
     ) -> ast.FunctionDef:
         """
         Constructs a reactive atom function from a lifted expression or component call.
@@ -2473,7 +2494,8 @@ class AutoAtomTransformer(ast.NodeTransformer):
         - Accept `param0`, `param1`, ... as arguments for each reactive dependency
         - Wrap the normalized expression(s) in a function body
         - Return the computed value, using `return_target` if provided, or appending a default return otherwise
-        - Attach the @workflow.atom(...) decorator with name, dependencies, and callsite metadata
+        - Attach the @workflow.atom(...) decorator with name, dependencies, and callsite metadata,
+          flagging `side_effects` for atoms that mutate one of their inputs in place
 
         Supports:
         - Named assignments: `x = ...`
@@ -2492,7 +2514,8 @@ class AutoAtomTransformer(ast.NodeTransformer):
         decorator = self._create_workflow_atom_decorator(
             atom_name,
             callsite_deps,
-            callsite_metadata=callsite_metadata
+            callsite_metadata=callsite_metadata,
+            side_effects=side_effects,
         )
 
         # Normalize call_expr into a body list
@@ -2546,7 +2569,13 @@ class AutoAtomTransformer(ast.NodeTransformer):
             decorator_list=[decorator],
         )
 
-    def _create_workflow_atom_decorator(self, atom_name: str, callsite_deps: list[str], callsite_metadata: dict | None = None) -> ast.Call:
+    def _create_workflow_atom_decorator(
+        self,
+        atom_name: str,
+        callsite_deps: list[str],
+        callsite_metadata: dict | None = None,
+        side_effects: bool = False,
+    ) -> ast.Call:
         """
         Constructs a decorator expression for @workflow.atom(...).
 
@@ -2561,6 +2590,7 @@ class AutoAtomTransformer(ast.NodeTransformer):
             atom_name: The name to assign to the reactive atom.
             callsite_deps: A list of atom names this atom depends on.
             callsite_metadata: Optional dictionary with source information, such as filename, lineno, source
+            side_effects: Whether the atom mutates one of its inputs in place.
 
         Returns:
             An `ast.Call` node representing the fully parameterized decorator.
@@ -2591,6 +2621,9 @@ class AutoAtomTransformer(ast.NodeTransformer):
                 )
             )
 
+        if side_effects:
+            keywords.append(ast.keyword(arg="side_effects", value=ast.Constant(value=True)))
+
         return ast.Call(
             func=ast.Attribute(value=ast.Name(id="workflow", ctx=ast.Load()), attr="atom", ctx=ast.Load()),
             args=[],
@@ -2752,7 +2785,37 @@ def annotate_parents(tree: ast.AST) -> ast.AST:
     return tree
 
 
-def transform_source(source: str, filename: str = "<script>") -> tuple[ast.Module, list[str]]:
+def replay_registry_calls(calls: list[tuple[str, tuple, dict]]) -> None:
+    """
+    Re-apply registry calls recorded by a transform (see `transform_source`), for
+    callers that reuse its output without transforming again.
+
+    Dependency resolvers are recorded as the source of their lambda and evaluated
+    the same way the transformer evaluates them.
+    """
+    registrars = {
+        "register_return_renderer": register_return_renderer,
+        "register_output_stream_function": register_output_stream_function,
+        "register_display_method": register_display_method,
+        "register_mimetype_component_type": register_mimetype_component_type,
+    }
+    for func_name, args, kwargs in calls:
+        try:
+            if func_name == "register_display_dependency_resolver":
+                target, resolver_source = args
+                compiled = compile(resolver_source, filename="<resolver>", mode="eval")
+                register_display_dependency_resolver(target, eval(compiled, {"__builtins__": __builtins__}))
+            else:
+                registrars[func_name](*args, **kwargs)
+        except Exception as e:
+            logger.warning(f"[AST] Failed to replay registry call {func_name}(*{args}, **{kwargs}): {e}")
+
+
+def transform_source(
+    source: str,
+    filename: str = "<script>",
+    registry_calls: list[tuple[str, tuple, dict]] | None = None,
+) -> tuple[ast.Module, list[str]]:
     """
     Main entry point for transforming a Preswald source script.
 
@@ -2762,6 +2825,8 @@ def transform_source(source: str, filename: str = "<script>") -> tuple[ast.Modul
     Args:
         source: The source code as a string.
         filename: Optional filename used for logging and ID generation.
+        registry_calls: Optional list that receives the registry calls the
+            transformer applied statically, for `replay_registry_calls`.
 
     Returns:
         A tuple:
@@ -2773,7 +2838,11 @@ def transform_source(source: str, filename: str = "<script>") -> tuple[ast.Modul
         annotate_parents(tree)
 
         transformer = AutoAtomTransformer(filename=filename)
-        new_tree = transformer.visit(tree)
+        try:
+            new_tree = transformer.visit(tree)
+        finally:
+            if registry_calls is not None:
+                registry_calls.extend(transformer.registry_calls)
 
         ast.fix_missing_locations(new_tree)
 
@@ -1,86 +1,268 @@
-import hashlib
 import json
 import logging
-import re
+import math
+import struct
+import uuid
 import zlib
-from datetime import date, datetime
+from dataclasses import dataclass
+from datetime import date, datetime, time
 from typing import Any
 
 import msgpack
 import numpy as np
+import pandas as pd
+
+from preswald.interfaces.fingerprint import UnfingerprintableError, fingerprint
 
 
 logger = logging.getLogger(__name__)
 
 
+def to_serializable(obj: Any) -> Any:
+    """
+    Convert an object to JSON-compatible Python values in a single pass.
+
+    NaN and infinite floats become None, numpy scalars become Python scalars,
+    datetimes become ISO strings and sets and tuples become lists. Numeric numpy
+    arrays, pandas Series and Index objects are converted with vectorized masks
+    instead of element by element, and DataFrames become lists of records.
+    Values of unknown types are returned unchanged.
+    """
+    cls = type(obj)
+    if cls is str or cls is int or cls is bool or obj is None:
+        return obj
+    if cls is float:
+        return obj if math.isfinite(obj) else None
+    if cls is dict:
+        return {k: to_serializable(v) for k, v in obj.items()}
+    if cls is list or cls is tuple:
+        return _sequence_to_list(obj)
+
+    handler = _dispatch.get(cls)
+    if handler is None:
+        handler = _dispatch[cls] = _find_handler(cls)
+    return handler(obj)
+
+
+def _sequence_to_list(values) -> list:
+    out = []
+    append = out.append
+    for value in values:
+        cls = type(value)
+        if cls is str or cls is int or cls is bool or value is None:
+            append(value)
+        elif cls is float:
+            append(value if math.isfinite(value) else None)
+        else:
+            append(to_serializable(value))
+    return out
+
+
+def ndarray_to_list(arr: np.ndarray) -> list:
+    """Convert a numpy array to nested lists, mapping NaN, infinities and NaT to None."""
+    kind = arr.dtype.kind
+    if kind in "biu":
+        return arr.tolist()
+    if kind == "f":
+        invalid = ~np.isfinite(arr)
+        if not invalid.any():
+            return arr.tolist()
+        out = arr.astype(object)
+        out[invalid] = None
+        return out.tolist()
+    if kind in "Mm":
+        invalid = np.isnat(arr)
+        if kind == "M":
+            out = np.datetime_as_string(arr).astype(object)
+        else:
+            out = arr.astype("timedelta64[ns]").astype(np.int64).astype(object)
+        if invalid.any():
+            out[invalid] = None
+        return out.tolist()
+    if kind in "US":
+        return arr.astype(str).tolist()
+    if kind == "O":
+        return _sequence_to_list(arr.tolist()) if arr.ndim == 1 else [ndarray_to_list(row) for row in arr]
+    # complex, void and other dtypes are converted element by element
+    return _sequence_to_list(arr.tolist()) if arr.ndim else to_serializable(arr.item())
+
+
+def frame_to_records(df: pd.DataFrame) -> list[dict]:
+    """
+    Convert a DataFrame to a list of JSON-compatible records, column by column.
+
+    Each column is converted with `ndarray_to_list`, which is much faster than
+    `DataFrame.to_dict("records")` followed by cleaning every value.
+    """
+    keys = [str(column) for column in df.columns]
+    columns = [_series_to_list(df.iloc[:, i]) for i in range(len(keys))]
+    return [dict(zip(keys, row)) for row in zip(*columns)] if keys else [{} for _ in range(len(df))]
+
+
+def _series_to_list(series) -> list:
+    values = series.to_numpy()
+    if values.dtype.kind == "O" and isinstance(series.dtype, pd.DatetimeTZDtype):
+        return [None if value is pd.NaT else value.isoformat() for value in values]
+    return ndarray_to_list(values)
+
+
+def _float(value) -> float | None:
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _datetime(value) -> str | None:
+    return None if value is pd.NaT else value.isoformat()
+
+
+def _datetime64(value: np.datetime64) -> str | None:
+    return None if np.isnat(value) else str(np.datetime_as_string(value))
+
+
+def _timedelta64(value: np.timedelta64) -> int | None:
+    return None if np.isnat(value) else int(value.astype("timedelta64[ns]").astype(np.int64))
+
+
+def _bytes(value: bytes) -> str:
+    return value.decode("utf-8", errors="replace")
+
+
+def _find_handler(cls: type):
+    if issubclass(cls, np.ndarray):
+        return ndarray_to_list
+    if issubclass(cls, (np.floating, float)):
+        return _float
+    if issubclass(cls, (np.integer, np.bool_)):
+        return lambda value: value.item() if isinstance(value, np.generic) else int(value)
+    if issubclass(cls, np.datetime64):
+        return _datetime64
+    if issubclass(cls, np.timedelta64):
+        return _timedelta64
+    if issubclass(cls, np.void):
+        return lambda value: None
+    if issubclass(cls, np.generic):
+        return lambda value: to_serializable(value.item())
+    if issubclass(cls, (datetime, date, time)):
+        return _datetime
+    if issubclass(cls, (pd.Series, pd.Index)):
+        return _series_to_list
+    if issubclass(cls, pd.DataFrame):
+        return frame_to_records
+    if issubclass(cls, dict):
+        return lambda value: {k: to_serializable(v) for k, v in value.items()}
+    if issubclass(cls, (list, tuple, set, frozenset)):
+        return _sequence_to_list
+    if issubclass(cls, (bytes, bytearray)):
+        return _bytes
+    if issubclass(cls, str):
+        return str
+    if issubclass(cls, int):
+        return int
+    return lambda value: value
+
+
+# type -> conversion function, filled lazily by `to_serializable`
+_dispatch: dict[type, Any] = {}
+
+
+# msgpack extension type of the numeric arrays in binary frames, see `to_packable`
+TYPED_ARRAY_EXT_TYPE = 1
+
+# little-endian numpy dtypes sent as typed arrays, named with plotly.js's typed
+# array codes; each one maps to a JavaScript TypedArray
+_TYPED_ARRAY_CODES = {
+    "<f8": b"f8",
+    "<f4": b"f4",
+    "<i4": b"i4",
+    "<u4": b"u4",
+    "<i2": b"i2",
+    "<u2": b"u2",
+    "|i1": b"i1",
+    "|u1": b"u1",
+}
+
+
+def to_packable(obj: Any) -> Any:
+    """
+    Convert an object to msgpack-compatible values, like `to_serializable`.
+
+    Numeric numpy arrays are not converted to lists but to `TYPED_ARRAY_EXT_TYPE`
+    extensions (see `typed_array`), so they travel as raw buffers.
+    """
+    cls = type(obj)
+    if cls is dict:
+        return {k: to_packable(v) for k, v in obj.items()}
+    if cls is list or cls is tuple:
+        out = []
+        append = out.append
+        for value in obj:
+            cls = type(value)
+            if cls is str or cls is int or cls is bool or value is None:
+                append(value)
+            elif cls is float:
+                append(value if math.isfinite(value) else None)
+            else:
+                append(to_packable(value))
+        return out
+    if cls is np.ndarray:
+        return typed_array(obj)
+    return to_serializable(obj)
+
+
+def typed_array(arr: np.ndarray) -> msgpack.ExtType | list:
+    """
+    Encode a numeric numpy array as a msgpack extension holding its raw buffer.
+
+    The payload is a header followed by the little-endian array data: the two
+    byte dtype code (`f8`, `f4`, `i4`, `u4`, `i2`, `u2`, `i1` or `u1`), the number
+    of dimensions as one byte, and each dimension as a little-endian uint32.
+    64-bit integers become `i4` when their values fit and `f8` otherwise, since
+    JavaScript has no 64-bit integer typed arrays plotly.js accepts. NaN and
+    infinities are kept as is. Other arrays are converted with `ndarray_to_list`.
+    """
+    kind = arr.dtype.kind
+    if arr.ndim == 0 or arr.ndim > 255 or kind not in "iuf":
+        return ndarray_to_list(arr)
+
+    if kind == "f":
+        dtype = "<f4" if arr.dtype.itemsize == 4 else "<f8"
+    elif arr.dtype.itemsize == 8:
+        fits = not arr.size or (arr.min() >= -(2**31) and arr.max() < 2**31)
+        dtype = "<i4" if fits else "<f8"
+    else:
+        dtype = arr.dtype.newbyteorder("<")
+    arr = np.ascontiguousarray(arr, dtype=dtype)
+
+    header = struct.pack(f"<2sB{arr.ndim}I", _TYPED_ARRAY_CODES[arr.dtype.str], arr.ndim, *arr.shape)
+    return msgpack.ExtType(TYPED_ARRAY_EXT_TYPE, b"".join((header, memoryview(arr).cast("B"))))
+
+
+def pack_message(message: dict) -> bytes:
+    """Encode a message as a binary msgpack frame, converting it with `to_packable`."""
+    return msgpack.packb(to_packable(message), use_bin_type=True, default=encode_default)
+
+
+def encode_default(obj: Any) -> Any:
+    """
+    Last resort of both wire encoders for a value of a type they cannot encode.
+
+    The value is converted with `to_serializable` if it knows the type, and
+    replaced with None otherwise (e.g. `pd.NA`, `Decimal`, `UUID`), so one odd
+    value never drops the whole message.
+    """
+    converted = to_serializable(obj)
+    if converted is obj:
+        logger.error(f"Error encoding object {type(obj)}: not serializable")
+        return None
+    return converted
+
+
 class PreswaldJSONEncoder(json.JSONEncoder):
     """Custom JSON encoder for Preswald data types."""
 
     def default(self, obj: Any) -> Any:
         """Convert object to JSON serializable format."""
-        try:
-            if isinstance(obj, np.ndarray):
-                return self._handle_ndarray(obj)
-            elif isinstance(
-                obj, (np.int_, np.intc, np.intp, np.int8, np.int16, np.int32, np.int64)
-            ):
-                return int(obj)
-            elif isinstance(obj, (np.float_, np.float16, np.float32, np.float64)):
-                if np.isnan(obj):
-                    return None
-                return float(obj)
-            elif isinstance(obj, np.bool_):
-                return bool(obj)
-            elif isinstance(obj, (datetime, date)):
-                return obj.isoformat()
-            elif isinstance(obj, (set, frozenset)):
-                return list(obj)
-            elif isinstance(obj, bytes):
-                return obj.decode("utf-8")
-            elif isinstance(obj, np.void):
-                return None
-            return super().default(obj)
-        except Exception as e:
-            logger.error(f"Error encoding object {type(obj)}: {e}")
-            return None
-
-    def _handle_ndarray(self, arr: np.ndarray) -> list | None:
-        """Handle numpy array conversion."""
-        try:
-            if arr.dtype.kind in ["U", "S"]:  # Unicode or string
-                return arr.astype(str).tolist()
-            elif arr.dtype.kind == "M":  # Datetime
-                return arr.astype(str).tolist()
-            elif arr.dtype.kind == "m":  # Timedelta
-                return arr.astype("timedelta64[ns]").astype(np.int64).tolist()
-            elif arr.dtype.kind == "O":  # Object
-                return [self.default(x) for x in arr]
-            else:
-                return self._handle_array_values(arr.tolist())
-        except Exception as e:
-            logger.error(f"Error handling ndarray: {e}")
-            return None
-
-    def _handle_array_values(self, arr: list) -> list:
-        """Handle array values recursively."""
-        if isinstance(arr, (list, tuple)):
-            return [self._handle_array_values(x) for x in arr]
-        elif isinstance(arr, (float, np.float_, np.float16, np.float32, np.float64)):
-            if np.isnan(arr):
-                return None
-            return float(arr)
-        elif isinstance(arr, (int, np.integer)):
-            return int(arr)
-        elif isinstance(arr, (str, bool)):
-            return arr
-        elif arr is None:
-            return None
-        else:
-            try:
-                return self.default(arr)
-            except Exception as e:
-                logger.error(f"Error handling array value: {e}")
-                return str(arr)
+        return encode_default(obj)
 
 
 def dumps(obj: Any, **kwargs) -> str:
@@ -95,13 +277,43 @@ def dumps(obj: Any, **kwargs) -> str:
         JSON formatted string
     """
     try:
-        return json.dumps(obj, cls=PreswaldJSONEncoder, **kwargs)
+        return json.dumps(to_serializable(obj), cls=PreswaldJSONEncoder, **kwargs)
     except Exception as e:
         logger.error(f"Error serializing object: {e}")
         # Return a safe fallback
         return json.dumps({"error": "Serialization failed", "message": str(e)})
 
 
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize obj to compact UTF-8 encoded JSON, converting it with `to_serializable`."""
+    return dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class WireFormat:
+    """
+    How messages are encoded for a client.
+
+    Messages are JSON text, or msgpack frames when `binary` is set (see
+    `pack_message`). With a `compression_level`, encoded messages of at least
+    `min_compress_bytes` are sent as zlib streams instead. Compressed frames are
+    recognised by the zlib header byte 0x78, which never starts a msgpack map.
+    """
+
+    binary: bool = False
+    compression_level: int | None = None
+    min_compress_bytes: int = 1024
+
+    def encode(self, message: dict) -> str | bytes:
+        """Encode a message as a text (str) or binary (bytes) websocket frame."""
+        payload = pack_message(message) if self.binary else dumps(message, separators=(",", ":"))
+        if self.compression_level is None or len(payload) < self.min_compress_bytes:
+            return payload
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        return zlib.compress(payload, self.compression_level)
+
+
 def loads(s: str, **kwargs) -> Any:
     """
     Deserialize s (a str instance containing a JSON document) to a Python object.
@@ -121,20 +333,8 @@ def loads(s: str, **kwargs) -> Any:
 
 
 def clean_nan_values(obj):
-    """Clean NaN values from an object recursively."""
-    import numpy as np
-
-    if isinstance(obj, (float, np.floating)):
-        return None if np.isnan(obj) else float(obj)
-    elif isinstance(obj, (list, tuple)):
-        return [clean_nan_values(x) for x in obj]
-    elif isinstance(obj, dict):
-        return {k: clean_nan_values(v) for k, v in obj.items()}
-    elif isinstance(obj, np.ndarray):
-        if obj.dtype.kind in ["f", "c"]:  # Float or complex
-            obj = np.where(np.isnan(obj), None, obj)
-        return obj.tolist()
-    return obj
+    """Clean NaN values from an object recursively. Same as `to_serializable`."""
+    return to_serializable(obj)
 
 
 def optimize_plotly_data(
@@ -180,8 +380,7 @@ def optimize_plotly_data(
 
 def compress_data(data: dict | list | str) -> bytes:
     """Compress data using zlib."""
-    json_str = dumps(data)
-    return zlib.compress(json_str.encode("utf-8"))
+    return zlib.compress(dumps_bytes(data))
 
 
 def decompress_data(compressed_data: bytes) -> dict | list | str:
@@ -194,48 +393,61 @@ class RenderBuffer:
     """
     Tracks previous render states and computes diffs to avoid unnecessary updates.
     Used by services to avoid redundant component reruns and frontend updates.
+
+    Components are diffed by a content fingerprint computed once per render. The
+    fingerprint of the last render is kept as the component's revision, which is
+    sent to the frontend so unchanged components are not re-rendered there either.
+    Widget values sent by clients are tracked separately from rendered components.
     """
 
-    HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+    # keys the render tracking itself writes into component dicts
+    VOLATILE_KEYS = frozenset({"shouldRender", "revision"})
 
     def __init__(self):
-        self._state_cache: dict[str, str] = {}
-
-    def has_changed(self, component_id: str, new_value: Any) -> bool:
-        """Check if the new hash differs from the cached one."""
-        new_clean = clean_nan_values(new_value)
+        self._revisions: dict[str, str] = {}
+        self._states: dict[str, str] = {}
 
-        if component_id not in self._state_cache:
-            return True  # always render the first time
-
-        old_clean = clean_nan_values(self._state_cache[component_id])
-        return new_clean != old_clean
+    def fingerprint(self, value: Any) -> str:
+        """
+        Return a digest of `value`'s contents, ignoring render tracking keys.
 
-    def update(self, component_id: str, new_value: Any):
-        """Update the cached hash value."""
-        self._state_cache[component_id] = self._ensure_hash(new_value)
+        Values that cannot be fingerprinted get a fresh digest every time, so they
+        always count as changed.
+        """
+        if isinstance(value, dict) and not self.VOLATILE_KEYS.isdisjoint(value):
+            value = {k: v for k, v in value.items() if k not in self.VOLATILE_KEYS}
+        try:
+            return fingerprint(value)
+        except UnfingerprintableError:
+            return uuid.uuid4().hex
 
     def should_render(self, component_id: str, new_value: Any) -> bool:
         """
         High-level API to check whether a component should rerender.
-        Updates the cache if the value has changed.
+        Records the new revision if the value has changed.
         """
-        return self._update_if_changed(component_id, new_value)
-
-    def _ensure_hash(self, value: Any) -> str:
-        """Convert value to SHA256 hash. Accepts either a hash string or a hashable object."""
-        if isinstance(value, str) and self.HASH_PATTERN.match(value):
-            return value  # already a hash
-        try:
-            cleaned = clean_nan_values(value)
-            packed = msgpack.packb(cleaned, use_bin_type=True)
-            return hashlib.sha256(packed).hexdigest()
-        except Exception as e:
-            raise ValueError(f"RenderBuffer failed to compute hash: {e}")
-
-    def _update_if_changed(self, component_id: str, new_value: Any) -> bool:
-        """Update cache and return True if hash changed."""
-        if self.has_changed(component_id, new_value):
-            self.update(component_id, new_value)
-            return True
-        return False
+        revision = self.fingerprint(new_value)
+        if self._revisions.get(component_id) == revision:
+            return False
+        self._revisions[component_id] = revision
+        return True
+
+    def revision(self, component_id: str) -> str | None:
+        """Fingerprint of the last rendered value of a component."""
+        return self._revisions.get(component_id)
+
+    def has_state_changed(self, component_id: str, new_value: Any) -> bool:
+        """Check whether a widget value differs from the last one received, and record it."""
+        digest = self.fingerprint(new_value)
+        if self._states.get(component_id) == digest:
+            return False
+        self._states[component_id] = digest
+        return True
+
+    def forget(self, component_id: str):
+        """Drop the recorded revision of a component, so it renders again."""
+        self._revisions.pop(component_id, None)
+
+    def clear(self):
+        """Drop all recorded revisions, e.g. after the layout was cleared."""
+        self._revisions.clear()
@@ -27,6 +27,7 @@ from .components import (
     topbar,
     workflow_dag,
 )
+from . import caching as cache
 from .data import connect, get_df, query
 from .workflow import RetryPolicy, Workflow, WorkflowAnalyzer
 
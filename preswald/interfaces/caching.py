@@ -0,0 +1,379 @@
+import copy
+import inspect
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import partial, wraps
+from typing import Any
+
+from preswald.engine.result_cache import estimate_size
+from preswald.engine.session import get_current_session
+from preswald.interfaces.workflow import AtomCache, AtomResult, AtomStatus, _source_hash
+
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ("process", "session")
+
+# Stores of every memoized function, keyed by its name, source hash, kind, scope
+# and options (see `_shared_stores`)
+_registry: dict[tuple, "_MemoStores"] = {}
+_registry_lock = threading.Lock()
+
+
+class MemoCache(AtomCache):
+    """
+    Bounded store of a memoized function's results.
+
+    Results are `AtomResult`s keyed by the input hash `AtomCache` computes for the
+    function's arguments and source, so arguments are fingerprinted exactly like
+    atom inputs. Entries expire `ttl` seconds after they were computed, and the
+    least recently used entries are evicted once there are more than `max_entries`
+    of them or their estimated size exceeds `max_bytes`.
+    """
+
+    def __init__(self, ttl: float | None = None, max_entries: int | None = None, max_bytes: int | None = None):
+        super().__init__()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache: OrderedDict[str, AtomResult] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self.size = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> AtomResult | None:
+        with self._lock:
+            result = self.cache.get(key)
+            if result is None:
+                return None
+            if self.ttl is not None and time.time() - result.end_time > self.ttl:
+                self._remove(key)
+                return None
+            self.cache.move_to_end(key)
+            return result
+
+    def store(self, result: AtomResult):
+        size = estimate_size(result.value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.info(f"[Cache] Result too large to cache key={result.input_hash[:12]} {size=}")
+            return
+        with self._lock:
+            self._remove(result.input_hash)
+            self.cache[result.input_hash] = result
+            self._sizes[result.input_hash] = size
+            self.size += size
+            self._evict()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self.cache),
+            "bytes": self.size,
+            "hits": sum(self.hits.values()),
+            "misses": sum(self.misses.values()),
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        with self._lock:
+            super().clear()
+            self._sizes.clear()
+            self.size = 0
+
+    def _evict(self):
+        while self.cache and (
+            (self.max_entries is not None and len(self.cache) > self.max_entries)
+            or (self.max_bytes is not None and self.size > self.max_bytes)
+        ):
+            self._remove(next(iter(self.cache)))
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        if self.cache.pop(key, None) is not None:
+            self.size -= self._sizes.pop(key, 0)
+
+
+class _MemoStores:
+    """
+    Result stores of one memoized function, shared by every decoration of it.
+
+    Scripts are executed again for each session and on full reruns, which
+    decorates their functions again. Keeping the stores here lets the new
+    `MemoizedFunction` reuse the results of the previous one.
+    """
+
+    def __init__(self, name: str, kind: str, scope: str, options: dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.scope = scope
+        self.options = options
+        self.store = MemoCache(**options)
+        self.session_stores: weakref.WeakKeyDictionary[Any, MemoCache] = weakref.WeakKeyDictionary()
+        # instance -> session (or these stores, for process scope) -> store
+        self.instance_stores: weakref.WeakKeyDictionary[Any, weakref.WeakKeyDictionary] = (
+            weakref.WeakKeyDictionary()
+        )
+        self.lock = threading.Lock()
+
+    def clear(self):
+        """Drop every cached result of the function, in all scopes."""
+        self.store.clear()
+        with self.lock:
+            stores = list(self.session_stores.values())
+            for instance_stores in list(self.instance_stores.values()):
+                stores.extend(instance_stores.values())
+        for store in stores:
+            store.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Hits, misses, entries and bytes of the store used by the current session,
+        summed with the per-instance stores when this is a method.
+        """
+        totals = self.get().stats()
+        session = get_current_session() if self.scope == "session" else None
+        owner = session if session is not None else self
+        with self.lock:
+            stores = [stores.get(owner) for stores in list(self.instance_stores.values())]
+        for store in stores:
+            if store is not None:
+                for name, value in store.stats().items():
+                    totals[name] += value
+        return {"name": self.name, "kind": self.kind, "scope": self.scope, **totals}
+
+    def get(self, instance: Any = None) -> MemoCache | None:
+        """
+        Store for the current scope, kept per instance when called as a method of
+        `instance`. Returns None if `instance` cannot key a store.
+        """
+        session = get_current_session() if self.scope == "session" else None
+        if instance is None and session is None:
+            return self.store
+
+        with self.lock:
+            if instance is None:
+                stores, owner = self.session_stores, session
+            else:
+                try:
+                    stores = self.instance_stores.get(instance)
+                    if stores is None:
+                        stores = self.instance_stores[instance] = weakref.WeakKeyDictionary()
+                except TypeError:
+                    logger.debug(f"[Cache] Not caching {self.name=}: instance is unhashable or not weak-referenceable")
+                    return None
+                owner = session if session is not None else self
+            store = stores.get(owner)
+            if store is None:
+                store = stores[owner] = MemoCache(**self.options)
+            return store
+
+
+def _shared_stores(name: str, source_hash: str, kind: str, scope: str, options: dict[str, Any]) -> _MemoStores:
+    """
+    Stores for a decorated function, reused while its name, source and options stay
+    the same. Stores of an earlier version of the function are dropped.
+    """
+    key = (name, source_hash, kind, scope, tuple(sorted(options.items())))
+    with _registry_lock:
+        stores = _registry.get(key)
+        if stores is None:
+            for stale in [other for other in _registry if other[0] == name and other != key]:
+                del _registry[stale]
+            stores = _registry[key] = _MemoStores(name, kind, scope, options)
+        return stores
+
+
+class MemoizedFunction:
+    """
+    A function wrapped by `data` or `resource`.
+
+    Calling it returns a cached result when one exists for the same arguments and
+    computes and caches one otherwise. Decorating the same function again, as
+    happens when a script runs for another session, reuses the cached results as
+    long as its source and options are unchanged. Parameters whose name starts
+    with an underscore are not hashed, which suits connections, clients and
+    other arguments that do not affect the result.
+
+    On methods, the instance is not hashed either: each instance gets a store of
+    its own, dropped with the instance, so changing the instance's attributes
+    does not invalidate its results. Instances that are unhashable or cannot be
+    weakly referenced are not cached.
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        kind: str,
+        ttl: float | None = None,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        scope: str = "process",
+    ):
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown cache scope {scope!r}; expected one of {SCOPES}")
+        self.func = func
+        self.kind = kind
+        # functions of exec'd scripts have no module
+        self.name = f"{func.__module__ or '__main__'}.{func.__qualname__}"
+        self.scope = scope
+        self._options = {"ttl": ttl, "max_entries": max_entries, "max_bytes": max_bytes}
+        self._signature = inspect.signature(func)
+        self._source_hash = _source_hash(func)
+        self._stores = _shared_stores(self.name, self._source_hash, kind, scope, self._options)
+        self._store = self._stores.store
+        self._session_stores = self._stores.session_stores
+        self._instance_stores = self._stores.instance_stores
+        self._lock = self._stores.lock
+        wraps(func)(self)
+
+    def __call__(self, *args, **kwargs):
+        return self._call(None, args, kwargs)
+
+    def _call_method(self, instance: Any, *args, **kwargs):
+        return self._call(instance, args, kwargs)
+
+    def _call(self, instance: Any, args: tuple, kwargs: dict[str, Any]):
+        if instance is not None:
+            args = (instance, *args)
+        store = self._get_store(instance)
+        if store is None:
+            self._store.record(self.name, hit=False)
+            return self.func(*args, **kwargs)
+
+        arguments = self._hashed_arguments(args, kwargs, method=instance is not None)
+        key = store.compute_input_hash(self.name, arguments, self._source_hash)
+        if not store.is_cacheable(key):
+            # an argument cannot be fingerprinted, so no cached result can be trusted
+            store.record(self.name, hit=False)
+            return self.func(*args, **kwargs)
+
+        result = store.lookup(key)
+        if result is not None:
+            store.record(self.name, hit=True)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"[Cache] Hit {self.name=} key={key[:12]}")
+            return self._output(result.value)
+
+        store.record(self.name, hit=False)
+        start_time = time.time()
+        value = self.func(*args, **kwargs)
+        store.store(
+            AtomResult(
+                status=AtomStatus.COMPLETED,
+                value=value,
+                attempts=1,
+                start_time=start_time,
+                end_time=time.time(),
+                input_hash=key,
+            )
+        )
+        return self._output(value)
+
+    def __get__(self, instance, owner=None):
+        # bind like a plain function when used on a method, keeping the instance out
+        # of the key (see `_get_store`)
+        return self if instance is None else partial(self._call_method, instance)
+
+    def clear(self):
+        """Drop every cached result of this function, in all scopes."""
+        self._stores.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Hits, misses, entries and bytes of the store used by the current session,
+        summed with the per-instance stores when this is a method.
+        """
+        return self._stores.stats()
+
+    def _get_store(self, instance: Any = None) -> MemoCache | None:
+        return self._stores.get(instance)
+
+    def _hashed_arguments(self, args: tuple, kwargs: dict[str, Any], method: bool = False) -> dict[str, Any]:
+        try:
+            bound = self._signature.bind(*args, **kwargs)
+        except TypeError:
+            # let the call itself raise the proper error
+            return {"args": args[1:] if method else args, "kwargs": kwargs}
+        bound.apply_defaults()
+        arguments = bound.arguments
+        if method:
+            # the instance selects the store instead of being hashed
+            arguments = dict(arguments)
+            arguments.pop(next(iter(self._signature.parameters)))
+        return {name: value for name, value in arguments.items() if not name.startswith("_")}
+
+    def _output(self, value: Any) -> Any:
+        # data results are copied so callers mutating them can't corrupt the cache;
+        # resources (models, connections) are shared as is
+        return copy.deepcopy(value) if self.kind == "data" else value
+
+
+def _memoize_decorator(kind: str):
+    def decorator(
+        func: Callable | None = None,
+        *,
+        ttl: float | None = None,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        scope: str = "process",
+    ):
+        def wrap(f: Callable) -> MemoizedFunction:
+            return MemoizedFunction(f, kind, ttl=ttl, max_entries=max_entries, max_bytes=max_bytes, scope=scope)
+
+        # support both @cache.data and @cache.data(...)
+        return wrap(func) if func is not None else wrap
+
+    return decorator
+
+
+data = _memoize_decorator("data")
+data.__doc__ = """
+Memoize a function returning data, such as a DataFrame fetched from an API.
+
+Arguments are fingerprinted like atom inputs, and each call with the same
+arguments returns a copy of the cached result, so callers may mutate it.
+
+Args:
+    ttl: Seconds a result stays valid. Defaults to forever.
+    max_entries: Maximum number of cached results.
+    max_bytes: Maximum estimated size of all cached results.
+    scope: "process" shares results between all sessions; "session" keeps a
+        separate cache per connected client.
+
+Example:
+    @cache.data(ttl=600)
+    def fetch_prices(symbol):
+        return pd.read_json(f"https://example.com/prices/{symbol}")
+"""
+
+resource = _memoize_decorator("resource")
+resource.__doc__ = """
+Memoize a function returning a shared resource, such as a fitted model or a
+database client. Cached results are returned as is, without copying.
+
+Takes the same options as `data`.
+
+Example:
+    @cache.resource
+    def load_model(path):
+        return joblib.load(path)
+"""
+
+
+def stats() -> list[dict[str, Any]]:
+    """Hit and miss counts of every memoized function."""
+    with _registry_lock:
+        stores = list(_registry.values())
+    return [store.stats() for store in stores]
+
+
+def clear():
+    """Drop the cached results of every memoized function."""
+    with _registry_lock:
+        stores = list(_registry.values())
+    for store in stores:
+        store.clear()
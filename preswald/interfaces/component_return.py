@@ -1,14 +1,26 @@
-class ComponentReturn:
+from preswald.interfaces.value_proxy import ValueProxy
+
+
+class ComponentReturn(ValueProxy):
     """
     Wrapper for component return values that separates the visible return
     value from the internal component metadata (e.g. for render tracking).
+
+    Operators act on the visible value, so e.g. `slider(...) * 2` works directly.
     """
 
+    __slots__ = ("value", "_preswald_component")
+
     def __init__(self, value, component):
         self.value = value
         self._preswald_component = component
 
-    def __str__(self): return str(self.value)
-    def __float__(self): return float(self.value)
-    def __bool__(self): return bool(self.value)
+    def _read(self):
+        return self.value
+
+    @property
+    def component_id(self) -> str | None:
+        component = self._preswald_component
+        return component.get("id") if isinstance(component, dict) else None
+
     def __repr__(self): return repr(self.value)
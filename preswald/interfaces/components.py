@@ -23,6 +23,7 @@ import pandas as pd
 # Internal
 from preswald.engine.service import PreswaldService
 from preswald.engine.render_tracking import with_render_tracking
+from preswald.engine.utils import frame_to_records, to_serializable
 from preswald.interfaces.workflow import Workflow
 from preswald.interfaces.component_return import ComponentReturn
 
@@ -139,20 +140,7 @@ def chat(source: str, table: str | None = None, component_id: str | None = None,
     # Convert DataFrame to serializable format
     serializable_data = None
     if df is not None:
-        records = df.to_dict("records")
-        # Handle timestamp fields before general serialization
-        processed_records = []
-        for record in records:
-            processed_record = {}
-            for key, value in record.items():
-                if isinstance(value, pd.Timestamp | pd.NaT.__class__):
-                    processed_record[key] = (
-                        value.isoformat() if not pd.isna(value) else None
-                    )
-                else:
-                    processed_record[key] = value
-            processed_records.append(processed_record)
-        serializable_data = convert_to_serializable(processed_records)
+        serializable_data = frame_to_records(df)
 
     logger.debug(f"Creating chat component with id {component_id}, source: {source}")
     component = {
@@ -480,26 +468,10 @@ def playground(
 
         # Process data for the table
         if isinstance(data, pd.DataFrame):
-            data = data.reset_index(drop=True)
-            processed_data = data.to_dict("records")
             column_defs = [
                 {"headerName": str(col), "field": str(col)} for col in data.columns
             ]
-
-            # Process each row to ensure JSON serialization
-            processed_data = []
-            for _, row in data.iterrows():
-                processed_row = {
-                    str(key): (
-                        value.item()
-                        if isinstance(value, np.integer | np.floating)
-                        else value
-                    )
-                    if value is not None
-                    else ""  # Ensure no None values
-                    for key, value in row.items()
-                }
-                processed_data.append(processed_row)
+            processed_data = _table_records(data)
     except Exception as e:
         error = str(e)
         logger.error(f"Error querying data source: {e}")
@@ -588,37 +560,9 @@ def plotly(fig, size: float = 1.0, component_id: str | None = None, **kwargs) ->
             f"[PLOTLY] Figure to dict conversion took {time.time() - fig_dict_start:.3f}s"
         )
 
-        # Clean up any NaN values in the data
-        clean_start = time.time()
-        for trace in fig_dict.get("data", []):
-            if isinstance(trace.get("marker"), dict):
-                marker = trace["marker"]
-                if "sizeref" in marker and (
-                    isinstance(marker["sizeref"], float) and np.isnan(marker["sizeref"])
-                ):
-                    marker["sizeref"] = None
-
-            # Clean up other potential NaN values
-            for key, value in trace.items():
-                if isinstance(value, list | np.ndarray):
-                    trace[key] = [
-                        (
-                            None
-                            if isinstance(x, float | np.floating) and np.isnan(x)
-                            else x
-                        )
-                        for x in value
-                    ]
-                elif isinstance(value, float | np.floating) and np.isnan(value):
-                    trace[key] = None
-        logger.debug(f"[PLOTLY] NaN cleanup took {time.time() - clean_start:.3f}s")
-
-        # Convert to JSON-serializable format
-        serialize_start = time.time()
-        serializable_fig_dict = convert_to_serializable(fig_dict)
-        logger.debug(
-            f"[PLOTLY] Serialization took {time.time() - serialize_start:.3f}s"
-        )
+        # numpy arrays are left in place: the component is converted to JSON-serializable
+        # values, with NaN and infinities as null, in one vectorized pass when appended
+        serializable_fig_dict = fig_dict
 
         component = {
             "type": "plot",
@@ -638,11 +582,6 @@ def plotly(fig, size: float = 1.0, component_id: str | None = None, **kwargs) ->
             "size": size,
         }
 
-        # Verify JSON serialization
-        json_start = time.time()
-        json.dumps(component)
-        logger.debug(f"[PLOTLY] JSON verification took {time.time() - json_start:.3f}s")
-
         logger.debug(f"[PLOTLY] Plot data created successfully for id {component_id}")
         logger.debug(
             f"[PLOTLY] Total plotly render took {time.time() - start_time:.3f}s"
@@ -823,40 +762,42 @@ def table(
     """
 
     try:
-        # Convert pandas DataFrame to a list of dictionaries if needed
-        if hasattr(data, "to_dict"):
-            if isinstance(data, pd.DataFrame):
-                data = data.reset_index(drop=True)
-                if limit is not None:
-                    data = data.head(limit)
-            data = data.to_dict("records")
-
-        # Ensure data is a list
-        if not isinstance(data, list):
-            data = [data] if data else []
-
-        # Ensure data is not empty before accessing keys
-        if data and isinstance(data[0], dict):
-            column_defs = [
-                {"headerName": str(col), "field": str(col)} for col in data[0].keys()
-            ]
+        if isinstance(data, pd.DataFrame):
+            if limit is not None:
+                data = data.head(limit)
+            processed_data = _table_records(data)
+            column_defs = (
+                [{"headerName": str(col), "field": str(col)} for col in data.columns]
+                if processed_data
+                else []
+            )
         else:
-            column_defs = []
-
-        # Process each row to ensure JSON serialization
-        processed_data = []
-        for row in data:
-            processed_row = {
-                str(key): (
-                    value.item()
-                    if isinstance(value, np.integer | np.floating)
-                    else value
-                )
-                if value is not None
-                else ""  # Ensure no None values
-                for key, value in row.items()
-            }
-            processed_data.append(processed_row)
+            # Convert other objects with a to_dict (e.g. a Series) to a list of dictionaries
+            if hasattr(data, "to_dict"):
+                data = data.to_dict("records")
+
+            # Ensure data is a list
+            if not isinstance(data, list):
+                data = [data] if data else []
+
+            # Ensure data is not empty before accessing keys
+            if data and isinstance(data[0], dict):
+                column_defs = [
+                    {"headerName": str(col), "field": str(col)} for col in data[0].keys()
+                ]
+            else:
+                column_defs = []
+
+            # Process each row to ensure JSON serialization
+            processed_data = []
+            for row in data:
+                processed_row = {
+                    str(key): to_serializable(value)
+                    if value is not None
+                    else ""  # Ensure no None values
+                    for key, value in row.items()
+                }
+                processed_data.append(processed_row)
 
         # Log debug info
         logger.debug(f"Column Definitions: {column_defs}")
@@ -972,14 +913,11 @@ def workflow_dag(
         title: Optional title for the visualization
     """
     try:
-        from .workflow import WorkflowAnalyzer
+        from . import caching
 
-        analyzer = WorkflowAnalyzer(workflow)
-        analyzer.build_graph()  # Ensure graph is built
-
-        # Get node data
+        # Get node data from the workflow's incrementally maintained graph
         nodes_data = []
-        for node, data in analyzer.graph.nodes(data=True):
+        for node, data in workflow.analyzer.nodes():
             nodes_data.append(
                 {
                     "name": node,
@@ -989,6 +927,8 @@ def workflow_dag(
                     "error": data["error"],
                     "dependencies": data["dependencies"],
                     "force_recompute": data["force_recompute"],
+                    "cache_hits": data["cache_hits"],
+                    "cache_misses": data["cache_misses"],
                 }
             )
 
@@ -1005,6 +945,7 @@ def workflow_dag(
                     }
                 ],
                 "layout": {"title": {"text": title}, "showlegend": True},
+                "caches": caching.stats(),  # hits and misses of @cache.data / @cache.resource functions
             },
         }
 
@@ -1026,27 +967,22 @@ def workflow_dag(
 # Helpers
 
 
+def _table_records(df: pd.DataFrame) -> list[dict]:
+    """Convert a DataFrame to JSON-serializable table rows, column by column."""
+    records = frame_to_records(df)
+    object_columns = [str(col) for col, dtype in df.dtypes.items() if dtype == object]
+    if object_columns:
+        # Ensure no None values
+        for row in records:
+            for key in object_columns:
+                if row[key] is None:
+                    row[key] = ""
+    return records
+
+
 def convert_to_serializable(obj):
     """Convert numpy arrays and other non-serializable objects to Python native types."""
-    if isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, np.int8 | np.int16 | np.int32 | np.int64 | np.integer):
-        return int(obj)
-    elif isinstance(obj, np.float16 | np.float32 | np.float64 | np.floating):
-        if np.isnan(obj):
-            return None
-        return float(obj)
-    elif isinstance(obj, np.bool_):
-        return bool(obj)
-    elif isinstance(obj, dict):
-        return {k: convert_to_serializable(v) for k, v in obj.items()}
-    elif isinstance(obj, list | tuple):
-        return [convert_to_serializable(item) for item in obj]
-    elif isinstance(obj, np.generic):
-        if np.isnan(obj):
-            return None
-        return obj.item()
-    return obj
+    return to_serializable(obj)
 
 
 # async def render_and_send_fastplotlib(
@@ -1,13 +1,17 @@
 import logging
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
 
 
 logger = logging.getLogger(__name__)
 
-# Thread-local context stack for dependency tracking.
+# Context-local stack for dependency tracking.
 # This tracks the currently executing atom so that dynamic dependencies
 # (like reading another atom's value during execution) can be recorded.
+# Each thread and asyncio task sees its own stack, so atoms executing
+# concurrently never attribute reads to each other.
 
-_context_stack = []
+_context_stack: ContextVar[tuple] = ContextVar("preswald_dependency_context", default=())
 
 
 def get_current_context():
@@ -17,7 +21,8 @@ def get_current_context():
     Returns:
         The topmost context object from the stack, or None if the stack is empty.
     """
-    return _context_stack[-1] if _context_stack else None
+    stack = _context_stack.get()
+    return stack[-1] if stack else None
 
 
 def track_dependency(dep_name: str):
@@ -25,38 +30,64 @@ def track_dependency(dep_name: str):
     Register a runtime dependency between the currently executing atom and another.
 
     This is typically invoked when an atom reads the value of another tracked value.
-    The dependency is added to the DAG via the current context.
+    The dependency is added to the DAG via the current context. Outside an executing
+    atom there is nothing to attribute the read to, and this returns immediately.
 
     Args:
         dep_name (str): The name of the dependency being accessed.
     """
-    ctx = get_current_context()
-    if ctx:
+    stack = _context_stack.get()
+    if not stack:
+        return
+    ctx = stack[-1]
+    if ctx.atom_name == dep_name:
+        return
+    if logger.isEnabledFor(logging.DEBUG):
         logger.debug(f"[DAG] Registered dynamic dependency {{atom={ctx.atom_name}, dep={dep_name}}}")
-        ctx.workflow.register_dependency(ctx.atom_name, dep_name)
-    else:
-        logger.warning(f"[DAG] Dependency tracking failed (no context) {{dep={dep_name}}}")
+    ctx.workflow.register_dependency(ctx.atom_name, dep_name)
 
 
-def push_context(ctx):
+def push_context(ctx) -> Token:
     """
     Push a new atom execution context onto the stack.
 
     Args:
         ctx: A context object with 'atom_name' and 'workflow' attributes.
+
+    Returns:
+        A token that restores the previous stack when passed to `pop_context`.
     """
     if logger.isEnabledFor(logging.DEBUG):
         logger.debug(f"Pushing context for atom {ctx.atom_name}")
-    _context_stack.append(ctx)
+    return _context_stack.set((*_context_stack.get(), ctx))
 
 
-def pop_context():
+def pop_context(token: Token | None = None):
     """
     Pop the topmost context off the stack, ending dependency tracking for the current atom.
+
+    Args:
+        token: The token returned by the matching `push_context`. Without it, the
+            topmost context of the current stack is dropped.
     """
-    if _context_stack:
-        if logger.isEnabledFor(logging.DEBUG):
-            logger.debug(f"Popping context for atom {ctx.atom_name}")
-        _context_stack.pop()
-    else:
+    stack = _context_stack.get()
+    if not stack:
         logger.warning("[DAG] Attempted to pop context, but stack was empty")
+        return
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Popping context for atom {stack[-1].atom_name}")
+    if token is not None:
+        _context_stack.reset(token)
+    else:
+        _context_stack.set(stack[:-1])
+
+
+@contextmanager
+def tracking(ctx):
+    """Track dependencies for `ctx` for the duration of the block."""
+    token = push_context(ctx)
+    try:
+        yield ctx
+    finally:
+        pop_context(token)
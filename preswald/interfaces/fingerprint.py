@@ -0,0 +1,349 @@
+import hashlib
+import logging
+import pickle
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# Containers nested deeper than this are fingerprinted by pickling the remainder
+MAX_DEPTH = 32
+
+# Number of values remembered by the identity shortcut
+IDENTITY_CACHE_SIZE = 1024
+
+# Containers larger than this are pickled in one C-level pass when possible, rather
+# than dispatched element by element. Small containers recurse, so DataFrames or
+# arrays inside them still take their fast paths.
+LARGE_CONTAINER = 256
+
+Fingerprinter = Callable[[Any, "hashlib._Hash", int], None]
+
+# type or "module.QualName" -> function feeding a value into a hasher
+_fingerprinters: dict[type | str, Fingerprinter] = {}
+
+# type or "module.QualName" -> function returning a token that changes whenever the value is mutated
+_versioners: dict[type | str, Callable[[Any], Any]] = {}
+
+
+class UnfingerprintableError(TypeError):
+    """
+    Raised for values whose contents cannot be fingerprinted: they have no
+    registered fingerprinter and cannot be pickled. Results depending on such
+    values must not be cached, since no key can tell two of them apart.
+    """
+
+
+def register_fingerprinter(
+    type_: type | str,
+    func: Fingerprinter,
+    version: Callable[[Any], Any] | None = None,
+):
+    """
+    Register a fast fingerprint for values of `type_` and its subclasses.
+
+    Args:
+        type_: The type, or its dotted "module.QualName" so the module providing
+            it does not have to be imported up front.
+        func: Called as `func(value, hasher, depth)`; feeds bytes identifying the
+            value into `hasher`. Nested values should go through `update_fingerprint`
+            with `depth + 1`.
+        version: Optional function returning a token that changes whenever a value
+            is mutated, or None when that is unknown for this value. Values with a
+            token are fingerprinted once and served from an identity cache until the
+            token changes.
+    """
+    _fingerprinters[type_] = func
+    if version is not None:
+        _versioners[type_] = version
+    _dispatch_cache.clear()
+
+
+def fingerprint(value: Any, version: Any = None) -> str:
+    """
+    Return a short hex digest identifying `value`'s contents.
+
+    Equal values produce equal fingerprints across calls and reruns. Values
+    without a registered fingerprinter are pickled.
+
+    Args:
+        value: The value to fingerprint.
+        version: Optional token from a caller that knows when `value` is mutated,
+            e.g. a counter bumped whenever it is replaced or written to. The
+            fingerprint of the same object with the same token is computed once
+            and then served from an identity cache, whatever its type.
+
+    Raises:
+        UnfingerprintableError: If `value`, or a value nested in it, can neither
+            be pickled nor fingerprinted otherwise.
+    """
+    if version is not None:
+        return _identity_cache.get_or_compute(value, ("version", version), _update)
+    hasher = hashlib.sha256()
+    update_fingerprint(hasher, value)
+    return hasher.hexdigest()
+
+
+def update_fingerprint(hasher: "hashlib._Hash", value: Any, depth: int = 0):
+    """Feed the fingerprint of `value` into `hasher`."""
+    cls = type(value)
+    func, versioner = _dispatch(cls)
+
+    if versioner is not None:
+        version = versioner(value)
+        if version is not None:
+            hasher.update(_identity_cache.get_or_compute(value, version, func).encode())
+            return
+
+    if depth > MAX_DEPTH:
+        _fingerprint_pickle(value, hasher, depth)
+        return
+
+    (func or _fingerprint_pickle)(value, hasher, depth)
+
+
+def _update(value: Any, hasher, depth: int):
+    update_fingerprint(hasher, value, depth)
+
+
+_dispatch_cache: dict[type, tuple[Fingerprinter | None, Callable[[Any], Any] | None]] = {}
+
+
+def _dispatch(cls: type) -> tuple[Fingerprinter | None, Callable[[Any], Any] | None]:
+    cached = _dispatch_cache.get(cls)
+    if cached is not None:
+        return cached
+
+    func = versioner = None
+    for base in cls.__mro__:
+        for key in (base, f"{base.__module__}.{base.__qualname__}"):
+            if func is None and key in _fingerprinters:
+                func = _fingerprinters[key]
+                versioner = _versioners.get(key)
+        if func is not None:
+            break
+
+    _dispatch_cache[cls] = (func, versioner)
+    return func, versioner
+
+
+class _IdentityCache:
+    """
+    Remembers fingerprints of values by identity and version token.
+
+    Weak references are held where possible so cached values are not kept alive.
+    Values that cannot be weakly referenced are held strongly, which keeps their
+    ids from being reused while they are cached; the cache is bounded so this
+    memory is too.
+    """
+
+    def __init__(self, maxsize: int = IDENTITY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[int, tuple[Any, Any, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, value: Any, version: Any, func: Fingerprinter | None) -> str:
+        key = id(value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                ref, cached_version, digest = entry
+                target = ref() if isinstance(ref, weakref.ref) else ref
+                if target is value and cached_version == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return digest
+
+        hasher = hashlib.sha256()
+        (func or _fingerprint_pickle)(value, hasher, 0)
+        digest = hasher.hexdigest()
+
+        try:
+            ref = weakref.ref(value)
+        except TypeError:
+            ref = value
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (ref, version, digest)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return digest
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_identity_cache = _IdentityCache()
+
+
+def _tag(hasher, value: Any):
+    cls = type(value)
+    hasher.update(f"<{cls.__module__}.{cls.__qualname__}>".encode())
+
+
+def _fingerprint_pickle(value: Any, hasher, depth: int):
+    # public attributes miss state held in slots or C structures, and ids are
+    # reused after garbage collection, so neither is a safe substitute
+    if not _pickled(value, hasher):
+        raise UnfingerprintableError(f"Cannot fingerprint unpicklable {type(value).__qualname__} value")
+
+
+def _fingerprint_scalar(value: Any, hasher, depth: int):
+    _tag(hasher, value)
+    hasher.update(repr(value).encode())
+
+
+def _fingerprint_str(value: str, hasher, depth: int):
+    _tag(hasher, value)
+    hasher.update(value.encode("utf-8", "surrogatepass"))
+
+
+def _fingerprint_bytes(value: bytes | bytearray | memoryview, hasher, depth: int):
+    _tag(hasher, value)
+    hasher.update(value)
+
+
+def _pickled(value: Any, hasher) -> bool:
+    try:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return False
+    _tag(hasher, value)
+    hasher.update(data)
+    return True
+
+
+def _fingerprint_sequence(value: list | tuple, hasher, depth: int):
+    if len(value) > LARGE_CONTAINER and _pickled(value, hasher):
+        return
+    _tag(hasher, value)
+    hasher.update(str(len(value)).encode())
+    for item in value:
+        update_fingerprint(hasher, item, depth + 1)
+
+
+def _fingerprint_mapping(value: dict, hasher, depth: int):
+    if len(value) > LARGE_CONTAINER and _pickled(value, hasher):
+        return
+    _tag(hasher, value)
+    hasher.update(str(len(value)).encode())
+    for key, item in value.items():
+        update_fingerprint(hasher, key, depth + 1)
+        update_fingerprint(hasher, item, depth + 1)
+
+
+def _fingerprint_set(value: set | frozenset, hasher, depth: int):
+    # element order is arbitrary, so combine element digests order-independently
+    _tag(hasher, value)
+    for digest in sorted(fingerprint(item) for item in value):
+        hasher.update(digest.encode())
+
+
+def _fingerprint_ndarray(value: np.ndarray, hasher, depth: int):
+    if value.dtype.hasobject:
+        _fingerprint_pickle(value, hasher, depth)
+        return
+    _tag(hasher, value)
+    hasher.update(f"{value.dtype.str}{value.shape}".encode())
+    # hash the buffer in place; only non-contiguous views need a copy
+    hasher.update(memoryview(np.ascontiguousarray(value).reshape(-1).view(np.uint8)))
+
+
+def _fingerprint_pandas(value: pd.DataFrame | pd.Series | pd.Index, hasher, depth: int):
+    _tag(hasher, value)
+    if isinstance(value, pd.DataFrame):
+        update_fingerprint(hasher, [str(c) for c in value.columns], depth + 1)
+        hasher.update(str(list(value.dtypes)).encode())
+        _fingerprint_index(value.index, hasher)
+        for i in range(value.shape[1]):
+            _fingerprint_values(value.iloc[:, i], hasher, depth)
+    elif isinstance(value, pd.Series):
+        hasher.update(f"{value.name!r}{value.dtype}".encode())
+        _fingerprint_index(value.index, hasher)
+        _fingerprint_values(value, hasher, depth)
+    else:
+        hasher.update(f"{value.name!r}{value.dtype}".encode())
+        _fingerprint_index(value, hasher)
+
+
+def _fingerprint_index(index: pd.Index, hasher):
+    if isinstance(index, pd.RangeIndex):
+        hasher.update(repr(index).encode())
+        return
+    _fingerprint_values(index, hasher, 0)
+
+
+def _fingerprint_values(values: pd.Series | pd.Index, hasher, depth: int):
+    # numeric, boolean and datetime buffers are hashed in place; other columns go
+    # through pandas' vectorized hashing, which handles strings and categories
+    array = values.to_numpy() if values.dtype.kind in "biufcmM" else None
+    if array is not None and array.dtype.kind in "biufcmM":
+        _fingerprint_ndarray(array, hasher, depth)
+        return
+    try:
+        hashed = pd.util.hash_pandas_object(values, index=False)
+    except TypeError:
+        # unhashable cells, e.g. lists or dicts in object columns
+        _fingerprint_pickle(values, hasher, depth)
+        return
+    hasher.update(memoryview(np.ascontiguousarray(hashed.to_numpy()).view(np.uint8)))
+
+
+def _fingerprint_plotly(value, hasher, depth: int):
+    # hash the figure's own trace and layout dicts rather than `to_dict`, which
+    # deep-copies the whole figure first: trace arrays take the ndarray path and
+    # the remaining properties, which are small, are pickled in one pass
+    try:
+        data, layout = value._data, value._layout
+    except AttributeError:
+        data, layout = None, None
+    if not isinstance(data, list) or not isinstance(layout, dict):
+        _fingerprint_pickle(value, hasher, depth)
+        return
+    _tag(hasher, value)
+    hasher.update(str(len(data)).encode())
+    for trace in data:
+        arrays = {key: item for key, item in trace.items() if isinstance(item, np.ndarray)}
+        _fingerprint_properties({key: item for key, item in trace.items() if key not in arrays}, hasher, depth)
+        for key, item in arrays.items():
+            update_fingerprint(hasher, key, depth + 1)
+            _fingerprint_ndarray(item, hasher, depth + 1)
+    _fingerprint_properties(layout, hasher, depth)
+    _fingerprint_properties([frame.to_plotly_json() for frame in value.frames], hasher, depth)
+
+
+def _fingerprint_properties(value: dict | list, hasher, depth: int):
+    # nested property dicts are many and small, so one pickle beats recursing
+    if not _pickled(value, hasher):
+        update_fingerprint(hasher, value, depth + 1)
+
+
+for _type in (type(None), bool, int, float, complex):
+    register_fingerprinter(_type, _fingerprint_scalar)
+register_fingerprinter(str, _fingerprint_str, version=lambda value: len(value) if len(value) > 4096 else None)
+register_fingerprinter(bytes, _fingerprint_bytes, version=lambda value: len(value) if len(value) > 4096 else None)
+register_fingerprinter(bytearray, _fingerprint_bytes)
+register_fingerprinter(memoryview, _fingerprint_bytes)
+register_fingerprinter(list, _fingerprint_sequence)
+register_fingerprinter(tuple, _fingerprint_sequence)
+register_fingerprinter(dict, _fingerprint_mapping)
+register_fingerprinter(set, _fingerprint_set)
+register_fingerprinter(frozenset, _fingerprint_set)
+register_fingerprinter(np.ndarray, _fingerprint_ndarray)
+register_fingerprinter(np.generic, _fingerprint_scalar)
+register_fingerprinter(pd.DataFrame, _fingerprint_pandas)
+register_fingerprinter(pd.Series, _fingerprint_pandas)
+register_fingerprinter(pd.Index, _fingerprint_pandas)
+register_fingerprinter("plotly.basedatatypes.BaseFigure", _fingerprint_plotly)
@@ -1,5 +1,6 @@
 import ast
 import base64
+import hashlib
 import importlib
 import inspect
 import logging
@@ -304,6 +305,36 @@ def get_mimetype_for_function(func_name: str) -> str | None:
 def get_mimetype_component_type_map():
     return dict(_mimetype_to_component_type)
 
+# ------------------------------------------------------------------------------
+# Registry fingerprint
+# ------------------------------------------------------------------------------
+def _callable_name(fn: Any) -> str:
+    return f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', repr(fn))}"
+
+def registry_fingerprint() -> str:
+    """
+    Return a stable digest of every registry that influences AST transformation.
+
+    Callables are identified by their qualified name, so the digest is stable
+    across processes as long as the same renderers and hooks are registered.
+    """
+    state = (
+        sorted(_output_stream_calls.items()),
+        sorted((name, repr(hint)) for name, hint in _return_type_hints.items()),
+        sorted(
+            (_callable_name(cls), sorted(methods))
+            for cls, methods in _display_methods.items()
+        ),
+        [_callable_name(fn) for fn in _display_detectors],
+        sorted((name, sorted(info.items())) for name, info in _return_renderers.items()),
+        sorted((name, _callable_name(fn)) for name, fn in _display_renderers.items()),
+        sorted(
+            (name, _callable_name(fn)) for name, fn in _display_dependency_resolvers.items()
+        ),
+        sorted((k, v or "") for k, v in _mimetype_to_component_type.items()),
+    )
+    return hashlib.sha256(repr(state).encode("utf-8")).hexdigest()
+
 # ------------------------------------------------------------------------------
 # Plotly Submodule Discovery
 # ------------------------------------------------------------------------------
@@ -0,0 +1,140 @@
+import operator
+from abc import ABC, abstractmethod
+
+
+class ValueProxy(ABC):
+    """
+    Mixin forwarding Python's operator protocol to a wrapped value.
+
+    Subclasses define `_read()`, which returns the wrapped value, and declare their
+    own `__slots__`. Arithmetic, comparisons, truthiness, containers and numeric
+    conversions all act on the wrapped value, so wrapped values can be used
+    directly instead of being unwrapped through `.value`. Wrapped operands on the
+    other side of an operator are unwrapped too.
+
+    Equality is always forwarded, so e.g. a wrapped DataFrame compares element-wise.
+    Hashing is forwarded only for hashable values; proxies of unhashable values
+    such as lists, dicts or DataFrames hash by identity, so they remain usable as
+    set members and dict keys.
+    """
+
+    __slots__ = ()
+
+    # make numpy and pandas defer to the reflected operators below instead of
+    # treating the proxy as an opaque object
+    __array_ufunc__ = None
+
+    @abstractmethod
+    def _read(self):
+        """Return the wrapped value."""
+
+    def __bool__(self):
+        return bool(self._read())
+
+    def __hash__(self):
+        value_hash = _hash_or_none(self._read())
+        return object.__hash__(self) if value_hash is None else value_hash
+
+    def __len__(self):
+        return len(self._read())
+
+    def __iter__(self):
+        return iter(self._read())
+
+    def __contains__(self, item):
+        return _unwrap(item) in self._read()
+
+    def __getitem__(self, key):
+        return self._read()[_unwrap(key)]
+
+    def __str__(self):
+        return str(self._read())
+
+    def __format__(self, fmt):
+        return format(self._read(), fmt)
+
+    def __int__(self):
+        return int(self._read())
+
+    def __float__(self):
+        return float(self._read())
+
+    def __complex__(self):
+        return complex(self._read())
+
+    def __index__(self):
+        return operator.index(self._read())
+
+    def __round__(self, ndigits=None):
+        return round(self._read(), ndigits)
+
+
+def _hash_or_none(value):
+    try:
+        return hash(value)
+    except TypeError:
+        return None
+
+
+def _unwrap(value):
+    return value._read() if isinstance(value, ValueProxy) else value
+
+
+def _forward(op):
+    def method(self, other):
+        return op(self._read(), _unwrap(other))
+    return method
+
+
+def _reflected(op):
+    def method(self, other):
+        return op(_unwrap(other), self._read())
+    return method
+
+
+def _unary(op):
+    def method(self):
+        return op(self._read())
+    return method
+
+
+_BINARY_OPERATORS = {
+    "add": operator.add,
+    "sub": operator.sub,
+    "mul": operator.mul,
+    "matmul": operator.matmul,
+    "truediv": operator.truediv,
+    "floordiv": operator.floordiv,
+    "mod": operator.mod,
+    "divmod": divmod,
+    "pow": operator.pow,
+    "lshift": operator.lshift,
+    "rshift": operator.rshift,
+    "and": operator.and_,
+    "xor": operator.xor,
+    "or": operator.or_,
+}
+
+_COMPARISONS = {
+    "__eq__": operator.eq,
+    "__ne__": operator.ne,
+    "__lt__": operator.lt,
+    "__le__": operator.le,
+    "__gt__": operator.gt,
+    "__ge__": operator.ge,
+}
+
+_UNARY_OPERATORS = {
+    "__neg__": operator.neg,
+    "__pos__": operator.pos,
+    "__abs__": operator.abs,
+    "__invert__": operator.invert,
+}
+
+for _name, _op in _BINARY_OPERATORS.items():
+    setattr(ValueProxy, f"__{_name}__", _forward(_op))
+    setattr(ValueProxy, f"__r{_name}__", _reflected(_op))
+for _name, _op in _COMPARISONS.items():
+    setattr(ValueProxy, _name, _forward(_op))
+for _name, _op in _UNARY_OPERATORS.items():
+    setattr(ValueProxy, _name, _unary(_op))
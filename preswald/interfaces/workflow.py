@@ -1,21 +1,31 @@
+import asyncio
+import contextlib
+import contextvars
+import copy
 import hashlib
 import inspect
+import itertools
 import logging
-import pickle
+import marshal
+import threading
 import time
 import uuid
 from collections.abc import Callable
-from dataclasses import dataclass, field
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from enum import Enum
 from functools import wraps
+from types import FunctionType
 from typing import Any, Optional
 
 import networkx as nx
 import plotly.graph_objects as go
 
-from preswald.utils import get_user_code_callsite
+from preswald.utils import IS_PYODIDE, get_user_code_callsite
 from preswald.interfaces.component_return import ComponentReturn
+from preswald.interfaces.dependency_tracker import pop_context, push_context
+from preswald.interfaces.fingerprint import UnfingerprintableError, fingerprint
 from preswald.interfaces.tracked_value import TrackedValue
 from preswald.interfaces.render.error_registry import register_error
 
@@ -23,6 +33,122 @@ from preswald.interfaces.render.error_registry import register_error
 logger = logging.getLogger(__name__)
 
 
+class WorkflowCancelledError(Exception):
+    """Raised at an atom boundary when the caller asked to abandon an in-flight execution."""
+
+
+class AtomTimeoutError(TimeoutError):
+    """An atom attempt exceeded its timeout."""
+
+
+_timeout_pool: ThreadPoolExecutor | None = None
+
+
+def _timeout_executor() -> ThreadPoolExecutor:
+    """Threads for synchronous atoms with a timeout that would otherwise run inline."""
+    global _timeout_pool
+    if _timeout_pool is None:
+        _timeout_pool = ThreadPoolExecutor(thread_name_prefix="preswald-timed-atom")
+    return _timeout_pool
+
+
+def _function_rebinder(original: dict[str, Any], namespace: dict[str, Any]) -> Callable[[Any], Any]:
+    """
+    Return a function mapping functions whose globals are `original` to copies bound
+    to `namespace`. Other values are returned unchanged, and each function is copied
+    only once.
+    """
+    rebound: dict[int, FunctionType] = {}
+
+    def rebind(func):
+        if not isinstance(func, FunctionType) or func.__globals__ is not original:
+            return func
+        if id(func) not in rebound:
+            new_func = FunctionType(func.__code__, namespace, func.__name__, func.__defaults__, func.__closure__)
+            new_func.__kwdefaults__ = func.__kwdefaults__
+            new_func.__dict__.update(func.__dict__)
+            new_func.__qualname__ = func.__qualname__
+            rebound[id(func)] = new_func
+        return rebound[id(func)]
+
+    return rebind
+
+
+_thread_loops = threading.local()
+_async_pool: ThreadPoolExecutor | None = None
+
+
+def _thread_loop() -> asyncio.AbstractEventLoop:
+    """This thread's event loop for running workflow coroutines, created on first use."""
+    loop = getattr(_thread_loops, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _thread_loops.loop = loop
+    return loop
+
+
+def _run_on_thread_loop(coro):
+    return _thread_loop().run_until_complete(coro)
+
+
+def _async_executor() -> ThreadPoolExecutor:
+    """Threads with loops of their own for coroutines started under a running loop."""
+    global _async_pool
+    if _async_pool is None:
+        _async_pool = ThreadPoolExecutor(thread_name_prefix="preswald-async")
+    return _async_pool
+
+
+def _run_coroutine(coro):
+    """
+    Run a coroutine to completion from synchronous workflow code.
+
+    Scripts normally execute on a worker thread without an event loop, so the
+    coroutine runs on that thread's own loop, which is kept and reused by later
+    calls instead of creating and tearing down a loop per execution. If a loop is
+    already running on this thread (inline backend), the coroutine runs on a
+    pooled helper thread's loop instead, since the loop cannot be re-entered.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        loop_running = False
+    else:
+        loop_running = True
+
+    if not loop_running:
+        return _run_on_thread_loop(coro)
+
+    return _async_executor().submit(contextvars.copy_context().run, _run_on_thread_loop, coro).result()
+
+
+# Longest stretch a retry backoff sleeps without checking `should_cancel`
+_CANCEL_POLL_INTERVAL = 0.05
+
+
+# Input hashes of atoms whose inputs cannot be fingerprinted start with this; such
+# atoms always recompute and their results never reach the result stores
+UNCACHEABLE_PREFIX = "uncacheable:"
+
+# (atom name, source hash) of atoms that appended components to a layout in any
+# session, so a fresh session knows not to claim their keys in the shared stores
+_rendering_sources: set[tuple[str, str]] = set()
+
+# Process-wide source of version tokens for workflow variables (see `WorkflowContext`)
+_version_counter = itertools.count(1)
+
+
+def _source_hash(func: Callable) -> str:
+    """Hash of a function's compiled code, so cached results are dropped when an atom's source changes."""
+    code = getattr(inspect.unwrap(func), "__code__", None)
+    if code is None:
+        return ""
+    try:
+        return hashlib.sha256(marshal.dumps(code)).hexdigest()
+    except ValueError:
+        return ""
+
+
 class AtomContext:
     def __init__(self, workflow, atom_name):
         self.workflow = workflow
@@ -88,33 +214,62 @@ class RetryPolicy:
 
 
 class AtomCache:
-    """Manages caching of atom results and determines when recomputation is needed."""
+    """
+    Manages caching of atom results and determines when recomputation is needed.
 
-    def __init__(self):
+    Results survive across `Workflow.execute` calls, so a rerun only recomputes
+    atoms whose input hash changed or that were forced. Hits and misses are
+    counted per atom.
+
+    Optional result stores (e.g. a cache shared between sessions, or on disk) are
+    consulted, in order, when an atom misses the in-memory cache. Stores provide
+    `get(key) -> (found, value)` and `put(key, value, compute_time)`, keyed by input
+    hash, and may provide `release(key)` to learn that a missed key will not be put.
+    """
+
+    def __init__(self, stores: list | None = None):
         self.cache: dict[str, AtomResult] = {}
         self.hash_cache: dict[str, str] = {}
+        self.hits: dict[str, int] = {}
+        self.misses: dict[str, int] = {}
+        self.stores = list(stores or [])
 
-    def compute_input_hash(self, atom_name: str, kwargs: dict[str, Any]) -> str:
+    def compute_input_hash(
+        self,
+        atom_name: str,
+        kwargs: dict[str, Any],
+        source_hash: str = "",
+        versions: dict[str, Any] | None = None,
+    ) -> str:
         """
-        Generate a stable hash from the atom name, its parameters,
+        Generate a stable hash from the atom name, the atom's source, its parameters,
         and hashes of dependencies to detect when recomputation is needed.
+
+        Parameters with a token in `versions` are fingerprinted once per token (see
+        `fingerprint`). If a parameter cannot be fingerprinted, a unique hash starting
+        with `UNCACHEABLE_PREFIX` is returned, so the atom always recomputes.
         """
-        hash_items = [
-            atom_name,
-            sorted([(k, self._hash_value(v)) for k, v in kwargs.items()]),
-        ]
-        hash_str = str(hash_items).encode("utf-8")
+        versions = versions or {}
+        try:
+            hashed = sorted([(k, self._hash_value(v, versions.get(k))) for k, v in kwargs.items()])
+        except UnfingerprintableError as e:
+            logger.info(f"[DAG] Not caching {atom_name=}: {e}")
+            return f"{UNCACHEABLE_PREFIX}{uuid.uuid4().hex}"
+
+        hash_str = str([atom_name, source_hash, hashed]).encode("utf-8")
         return hashlib.sha256(hash_str).hexdigest()
 
-    def _hash_value(self, value: Any) -> str:
+    def _hash_value(self, value: Any, version: Any = None) -> str:
         """
-        Create a hash for the input value. Pickle it when possible,
-        fallback to using the object id for non-picklable objects.
+        Create a hash for the input value using type-specialized fingerprints
+        (see `preswald.interfaces.fingerprint`).
         """
-        try:
-            return hashlib.sha256(pickle.dumps(value)).hexdigest()
-        except Exception:
-            return str(id(value))
+        return fingerprint(value, version)
+
+    @staticmethod
+    def is_cacheable(input_hash: str | None) -> bool:
+        """Whether results for `input_hash` may be looked up in or offered to the result stores."""
+        return bool(input_hash) and not input_hash.startswith(UNCACHEABLE_PREFIX)
 
     def should_recompute(self, atom_name: str, input_hash: str) -> bool:
         """Return True if the input hash has changed since last execution."""
@@ -122,12 +277,69 @@ class AtomCache:
             return True
         return self.cache[atom_name].input_hash != input_hash
 
+    def record(self, atom_name: str, hit: bool):
+        counter = self.hits if hit else self.misses
+        counter[atom_name] = counter.get(atom_name, 0) + 1
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Per-atom cache hit and miss counts."""
+        return {
+            atom_name: {"hits": self.hits.get(atom_name, 0), "misses": self.misses.get(atom_name, 0)}
+            for atom_name in self.hits.keys() | self.misses.keys()
+        }
+
+    def load(self, atom_name: str, input_hash: str) -> AtomResult | None:
+        """Look up a result for `input_hash` in the result stores, caching it in memory on a hit."""
+        if not self.is_cacheable(input_hash):
+            return None
+        for i, store in enumerate(self.stores):
+            found, value = store.get(input_hash)
+            if found:
+                # backfill the faster stores consulted before this one
+                for earlier in self.stores[:i]:
+                    earlier.put(input_hash, value)
+                result = AtomResult(status=AtomStatus.COMPLETED, value=value, input_hash=input_hash)
+                self.cache[atom_name] = result
+                return result
+        return None
+
+    def release(self, input_hash: str):
+        """Tell the result stores that a missed key was computed without being persisted."""
+        if not self.is_cacheable(input_hash):
+            return
+        for store in self.stores:
+            release = getattr(store, "release", None)
+            if release is not None:
+                release(input_hash)
+
+    def persist(self, result: AtomResult):
+        """Offer a completed result to the result stores."""
+        if not self.is_cacheable(result.input_hash):
+            return
+        for store in self.stores:
+            try:
+                store.put(result.input_hash, result.value, compute_time=result.execution_time)
+            except Exception as e:
+                logger.warning(f"[DAG] Could not persist result to {type(store).__name__}: {e}")
+
+    def invalidate(self, atom_name: str):
+        self.cache.pop(atom_name, None)
+
+    def clear(self):
+        self.cache.clear()
+        self.hash_cache.clear()
+        self.hits.clear()
+        self.misses.clear()
+
 
 @dataclass
 class Atom:
     """
     Represents a cell/atom in the workflow DAG, with a callable,
     dependency list, and optional retry policy.
+
+    Atoms defined with `async def` are awaited, and independent coroutine atoms
+    are awaited concurrently.
     """
 
     name: str
@@ -139,6 +351,9 @@ class Atom:
     callsite_metadata: dict[str, Any] = field(default_factory=dict)
 
     force_recompute: bool = False  # Flag to force recomputation regardless of cache
+    parallel_safe: bool = True  # False keeps the atom off the parallel executor
+    timeout: float | None = None  # Seconds an attempt may take before the atom fails
+    side_effects: bool = False  # True if the atom mutates its inputs in place
 
     def __post_init__(self):
         # Extract function signature to understand inputs
@@ -150,74 +365,140 @@ class Atom:
         # Store the original function
         self.original_func = self.func
 
-        # Create the wrapped function
-        @wraps(self.original_func)
-        def wrapped_func(*args, **kwargs):
-            start_time = time.time()
-            try:
-                result = self.original_func(*args, **kwargs)
-                logger.debug(f"Atom {self.name} completed successfully")
-                return result
-            except Exception as e:
-                logger.error(
-                    f"Atom {self.name} failed with error: {e!s}", exc_info=True
-                )
+        self.is_async = inspect.iscoroutinefunction(self.original_func)
+        self.source_hash = _source_hash(self.original_func)
+        self.func = self._wrap()
+
+    def _wrap(self) -> Callable:
+        """Wrap the original function with timing logs and error reporting."""
+        if self.is_async:
+            @wraps(self.original_func)
+            async def wrapped_func(*args, **kwargs):
+                start_time = time.time()
+                try:
+                    result = await self.original_func(*args, **kwargs)
+                    logger.debug(f"Atom {self.name} completed successfully")
+                    return result
+                except Exception as e:
+                    self._report_error(e)
+                    raise
+                finally:
+                    execution_time = time.time() - start_time
+                    logger.debug(f"Atom {self.name} execution time: {execution_time:.2f}s")
+        else:
+            @wraps(self.original_func)
+            def wrapped_func(*args, **kwargs):
+                start_time = time.time()
+                try:
+                    result = self.original_func(*args, **kwargs)
+                    logger.debug(f"Atom {self.name} completed successfully")
+                    return result
+                except Exception as e:
+                    self._report_error(e)
+                    raise
+                finally:
+                    execution_time = time.time() - start_time
+                    logger.debug(f"Atom {self.name} execution time: {execution_time:.2f}s")
+
+        return wrapped_func
+
+    def rebind(self, func: Callable) -> "Atom":
+        """
+        Return a copy of this atom calling `func`, which must have the same code.
 
-                callsite_filename = self.callsite_metadata.get('callsite_filename')
-                callsite_lineno = self.callsite_metadata.get('callsite_lineno')
-                callsite_source = self.callsite_metadata.get('callsite_source')
-                # if callsite info was not provided, attempt to
-                # capture this info where the atom is defined
-                if not callsite_filename or not callsite_lineno:
-                    callsite_filename, callsite_lineno = get_user_code_callsite(e)
-                    self.callsite_metadata['callsite_filename'] = callsite_filename
-                    self.callsite_metadata['callsite_lineno'] = callsite_lineno
-
-
-                # if callsite source was not provided, attempt to
-                # capture this info where the atom was defined
-                #
-                # TODO(preswald): Centralize source line buffering per filename in the service layer.
-                # This would allow both the AST transformer and Atom class to fetch source snippets
-                # without reopening the file. Until then, skip this fallback to avoid redundant I/O.
-                #
-                # if not callsite_source and callsite_filename:
-                #     try:
-                #         with open(callsite_filename, 'r') as f:
-                #             lines = f.readlines()
-                #             lineno = callsite_lineno or 0
-                #             callsite_source = lines[lineno - 1].strip() if 0 < lineno <= len(lines) else ""
-                #             self.callsite_metadata['callsite_source'] = callsite_source
-
-                #     except Exception:
-                #         pass
-
-                register_error(
-                    type="runtime",
-                    filename=callsite_filename or "<unknown>",
-                    lineno=callsite_lineno or 0,
-                    source=callsite_source or "",
-                    message=str(e),
-                    atom_name=self.name,
-                )
+        The signature and source hash are reused rather than recomputed.
+        """
+        atom = copy.copy(self)
+        atom.id = str(uuid.uuid4())
+        atom.dependencies = list(self.dependencies)
+        atom.callsite_metadata = dict(self.callsite_metadata)
+        atom.original_func = func
+        atom.func = atom._wrap()
+        return atom
+
+    def _report_error(self, e: Exception):
+        """Log a failure of the atom's function and register it with its user code callsite."""
+        logger.error(
+            f"Atom {self.name} failed with error: {e!s}", exc_info=True
+        )
 
-                raise
-            finally:
-                end_time = time.time()
-                execution_time = end_time - start_time
-                logger.debug(f"Atom {self.name} execution time: {execution_time:.2f}s")
+        callsite_filename = self.callsite_metadata.get('callsite_filename')
+        callsite_lineno = self.callsite_metadata.get('callsite_lineno')
+        callsite_source = self.callsite_metadata.get('callsite_source')
+        # if callsite info was not provided, attempt to
+        # capture this info where the atom is defined
+        if not callsite_filename or not callsite_lineno:
+            callsite_filename, callsite_lineno = get_user_code_callsite(e)
+            self.callsite_metadata['callsite_filename'] = callsite_filename
+            self.callsite_metadata['callsite_lineno'] = callsite_lineno
+
+
+        # if callsite source was not provided, attempt to
+        # capture this info where the atom was defined
+        #
+        # TODO(preswald): Centralize source line buffering per filename in the service layer.
+        # This would allow both the AST transformer and Atom class to fetch source snippets
+        # without reopening the file. Until then, skip this fallback to avoid redundant I/O.
+        #
+        # if not callsite_source and callsite_filename:
+        #     try:
+        #         with open(callsite_filename, 'r') as f:
+        #             lines = f.readlines()
+        #             lineno = callsite_lineno or 0
+        #             callsite_source = lines[lineno - 1].strip() if 0 < lineno <= len(lines) else ""
+        #             self.callsite_metadata['callsite_source'] = callsite_source
+
+        #     except Exception:
+        #         pass
+
+        register_error(
+            type="runtime",
+            filename=callsite_filename or "<unknown>",
+            lineno=callsite_lineno or 0,
+            source=callsite_source or "",
+            message=str(e),
+            atom_name=self.name,
+        )
+
+
+@dataclass
+class DagSnapshot:
+    """
+    Registered atoms of a workflow, captured after a script run so that another
+    workflow running the same transformed script can restore them without
+    executing the module's top level again (see `Workflow.snapshot` and
+    `Workflow.restore`).
+
+    Attributes:
+        atoms: Registered atoms in registration order, with their dependency
+            edges, callsite metadata and options.
+        component_producers: Component ID to producing atom name.
+        rendering_atoms: Atoms that appended components to the layout.
+        execution_order: Topological order of the atoms.
+        namespace: Template module globals the atom functions are bound to. It is
+            a copy of the originating module's globals without the session's own
+            entries, so the snapshot does not keep that session alive.
+    """
 
-        # Replace the function with the wrapped version
-        self.func = wrapped_func
+    atoms: list[Atom]
+    component_producers: dict[str, str]
+    rendering_atoms: set[str]
+    execution_order: list[str]
+    namespace: dict[str, Any]
 
 
 class WorkflowContext:
     """
     Maintains the state and variables across atoms in the workflow.
+
+    Each variable carries a version token that changes whenever the variable is
+    replaced or `touch`ed after being mutated in place, so the fingerprints of
+    unchanged values can be reused instead of recomputed.
     """
 
     def __init__(self):
         self.variables: dict[str, Any] = {}
+        self.versions: dict[str, int] = {}
         self.results: dict[str, AtomResult] = {}
 
     def get_variable(self, name: str) -> Any:
@@ -225,13 +506,24 @@ class WorkflowContext:
 
     def set_variable(self, name: str, value: Any):
         if logger.isEnabledFor(logging.DEBUG):
-            logger.debug(f"[CONTEXT] Set variable for {producer_atom} = {new_value}")
+            logger.debug(f"[CONTEXT] Set variable for {name} = {value}")
         self.variables[name] = value
+        self.touch(name)
+
+    def touch(self, name: str):
+        """Record that a variable's value may have changed."""
+        self.versions[name] = next(_version_counter)
+
+    def clear(self):
+        self.variables.clear()
+        self.versions.clear()
+        self.results.clear()
 
     def set_result(self, atom_name: str, result: AtomResult):
         self.results[atom_name] = result
         if result.status == AtomStatus.COMPLETED:
             self.variables[atom_name] = result.value
+            self.touch(atom_name)
             if logger.isEnabledFor(logging.DEBUG):
                 logger.debug(f"[CONTEXT] Set result for {atom_name} = {result.value}")
 
@@ -240,18 +532,145 @@ class Workflow:
     Core workflow engine that manages registration and execution of reactive atoms.
     """
 
-    def __init__(self, service: Optional["BasePreswaldService"] = None, default_retry_policy: Optional[RetryPolicy] = None):
+    def __init__(
+        self,
+        service: Optional["BasePreswaldService"] = None,
+        default_retry_policy: Optional[RetryPolicy] = None,
+        executor: Executor | None = None,
+        result_stores: list | None = None,
+        atom_timeout: float | None = None,
+        precise_recompute: bool = False,
+    ):
         self.atoms: dict[str, Atom] = {}
         self.context = WorkflowContext()
         self.default_retry_policy = default_retry_policy or RetryPolicy()
-        self.cache = AtomCache()
+        self.cache = AtomCache(stores=result_stores)
         self._component_producers: dict[str, str] = {}  # component_id -> atom_name
-        self._current_atom: str | None = None  # currently executing atom
+        self._rendering_atoms: set[str] = set()  # atoms that appended components to the layout
         self._service = service
+
+        # When set, independent synchronous atoms run concurrently on this executor
+        self.executor = executor
+
+        # Default per-attempt timeout in seconds for atoms that don't set their own
+        self.atom_timeout = atom_timeout
+
+        # When True, reruns recompute only atoms downstream of a change and reuse
+        # upstream results, except for the inputs of atoms with side effects
+        self.precise_recompute = precise_recompute
+
+        # currently executing atom, tracked per thread/task so concurrent atoms don't clobber it
+        self._current_atom_var: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+            f"preswald_workflow_atom_{id(self)}", default=None
+        )
         self._is_rerun = False
         self._auto_atom_registry: dict[str, Callable] = {}
         self._registered_reactive_atoms: list[Callable] = []
 
+        # Adjacency index kept in sync with `Atom.dependencies`:
+        #   _dependencies[atom] -> atoms it reads from (forward)
+        #   _dependents[atom]   -> atoms that read from it (reverse)
+        self._dependencies: dict[str, set[str]] = {}
+        self._dependents: dict[str, set[str]] = {}
+
+        # Guards the atoms, the adjacency index and the cached order, which atoms
+        # running concurrently may extend through dynamic dependencies
+        self._graph_lock = threading.RLock()
+
+        # Cached topological order, None when it must be recomputed
+        self._execution_order: list[str] | None = None
+        self._order_index: dict[str, int] = {}
+
+        # Created on first use of `analyzer`, then updated as atoms register and finish
+        self._analyzer: WorkflowAnalyzer | None = None
+
+    @property
+    def _current_atom(self) -> str | None:
+        return self._current_atom_var.get()
+
+    @property
+    def analyzer(self) -> "WorkflowAnalyzer":
+        """Analyzer whose graph is kept in sync with the workflow instead of being rebuilt."""
+        if self._analyzer is None:
+            analyzer = WorkflowAnalyzer(self)
+            analyzer.build_graph()
+            self._analyzer = analyzer
+        return self._analyzer
+
+    def _set_result(self, atom_name: str, result: AtomResult):
+        self.context.set_result(atom_name, result)
+        if self._has_side_effects(atom_name) and result.status != AtomStatus.SKIPPED:
+            # the inputs were mutated in place, so their fingerprints are stale
+            for dep in self._dependencies.get(atom_name, ()):
+                self.context.touch(dep)
+        if self._analyzer is not None:
+            self._analyzer.update_atom(atom_name)
+
+    def register_atom(self, atom: Atom):
+        """Add or replace an atom in the DAG, keeping the adjacency index consistent."""
+        with self._graph_lock:
+            is_new = atom.name not in self.atoms
+            if not is_new:
+                self._unindex_atom(atom.name)
+            self.atoms[atom.name] = atom
+            self._dependencies[atom.name] = set()
+            for dep in atom.dependencies:
+                self._index_edge(atom.name, dep)
+
+            # A new atom whose inputs are all already ordered goes last, exactly where a
+            # full depth-first sort would place it. Anything else forces a re-sort.
+            order = self._execution_order
+            if order is not None and is_new and all(dep in self._order_index for dep in atom.dependencies):
+                self._order_index[atom.name] = len(order)
+                order.append(atom.name)
+            else:
+                self._invalidate_execution_order()
+
+            if self._analyzer is not None:
+                self._analyzer.update_atom(atom.name)
+
+    def add_dependency(self, atom_name: str, dep_name: str) -> bool:
+        """
+        Add a `dep_name -> atom_name` edge if it does not exist yet.
+
+        Returns:
+            bool: True if a new edge was added.
+        """
+        with self._graph_lock:
+            atom = self.atoms.get(atom_name)
+            if atom is None or dep_name in self._dependencies.get(atom_name, ()):
+                return False
+            atom.dependencies.append(dep_name)
+            self._index_edge(atom_name, dep_name)
+
+            # The cached order stays valid if the new input already runs before its consumer
+            if self._execution_order is not None:
+                dep_index = self._order_index.get(dep_name)
+                if dep_index is None or dep_index > self._order_index.get(atom_name, -1):
+                    self._invalidate_execution_order()
+
+            if self._analyzer is not None:
+                self._analyzer.update_atom(atom_name)
+            return True
+
+    def _invalidate_execution_order(self):
+        self._execution_order = None
+        self._order_index = {}
+
+    def get_dependents(self, atom_name: str) -> set[str]:
+        """Return the atoms that directly depend on `atom_name`."""
+        return self._dependents.get(atom_name, set())
+
+    def _index_edge(self, atom_name: str, dep_name: str):
+        self._dependencies.setdefault(atom_name, set()).add(dep_name)
+        self._dependents.setdefault(dep_name, set()).add(atom_name)
+
+    def _unindex_atom(self, atom_name: str):
+        for dep in self._dependencies.pop(atom_name, ()):
+            dependents = self._dependents.get(dep)
+            if dependents is not None:
+                dependents.discard(atom_name)
+
     def atom(
         self,
         dependencies: list[str] | None = None,
@@ -259,6 +678,9 @@ class Workflow:
         force_recompute: bool = False,
         name: str | None = None,
         callsite_metadata: dict[str, Any] | None = None,
+        parallel_safe: bool = True,
+        timeout: float | None = None,
+        side_effects: bool = False,
     ):
         """
         Decorator to manually register a function as a reactive atom in the workflow.
@@ -280,6 +702,16 @@ class Workflow:
                 If True, forces this atom to recompute even if inputs have not changed.
             name (str, optional):
                 Custom name for the atom. Defaults to the function's name.
+            parallel_safe (bool, optional):
+                Set to False for atoms that must not run concurrently with other atoms,
+                e.g. ones relying on global state such as matplotlib's pyplot.
+            timeout (float, optional):
+                Seconds a single attempt may run before the atom is marked FAILED.
+                Defaults to the workflow's `atom_timeout`.
+            side_effects (bool, optional):
+                Set to True for atoms that mutate their inputs in place, e.g.
+                `df["col"] = ...` or `ax.plot(...)`. Their inputs are rebuilt
+                before they rerun so the mutation is never applied twice.
         """
         def decorator(func):
             atom_name = name or func.__name__
@@ -312,8 +744,11 @@ class Workflow:
                 retry_policy=retry_policy or self.default_retry_policy,
                 force_recompute=force_recompute,
                 callsite_metadata=callsite_metadata or {},
+                parallel_safe=parallel_safe,
+                timeout=timeout,
+                side_effects=side_effects,
             )
-            self.atoms[atom_name] = atom
+            self.register_atom(atom)
 
             logger.info(f"[DAG] Atom registration complete {atom_name=} -> {atom_deps=}")
             if logger.isEnabledFor(logging.DEBUG):
@@ -324,37 +759,60 @@ class Workflow:
         return decorator
 
     def execute(
-        self, recompute_atoms: set[str] | None = None
+        self,
+        recompute_atoms: set[str] | None = None,
+        should_cancel: Callable[[], bool] | None = None,
+        timeout: float | None = None,
     ) -> dict[str, AtomResult]:
         """
         Executes atoms in the workflow, with selective recomputation.
 
+        Cached results and component producers are kept across calls. When
+        `recompute_atoms` is given, only atoms affected by them run: the given atoms
+        are forced, as are atoms with side effects and the inputs they mutate, while
+        the other affected atoms run only if their input hash changed.
+
         Args:
             recompute_atoms: Optional set of atom names to force recomputation,
                            regardless of cache status
+            should_cancel: Optional callable polled before each atom. When it returns
+                           True, execution stops and `WorkflowCancelledError` is raised.
+            timeout: Optional deadline in seconds for the whole execution. Atoms still
+                           running when it passes are marked FAILED and atoms not yet
+                           started are marked SKIPPED.
         """
         self._is_rerun = True  # prevent duplicate re-registration
         try:
-            # Clear caches and component producers, but not atoms
-            self.cache.cache.clear()
-            self._component_producers.clear()
-
-            execution_order = self._get_execution_order()
+            execution_order = list(self._get_execution_order())
             atoms_to_recompute = self._get_affected_atoms(recompute_atoms or set())
+            forced_atoms = self._get_forced_atoms(recompute_atoms or set(), atoms_to_recompute)
 
             logger.info(f"[DAG] Atoms to recompute {atoms_to_recompute=}")
 
+            if not IS_PYODIDE:
+                runnable = [
+                    atom_name for atom_name in execution_order
+                    if not (recompute_atoms and atom_name not in atoms_to_recompute)
+                ]
+                _run_coroutine(self._execute_scheduled(runnable, forced_atoms, should_cancel, timeout))
+                return self.context.results
+
+            # Pyodide has no threads to drive a scheduler loop from, so atoms run one by one
             for atom_name in execution_order:
                 if self._is_rerun and recompute_atoms and atom_name not in atoms_to_recompute:
                     logger.info(f"[DAG] Skipping atom (not affected) {atom_name=}")
                     continue
 
+                if should_cancel is not None and should_cancel():
+                    logger.info(f"[DAG] Execution cancelled before {atom_name=}")
+                    raise WorkflowCancelledError(atom_name)
+
                 atom = self.atoms[atom_name]
-                if atom_name in atoms_to_recompute:
+                if atom_name in forced_atoms:
                     atom.force_recompute = True
 
-                result = self._execute_atom(atom)
-                self.context.set_result(atom_name, result)
+                result = self._execute_atom(atom, should_cancel=should_cancel)
+                self._set_result(atom_name, result)
                 atom.force_recompute = False
 
                 if result.status == AtomStatus.FAILED:
@@ -365,11 +823,116 @@ class Workflow:
         finally:
             self._is_rerun = False
 
-    def execute_relevant_atoms(self):
+    async def _execute_scheduled(
+        self,
+        runnable: list[str],
+        forced_atoms: set[str],
+        should_cancel: Callable[[], bool] | None = None,
+        timeout: float | None = None,
+    ):
+        """
+        Execute atoms as a dataflow on an event loop.
+
+        Every runnable atom gets a task that starts as soon as its runnable
+        dependencies have finished. Retry backoff is an `asyncio.sleep` on the loop,
+        so other atoms keep progressing while a flaky atom waits to retry.
+
+        - Synchronous parallel-safe atoms run on `self.executor` when it is set, and
+          inline on the loop otherwise, which keeps serial execution order.
+        - Coroutine atoms are awaited on the loop, so independent ones overlap.
+        - Atoms that are not parallel-safe wait for all running atoms to finish and
+          then run inline, blocking the loop so nothing else starts meanwhile.
+
+        Once an atom fails, no further atoms are started. Components rendered by
+        atoms are captured and appended to the layout in execution order once
+        execution stops, so the layout never depends on scheduling.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        finished = {atom_name: asyncio.Event() for atom_name in runnable}
+        outcomes: dict[str, tuple[AtomResult, list]] = {}
+        started: set[str] = set()
+        running = 0
+        idle = asyncio.Condition()
+        halted = False
+
+        async def run(atom_name: str):
+            nonlocal running, halted
+            atom = self.atoms[atom_name]
+            try:
+                for dep in tuple(self._dependencies.get(atom_name, ())):
+                    if dep in finished:
+                        await finished[dep].wait()
+                if halted:
+                    return
+
+                if should_cancel is not None and should_cancel():
+                    logger.info(f"[DAG] Execution cancelled before {atom_name=}")
+                    raise WorkflowCancelledError(atom_name)
+
+                if not atom.parallel_safe:
+                    async with idle:
+                        await idle.wait_for(lambda: running == 0)
+
+                if atom_name in forced_atoms:
+                    atom.force_recompute = True
+
+                started.add(atom_name)
+                running += 1
+                try:
+                    outcome = await self._execute_atom_scheduled(atom, should_cancel=should_cancel, deadline=deadline)
+                finally:
+                    running -= 1
+                    async with idle:
+                        idle.notify_all()
+
+                outcomes[atom_name] = outcome
+                self._set_result(atom_name, outcome[0])
+                atom.force_recompute = False
+                if outcome[0].status == AtomStatus.FAILED:
+                    logger.error(f"[DAG] Execution halted due to failure {atom_name=}")
+                    halted = True
+            finally:
+                finished[atom_name].set()
+
+        tasks = {loop.create_task(run(atom_name)): atom_name for atom_name in runnable}
+        try:
+            if tasks:
+                done, pending = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_EXCEPTION)
+                for task in done:
+                    if task.exception() is not None:
+                        raise task.exception()
+
+                if pending:
+                    logger.warning(f"[DAG] Execution deadline of {timeout}s exceeded; {len(pending)} atoms unfinished")
+                    for task in pending:
+                        atom_name = tasks[task]
+                        if atom_name in started:
+                            error = TimeoutError(f"Execution deadline of {timeout}s exceeded while running atom '{atom_name}'")
+                            self._set_result(atom_name, AtomResult(status=AtomStatus.FAILED, error=error))
+                        else:
+                            self._set_result(atom_name, AtomResult(status=AtomStatus.SKIPPED))
+                        self.atoms[atom_name].force_recompute = False
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            if self._service:
+                for atom_name in runnable:
+                    for component in outcomes.get(atom_name, (None, ()))[1]:
+                        with self._service.active_atom(atom_name):
+                            self._service.append_component(component)
+
+    def execute_relevant_atoms(self, should_cancel: Callable[[], bool] | None = None):
         """
         Execute top-level atoms (atoms with no dependencies).
         This mimics natural script execution by triggering leaf atoms,
         allowing dependencies to propagate automatically.
+
+        Args:
+            should_cancel: Optional callable polled during retry backoff. When it
+                           returns True, `WorkflowCancelledError` is raised.
         """
         top_level_atoms = [name for name, atom in self.atoms.items() if not atom.dependencies]
         logger.debug(f"[workflow] Executing top-level atoms {top_level_atoms=}")
@@ -377,8 +940,10 @@ class Workflow:
             try:
                 logger.debug(f"[workflow] Triggering top-level atom {atom_name=}")
                 atom = self.atoms[atom_name]
-                result = self._execute_atom(atom)
-                self.context.set_result(atom_name, result)
+                result = self._execute_atom(atom, should_cancel=should_cancel)
+                self._set_result(atom_name, result)
+            except WorkflowCancelledError:
+                raise
             except Exception as e:
                 logger.warning(f"[workflow] Failed to execute top-level atom {atom_name=} {e=}", exc_info=True)
 
@@ -411,6 +976,13 @@ class Workflow:
         This forward and backward closure ensures correct propagation in the DAG, especially
         for side effecting calls like `plot()` that mutate objects used by downstream atoms.
 
+        With `precise_recompute`, the backward step is limited to atoms declared with
+        `side_effects`: only the objects they mutate are rebuilt, and every other
+        upstream value is reused from the workflow context.
+
+        Both directions are read from the adjacency index, so the cost is linear in the
+        size of the affected subgraph rather than in the size of the whole DAG.
+
         Args:
             changed_atoms (set[str]): Initial set of atoms known to have changed.
 
@@ -431,86 +1003,237 @@ class Workflow:
             affected.add(current)
 
             # forward: find all consumers
-            for atom_name, atom in self.atoms.items():
-                if current in atom.dependencies and atom_name not in queued:
+            for atom_name in self._dependents.get(current, ()):
+                if atom_name not in queued:
                     queue.append(atom_name)
                     queued.add(atom_name)
 
             # backward: re-run producers of recomputed consumers
-            for dep in self.atoms[current].dependencies:
+            if self.precise_recompute and not self._has_side_effects(current):
+                continue
+            for dep in self._dependencies.get(current, ()):
                 if dep not in queued:
                     queue.append(dep)
                     queued.add(dep)
 
         return affected
 
-    def _validate_dependencies(self):
-        """
-        Validate all atoms reference valid dependencies and no cycles exist.
+    def _get_forced_atoms(self, changed_atoms: set[str], affected_atoms: set[str]) -> set[str]:
         """
-        for atom in self.atoms.values():
-            for dep in atom.dependencies:
-                if dep not in self.atoms:
-                    raise ValueError(f"Atom '{atom.name}' depends on missing atom '{dep}'")
-
-        visited = set()
-        temp_visited = set()
-        stack = []
-
-        def has_cycle(atom_name: str) -> bool:
-            if atom_name in temp_visited:
-                logger.error(f"[DAG] Cycle detected -> {' -> '.join([*stack, atom_name])}")
-                return True
-            if atom_name in visited:
-                return False
-
-            temp_visited.add(atom_name)
-            stack.append(atom_name)
+        Atoms that must run even when their input hash is unchanged.
 
-            for dep in self.atoms[atom_name].dependencies:
-                if has_cycle(dep):
-                    return True
+        Besides the changed atoms themselves, these are the affected atoms with side
+        effects and the producers of their inputs. A cached input already carries the
+        previous mutation, and a cached side effect would not be applied to a freshly
+        produced input, so neither may be served from the cache.
+        """
+        forced = set(changed_atoms)
+        for atom_name in affected_atoms:
+            if self._has_side_effects(atom_name):
+                forced.add(atom_name)
+                forced.update(self._dependencies.get(atom_name, ()))
+        return forced
 
-            temp_visited.remove(atom_name)
-            visited.add(atom_name)
-            stack.pop()
-            return False
+    def _has_side_effects(self, atom_name: str) -> bool:
+        atom = self.atoms.get(atom_name)
+        return atom is not None and atom.side_effects
 
-        for atom_name in self.atoms:
-            if has_cycle(atom_name):
-                raise ValueError("Cycle detected in DAG")
+    def _validate_dependencies(self):
+        """
+        Validate all atoms reference valid dependencies and no cycles exist.
+        """
+        self._get_execution_order()
 
     def _get_execution_order(self) -> list[str]:
-        """Returns a valid execution order for atoms based on dependencies."""
-        self._validate_dependencies()
-
-        visited = set()
-        order = []
+        """
+        Returns a valid execution order for atoms based on dependencies.
 
-        def visit(atom_name: str):
-            if atom_name in visited:
-                return
+        The order is cached and only recomputed after an edge change that could
+        invalidate it (see `register_atom` and `add_dependency`).
+        """
+        with self._graph_lock:
+            if self._execution_order is None:
+                self._execution_order = self._compute_execution_order()
+                self._order_index = {name: i for i, name in enumerate(self._execution_order)}
+                logger.info(f"[DAG] Computed atom execution order: {self._execution_order}")
+            return self._execution_order
+
+    def _compute_execution_order(self) -> list[str]:
+        """
+        Iterative depth-first topological sort over atoms in registration order.
 
-            for dep in self.atoms[atom_name].dependencies:
-                visit(dep)
+        Produces the same order as a recursive post-order DFS, validates that every
+        dependency exists and detects cycles, without being bounded by the recursion limit.
 
-            visited.add(atom_name)
-            order.append(atom_name)
+        Raises:
+            ValueError: If an atom depends on a missing atom or the DAG has a cycle.
+        """
+        done: set[str] = set()
+        on_path: set[str] = set()
+        order: list[str] = []
 
-        for atom_name in self.atoms:
-            visit(atom_name)
+        for root in self.atoms:
+            if root in done:
+                continue
 
-        logger.info(f"[DAG] Computed atom execution order: {order}")
+            path = [root]
+            stack = [iter(self.atoms[root].dependencies)]
+            on_path.add(root)
+
+            while stack:
+                current = path[-1]
+                for dep in stack[-1]:
+                    if dep in done:
+                        continue
+                    if dep not in self.atoms:
+                        raise ValueError(f"Atom '{current}' depends on missing atom '{dep}'")
+                    if dep in on_path:
+                        logger.error(f"[DAG] Cycle detected -> {' -> '.join([*path, dep])}")
+                        raise ValueError("Cycle detected in DAG")
+                    path.append(dep)
+                    stack.append(iter(self.atoms[dep].dependencies))
+                    on_path.add(dep)
+                    break
+                else:
+                    stack.pop()
+                    path.pop()
+                    on_path.discard(current)
+                    done.add(current)
+                    order.append(current)
 
         return order
 
-    def _execute_atom(self, atom: Atom, **kwargs) -> AtomResult:
+    def _execute_atom(
+        self, atom: Atom, should_cancel: Callable[[], bool] | None = None, **kwargs
+    ) -> AtomResult:
         """
         Execute a single atom with caching and retry support.
 
         - Prepares input arguments from dependencies.
         - Skips execution if cached inputs match.
-        - Retries execution on failure based on the atom's retry policy.
+        - Retries execution on failure based on the atom's retry policy. The backoff
+          between attempts polls `should_cancel` and raises `WorkflowCancelledError`
+          once it returns True.
+
+        Coroutine atoms are run to completion on their own event loop.
+        """
+        if atom.is_async:
+            result, components = _run_coroutine(
+                self._execute_atom_scheduled(atom, capture=False, should_cancel=should_cancel)
+            )
+            return result
+
+        dependency_values, input_hash, cached_result = self._prepare_atom(atom)
+        if cached_result is not None:
+            return cached_result
+
+        token = self._current_atom_var.set(atom.name)
+        tracking_token = push_context(AtomContext(self, atom.name))
+
+        try:
+            if self._service:
+                with self._service.active_atom(atom.name), self._service.render_pass(atom.name):
+                    return self._execute_atom_inner(atom, dependency_values, input_hash, should_cancel)
+            else:
+                return self._execute_atom_inner(atom, dependency_values, input_hash, should_cancel)
+        finally:
+            pop_context(tracking_token)
+            self._current_atom_var.reset(token)
+            if self.cache.stores:
+                self.cache.release(input_hash)
+
+    async def _execute_atom_scheduled(
+        self,
+        atom: Atom,
+        capture: bool = True,
+        should_cancel: Callable[[], bool] | None = None,
+        deadline: float | None = None,
+    ) -> tuple[AtomResult, list]:
+        """
+        Execute a single atom from the scheduler loop, returning its result and the
+        components it rendered.
+
+        Like `_execute_atom`, but retry backoff yields to the loop instead of sleeping,
+        and each attempt is bounded by the atom's timeout and by what is left until
+        `deadline` (in loop time). Bounded synchronous attempts run on a thread, so
+        a blocking atom cannot keep the scheduler from enforcing the deadline. A
+        timed out attempt fails the atom without retrying, since an abandoned
+        synchronous attempt may still be running on its thread.
+        """
+        dependency_values, input_hash, cached_result = self._prepare_atom(atom)
+        if cached_result is not None:
+            return cached_result, []
+
+        components: list = []
+        timeout = atom.timeout if atom.timeout is not None else self.atom_timeout
+        token = self._current_atom_var.set(atom.name)
+        tracking_token = push_context(AtomContext(self, atom.name))
+
+        try:
+            with contextlib.ExitStack() as stack:
+                if self._service:
+                    stack.enter_context(self._service.active_atom(atom.name))
+                    stack.enter_context(self._service.render_pass(atom.name))
+                    if capture:
+                        components = stack.enter_context(self._service.capture_components())
+
+                attempts = 0
+                start_time = time.time()
+                args = self._atom_args(atom, dependency_values)
+
+                while True:
+                    attempts += 1
+                    attempt_timeout = timeout
+                    if deadline is not None:
+                        remaining = max(deadline - asyncio.get_running_loop().time(), 0.0)
+                        attempt_timeout = remaining if timeout is None else min(timeout, remaining)
+                    try:
+                        result = await self._attempt_atom(atom, args, attempt_timeout)
+                        return self._completed_result(atom, result, attempts, start_time, input_hash), components
+                    except AtomTimeoutError as e:
+                        atom._report_error(e)
+                        return self._failed_result(e, attempts, start_time, input_hash), components
+                    except Exception as e:
+                        delay = self._retry_delay(atom, attempts, e)
+                        if delay is None:
+                            return self._failed_result(e, attempts, start_time, input_hash), components
+                        await self._backoff_async(atom, delay, should_cancel)
+        finally:
+            pop_context(tracking_token)
+            self._current_atom_var.reset(token)
+            if self.cache.stores:
+                self.cache.release(input_hash)
+
+    async def _attempt_atom(self, atom: Atom, args: list[Any], timeout: float | None) -> Any:
+        """Make one call of an atom's function on the appropriate executor, bounded by `timeout`."""
+        if atom.is_async:
+            call = atom.func(*args)
+        elif atom.parallel_safe and self.executor is not None:
+            call = asyncio.get_running_loop().run_in_executor(
+                self.executor, contextvars.copy_context().run, atom.func, *args
+            )
+        elif timeout is not None:
+            # inline calls cannot be interrupted, so timed atoms get a thread of their own
+            call = asyncio.get_running_loop().run_in_executor(
+                _timeout_executor(), contextvars.copy_context().run, atom.func, *args
+            )
+        else:
+            return atom.func(*args)
+
+        if timeout is None:
+            return await call
+        try:
+            return await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            raise AtomTimeoutError(f"Atom '{atom.name}' timed out after {timeout}s") from None
+
+    def _prepare_atom(self, atom: Atom) -> tuple[dict[str, Any], str, AtomResult | None]:
+        """
+        Collect an atom's dependency values and input hash.
+
+        Returns:
+            The dependency values, the input hash and, when the atom can be skipped,
+            its cached result (None otherwise).
         """
         dependency_values = {
             dep: (
@@ -522,89 +1245,185 @@ class Workflow:
             if dep in self.context.variables
         }
 
-        input_hash = self.cache.compute_input_hash(atom.name, dependency_values)
+        input_hash = self.cache.compute_input_hash(
+            atom.name, dependency_values, atom.source_hash, versions=self.context.versions
+        )
         if not atom.force_recompute and not self.cache.should_recompute(atom.name, input_hash):
-            cached_result = self.cache.cache[atom.name]
-            cached_result.status = AtomStatus.SKIPPED
-            return cached_result
             logger.info(f"[DAG] Using cached result {atom.name=}")
-
-        self._current_atom = atom.name
-
-        try:
-            if self._service:
-                with self._service.active_atom(atom.name):
-                    return self._execute_atom_inner(atom, dependency_values, input_hash)
-            else:
-                return self._execute_atom_inner(atom, dependency_values, input_hash)
-        finally:
-            self._current_atom = None
-
-    def _execute_atom_inner(self, atom: Atom, dependency_values: dict[str, Any], input_hash: str) -> AtomResult:
+            self.cache.record(atom.name, hit=True)
+            # a copy, so the cached entry itself stays COMPLETED
+            cached_result = replace(self.cache.cache[atom.name], status=AtomStatus.SKIPPED)
+            return dependency_values, input_hash, cached_result
+
+        if not atom.force_recompute and self._is_persistable(atom.name):
+            stored_result = self.cache.load(atom.name, input_hash)
+            if stored_result is not None:
+                logger.info(f"[DAG] Using stored result {atom.name=}")
+                self.cache.record(atom.name, hit=True)
+                return dependency_values, input_hash, stored_result
+
+        self.cache.record(atom.name, hit=False)
+        return dependency_values, input_hash, None
+
+    def _execute_atom_inner(
+        self,
+        atom: Atom,
+        dependency_values: dict[str, Any],
+        input_hash: str,
+        should_cancel: Callable[[], bool] | None = None,
+    ) -> AtomResult:
         """Actual retry-wrapped execution of atom logic."""
         attempts = 0
         start_time = time.time()
+        args = self._atom_args(atom, dependency_values)
 
         while True:
             attempts += 1
             try:
+                result = atom.func(*args)
+                return self._completed_result(atom, result, attempts, start_time, input_hash)
+            except Exception as e:
+                delay = self._retry_delay(atom, attempts, e)
+                if delay is None:
+                    return self._failed_result(e, attempts, start_time, input_hash)
+                self._backoff(atom, delay, should_cancel)
+
+    def _atom_args(self, atom: Atom, dependency_values: dict[str, Any]) -> list[Any]:
+        """Positional arguments for an atom, in dependency order."""
+        args = []
+        missing_args = []
+
+        for atom_dep in atom.dependencies:
+            if atom_dep in dependency_values:
+                args.append(dependency_values[atom_dep])
+            else:
+                missing_args.append(atom_dep)
 
-                args = []
-                missing_args = []
+        if missing_args:
+            logger.warning(f"[DAG] Atom {atom.name} missing input arguments {missing_args=}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"[DAG] Available dependency values {dependency_values=}")
 
-                for atom_dep in atom.dependencies:
-                    if atom_dep in dependency_values:
-                        args.append(dependency_values[atom_dep])
-                    else:
-                        missing_args.append(atom_dep)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[DAG] Executing atom {atom.name=} {args=}")
+
+        return args
+
+    def _completed_result(
+        self, atom: Atom, result: Any, attempts: int, start_time: float, input_hash: str
+    ) -> AtomResult:
+        """Record producers of returned components and cache the successful result."""
+        if self._service:
+            if isinstance(result, ComponentReturn):
+                logger.info('[DEBUG] - register_component_producer from workflow _execute_inner')
+                self.register_component_producer(result.component_id, atom.name)
+            elif isinstance(result, tuple):
+                for item in result:
+                    if isinstance(item, ComponentReturn):
+                        logger.info('[DEBUG] - register_component_producer from workflow _execute_inner. result is tuple.')
+                        self.register_component_producer(item.component_id, atom.name)
+
+        end_time = time.time()
+        atom_result = AtomResult(
+            status=AtomStatus.COMPLETED,
+            value=result,
+            attempts=attempts,
+            start_time=start_time,
+            end_time=end_time,
+            input_hash=input_hash,
+        )
 
-                if missing_args:
-                    logger.warning(f"[DAG] Atom {atom.name} missing input arguments {missing_args=}")
-                    if logger.isEnabledFor(logging.DEBUG):
-                        logger.debug(f"[DAG] Available dependency values {dependency_values=}")
+        self.cache.cache[atom.name] = atom_result
+        if self.cache.stores and self._is_persistable(atom.name, result):
+            self.cache.persist(atom_result)
+        return atom_result
 
-                if logger.isEnabledFor(logging.DEBUG):
-                    logger.debug(f"[DAG] Executing atom {atom.name=} {args=}")
+    def has_failures(self) -> bool:
+        """Whether any atom's latest result is FAILED."""
+        return any(result.status == AtomStatus.FAILED for result in self.context.results.values())
 
-                result = atom.func(*args)
+    def mark_rendered(self, atom_name: str):
+        """Record that an atom appends components to the layout."""
+        self._rendering_atoms.add(atom_name)
+        atom = self.atoms.get(atom_name)
+        if atom is not None:
+            _rendering_sources.add((atom_name, atom.source_hash))
 
-                if self._service:
-                    if isinstance(result, ComponentReturn):
-                        logger.info('[DEBUG] - register_component_producer from workflow _execute_inner')
-                        self.register_component_producer(result.component_id, atom.name)
-                    elif isinstance(result, tuple):
-                        for item in result:
-                            if isinstance(item, ComponentReturn):
-                                logger.info('[DEBUG] - register_component_producer from workflow _execute_inner. result is tuple.')
-                                self.register_component_producer(item.component_id, atom.name)
-
-                end_time = time.time()
-                atom_result = AtomResult(
-                    status=AtomStatus.COMPLETED,
-                    value=result,
-                    attempts=attempts,
-                    start_time=start_time,
-                    end_time=end_time,
-                    input_hash=input_hash,
-                )
+    def _is_persistable(self, atom_name: str, value: Any = None) -> bool:
+        """
+        Whether an atom's result may be served from the result stores.
 
-                self.cache.cache[atom.name] = atom_result
-                return atom_result
-            except Exception as e:
-                current_time = time.time()
-                if atom.retry_policy.should_retry(attempts, e):
-                    delay = atom.retry_policy.get_delay(attempts)
-                    logger.warning(f"[DAG] Atom execution failed, retrying {atom.name=} {attempts=} delay={delay:.2f}")
-                    time.sleep(delay)
-                else:
-                    return AtomResult(
-                        status=AtomStatus.FAILED,
-                        error=e,
-                        attempts=attempts,
-                        start_time=start_time,
-                        end_time=current_time,
-                        input_hash=input_hash,
-                    )
+        Atoms that render components are excluded: skipping them would leave their
+        components out of a fresh layout. So are the inputs of atoms with side
+        effects, which are mutated in place and must not reach other sessions or
+        later runs through a store.
+
+        Rendering atoms are recognised by name and source across sessions, so a
+        session that has not run them yet does not claim their keys in a shared
+        store and leave other sessions waiting on a result it never stores.
+        """
+        if atom_name in self._rendering_atoms:
+            return False
+        atom = self.atoms.get(atom_name)
+        if atom is not None and (atom_name, atom.source_hash) in _rendering_sources:
+            return False
+        if any(self._has_side_effects(dependent) for dependent in self._dependents.get(atom_name, ())):
+            return False
+        if isinstance(value, ComponentReturn) or hasattr(value, "_preswald_component_type"):
+            return False
+        if isinstance(value, tuple) and any(isinstance(item, ComponentReturn) for item in value):
+            return False
+        return True
+
+    def _retry_delay(self, atom: Atom, attempts: int, error: Exception) -> float | None:
+        """Delay before retrying a failed attempt, or None if the atom should not be retried."""
+        if not atom.retry_policy.should_retry(attempts, error):
+            return None
+        delay = atom.retry_policy.get_delay(attempts)
+        logger.warning(f"[DAG] Atom execution failed, retrying {atom.name=} {attempts=} delay={delay:.2f}")
+        return delay
+
+    def _backoff(self, atom: Atom, delay: float, should_cancel: Callable[[], bool] | None):
+        """
+        Sleep before retrying an atom, in slices short enough that a cancellation
+        requested meanwhile is noticed promptly.
+
+        Raises:
+            WorkflowCancelledError: If `should_cancel` returns True during the wait.
+        """
+        deadline = time.monotonic() + delay
+        while True:
+            self._check_cancelled(atom, should_cancel)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, _CANCEL_POLL_INTERVAL))
+
+    async def _backoff_async(self, atom: Atom, delay: float, should_cancel: Callable[[], bool] | None):
+        """Like `_backoff`, but yields to the loop while waiting."""
+        deadline = time.monotonic() + delay
+        while True:
+            self._check_cancelled(atom, should_cancel)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, _CANCEL_POLL_INTERVAL))
+
+    @staticmethod
+    def _check_cancelled(atom: Atom, should_cancel: Callable[[], bool] | None):
+        if should_cancel is not None and should_cancel():
+            logger.info(f"[DAG] Execution cancelled while retrying {atom.name=}")
+            raise WorkflowCancelledError(atom.name)
+
+    def _failed_result(self, error: Exception, attempts: int, start_time: float, input_hash: str) -> AtomResult:
+        return AtomResult(
+            status=AtomStatus.FAILED,
+            error=error,
+            attempts=attempts,
+            start_time=start_time,
+            end_time=time.time(),
+            input_hash=input_hash,
+        )
 
     def register_dependency(self, atom_name: str, dep_name: str):
         """Dynamically register a dependency between two atoms.
@@ -621,22 +1440,93 @@ class Workflow:
             dep_name (str): The atom whose output was accessed and should be tracked as a dependency.
         """
         if atom_name in self.atoms:
-            self.atoms[atom_name].dependencies.append(dep_name)
-            logger.info(f"[DAG] Registered dependency {atom_name=} -> {dep_name=}")
+            if self.add_dependency(atom_name, dep_name):
+                logger.info(f"[DAG] Registered dependency {atom_name=} -> {dep_name=}")
         else:
             logger.warning(f"[DAG] Cannot register dependency for unknown atom {atom_name=}")
 
     def reset(self):
         """Fully reset the workflow."""
         self.atoms.clear()
-        self.context.variables.clear()
-        self.context.results.clear()
+        self.context.clear()
         self._component_producers.clear()
-        self.cache.cache.clear()
+        self._rendering_atoms.clear()
+        self.cache.clear()
         self._auto_atom_registry.clear()
         self._registered_reactive_atoms.clear()
-        self._current_atom = None
+        self._dependencies.clear()
+        self._dependents.clear()
+        self._invalidate_execution_order()
         self._is_rerun = False
+        if self._analyzer is not None:
+            self._analyzer.build_graph()
+
+    def snapshot(self, namespace: dict[str, Any], session_names: tuple[str, ...] = ()) -> DagSnapshot:
+        """
+        Capture the registered DAG for restoring into other workflows.
+
+        Functions defined in `namespace` are rebound to a template copy of it, so
+        the snapshot holds neither the module globals nor this workflow.
+
+        Args:
+            namespace: Module globals the atom functions were defined in.
+            session_names: Globals bound to the running session (e.g. its widget
+                states), left out of the template. The workflow itself always is.
+        """
+        template = {
+            name: value for name, value in namespace.items()
+            if name not in session_names and value is not self
+        }
+        rebind = _function_rebinder(namespace, template)
+        for name, value in template.items():
+            template[name] = rebind(value)
+
+        with self._graph_lock:
+            return DagSnapshot(
+                atoms=[atom.rebind(rebind(atom.original_func)) for atom in self.atoms.values()],
+                component_producers=dict(self._component_producers),
+                rendering_atoms=set(self._rendering_atoms),
+                execution_order=list(self._get_execution_order()),
+                namespace=template,
+            )
+
+    def restore(self, snapshot: DagSnapshot, namespace: dict[str, Any]):
+        """
+        Replace this workflow's DAG with a snapshot.
+
+        Functions defined in the snapshot's module are rebound to `namespace`, which
+        starts as a shallow copy of the snapshot's template globals. Entries already
+        in `namespace` (e.g. `workflow`) take precedence, so atoms see this
+        workflow's session rather than the one the snapshot was taken from. Other
+        module-level values are shared with the snapshot.
+        """
+        original = snapshot.namespace
+        overrides = dict(namespace)
+        namespace.update(original)
+        namespace.update(overrides)
+
+        rebind = _function_rebinder(original, namespace)
+
+        for name, value in list(namespace.items()):
+            if name not in overrides:
+                namespace[name] = rebind(value)
+
+        self.reset()
+        with self._graph_lock:
+            for template in snapshot.atoms:
+                atom = template.rebind(rebind(template.original_func))
+                self.atoms[atom.name] = atom
+                self._dependencies[atom.name] = set()
+                for dep in atom.dependencies:
+                    self._index_edge(atom.name, dep)
+            self._component_producers.update(snapshot.component_producers)
+            self._rendering_atoms.update(snapshot.rendering_atoms)
+            self._execution_order = list(snapshot.execution_order)
+            self._order_index = {name: i for i, name in enumerate(self._execution_order)}
+        if self._analyzer is not None:
+            self._analyzer.build_graph()
+
+        logger.info(f"[DAG] Restored {len(snapshot.atoms)} atoms from snapshot")
 
     def debug_print_dag(self):
         if logger.isEnabledFor(logging.DEBUG):
@@ -650,12 +1540,16 @@ class WorkflowAnalyzer:
     """
     Provides visualization and analysis capabilities for workflow structures.
     Uses Plotly for interactive visualization and NetworkX for graph algorithms.
+
+    The analyzer returned by `Workflow.analyzer` is updated node by node as atoms
+    register and finish. Standalone analyzers rebuild their graph when it is stale.
     """
 
     def __init__(self, workflow):
         self.workflow = workflow
         self.graph = nx.DiGraph()
         self._last_analysis_time = None
+        self._lock = threading.RLock()
 
         # Define color scheme for different atom statuses
         self.status_colors = {
@@ -673,73 +1567,107 @@ class WorkflowAnalyzer:
         Constructs a NetworkX graph representation of the workflow.
         Includes rich metadata for visualization and analysis.
         """
-        self.graph.clear()
-
-        # Add nodes (atoms) with their metadata
-        for atom_name, atom in self.workflow.atoms.items():
-            result = self.workflow.context.results.get(atom_name)
-
-            # Prepare node metadata with rich information for tooltips
-            node_data = {
-                "name": atom_name,
-                "status": result.status.value if result else "not_executed",
-                "execution_time": (
-                    f"{result.execution_time:.2f}s"
-                    if result and result.execution_time
-                    else "N/A"
-                ),
-                "attempts": result.attempts if result else 0,
-                "error": str(result.error) if result and result.error else None,
-                "dependencies": list(atom.dependencies),
-                "force_recompute": atom.force_recompute,
-            }
-
-            self.graph.add_node(atom_name, **node_data)
-
-            # Add edges for dependencies
-            for dep in atom.dependencies:
-                self.graph.add_edge(dep, atom_name)
-
-        self._last_analysis_time = datetime.now()
+        with self._lock:
+            self.graph.clear()
+            for atom_name in self.workflow.atoms:
+                self._add_atom(atom_name)
+            self._last_analysis_time = datetime.now()
         return self.graph
 
+    def update_atom(self, atom_name: str):
+        """
+        Refresh a single atom's node and incoming edges.
+
+        Called by the workflow when the atom is registered, gains a dependency or
+        gets a new result, so the graph never has to be rebuilt as a whole.
+        """
+        with self._lock:
+            if self._last_analysis_time is None:
+                return  # not built yet; the first build picks the atom up
+            self._add_atom(atom_name)
+            self._last_analysis_time = datetime.now()
+
+    def nodes(self) -> list[tuple[str, dict[str, Any]]]:
+        """Return a consistent copy of every node and its metadata."""
+        if not self._is_graph_current():
+            self.build_graph()
+        with self._lock:
+            return [(node, dict(data)) for node, data in self.graph.nodes(data=True)]
+
+    def _add_atom(self, atom_name: str):
+        atom = self.workflow.atoms.get(atom_name)
+        if atom is None:
+            return
+        result = self.workflow.context.results.get(atom_name)
+
+        # Prepare node metadata with rich information for tooltips
+        node_data = {
+            "name": atom_name,
+            "status": result.status.value if result else "not_executed",
+            "execution_time": (
+                f"{result.execution_time:.2f}s"
+                if result and result.execution_time
+                else "N/A"
+            ),
+            "duration": result.execution_time if result else None,
+            "attempts": result.attempts if result else 0,
+            "error": str(result.error) if result and result.error else None,
+            "dependencies": list(atom.dependencies),
+            "force_recompute": atom.force_recompute,
+            "cache_hits": self.workflow.cache.hits.get(atom_name, 0),
+            "cache_misses": self.workflow.cache.misses.get(atom_name, 0),
+        }
+        self.graph.add_node(atom_name, **node_data)
+
+        # Add edges for dependencies, dropping ones that no longer exist
+        dependencies = set(atom.dependencies)
+        stale = [dep for dep in self.graph.predecessors(atom_name) if dep not in dependencies]
+        for dep in stale:
+            self.graph.remove_edge(dep, atom_name)
+        for dep in dependencies:
+            self.graph.add_edge(dep, atom_name)
+
     def get_critical_path(self) -> list[str]:
         """
         Identifies the critical path through the workflow - the longest dependency chain
         that must be executed sequentially.
+
+        Atoms are weighted by their last execution time, or 1s when unknown. The
+        heaviest chain ending at each atom is built from its predecessors in a single
+        pass over a topological order, so the cost is linear in the size of the graph.
         """
         if not self._is_graph_current():
             self.build_graph()
 
-        try:
-            # Find all paths and their total execution times
-            paths = []
-            for source in (n for n, d in self.graph.in_degree() if d == 0):
-                for target in (n for n, d in self.graph.out_degree() if d == 0):
-                    paths.extend(nx.all_simple_paths(self.graph, source, target))
-
-            if not paths:
+        with self._lock:
+            try:
+                order = list(nx.topological_sort(self.graph))
+            except nx.NetworkXException as e:
+                print(f"Error finding critical path: {e}")
                 return []
 
-            # Calculate path weights based on execution times
-            path_weights = []
-            for path in paths:
-                weight = sum(
-                    (
-                        float(self.graph.nodes[node]["execution_time"].rstrip("s"))
-                        if self.graph.nodes[node]["execution_time"] != "N/A"
-                        else 1.0
-                    )
-                    for node in path
-                )
-                path_weights.append((weight, path))
-
-            return max(path_weights, key=lambda x: x[0])[1]
+            # length[node]: weight of the heaviest chain ending at node, parent[node]: its previous atom
+            length: dict[str, float] = {}
+            parent: dict[str, str | None] = {}
+            for node in order:
+                previous = max(self.graph.predecessors(node), key=length.__getitem__, default=None)
+                parent[node] = previous
+                length[node] = self._weight(node) + (length[previous] if previous is not None else 0.0)
 
-        except nx.NetworkXException as e:
-            print(f"Error finding critical path: {e}")
+        if not length:
             return []
 
+        path = []
+        node = max(length, key=length.__getitem__)
+        while node is not None:
+            path.append(node)
+            node = parent[node]
+        return path[::-1]
+
+    def _weight(self, node: str) -> float:
+        duration = self.graph.nodes[node].get("duration")
+        return duration if duration else 1.0
+
     def get_parallel_groups(self) -> list[set[str]]:
         """
         Identifies groups of atoms that could potentially be executed in parallel.
@@ -748,7 +1676,8 @@ class WorkflowAnalyzer:
             self.build_graph()
 
         try:
-            return list(nx.topological_generations(self.graph))
+            with self._lock:
+                return list(nx.topological_generations(self.graph))
         except nx.NetworkXException as e:
             print(f"Error finding parallel groups: {e}")
             return []
@@ -886,6 +1815,9 @@ class WorkflowAnalyzer:
         if self._last_analysis_time is None:
             return False
 
+        if self.workflow._analyzer is self:
+            return True  # kept current by the workflow
+
         for result in self.workflow.context.results.values():
             if (
                 result.end_time
@@ -123,6 +123,7 @@ def render_once(script_path: str) -> dict:
     """
     from preswald.engine.runner import ScriptRunner
     from preswald.engine.service import PreswaldService
+    from preswald.engine.utils import to_serializable
 
     service = PreswaldService.initialize(script_path)
     service.script_path = script_path
@@ -139,7 +140,8 @@ def render_once(script_path: str) -> dict:
     service.script_runners["cli-export"] = runner
     runner.run_sync(script_path)  # ← Now sync
 
-    return service.get_rendered_components()
+    with runner.session.activate():
+        return to_serializable(service.get_rendered_components())
 
 
 def start_server(script: str | None = None, port: int = 8501):
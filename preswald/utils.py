@@ -44,6 +44,110 @@ def reactivity_explicitly_disabled(config_path: str = "preswald.toml") -> bool:
         return False
 
 
+# absolute config path -> (modification time, parsed config), see `_read_section`
+_config_files: dict[str, tuple[int, dict]] = {}
+
+
+def _read_section(config_path: str, name: str, defaults: dict) -> dict:
+    """
+    Read a section of the TOML config, filling in `defaults`.
+
+    The parsed file is kept until its modification time changes, so settings read
+    on every connection or rerun cost a `stat` rather than a TOML parse.
+    """
+    settings = dict(defaults)
+    try:
+        path = os.path.abspath(config_path)
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return settings
+    try:
+        cached = _config_files.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = _config_files[path] = (mtime, toml.load(path))
+        settings.update(cached[1].get(name, {}))
+    except Exception as e:
+        logger.warning(f"Could not load {name} config from {config_path}: {e}")
+    return settings
+
+
+CACHE_CONFIG_DEFAULTS = {
+    "disk": False,
+    "directory": ".preswald_cache",
+    "atoms": False,
+    "atoms_max_mb": 1024,
+    "atoms_min_seconds": 0.1,
+    "shared": False,
+    "shared_max_mb": 512,
+    "shared_policy": "lru",
+    "dag_snapshots": False,
+    "transforms_max_entries": 64,
+}
+
+
+def read_cache_config(config_path: str = "preswald.toml") -> dict:
+    """
+    Read the [cache] section from the TOML config, filling in defaults.
+
+    Args:
+        config_path: Path to preswald.toml
+
+    Returns:
+        dict: Cache settings, e.g. whether on-disk caching of transformed scripts
+        and of atom results is enabled and the directory it writes to, and whether
+        new sessions restore a snapshot of the registered DAG.
+    """
+    return _read_section(config_path, "cache", CACHE_CONFIG_DEFAULTS)
+
+
+EXECUTION_CONFIG_DEFAULTS = {
+    "backend": "thread",
+    "max_workers": None,
+    "parallel_atoms": False,
+    "max_atom_workers": None,
+    "atom_timeout": None,
+    "rerun_timeout": 30.0,
+    "precise_recompute": False,
+}
+
+
+def read_execution_config(config_path: str = "preswald.toml") -> dict:
+    """
+    Read the [execution] section from the TOML config, filling in defaults.
+
+    Args:
+        config_path: Path to preswald.toml
+
+    Returns:
+        dict: Execution settings, i.e. the backend used to run scripts and atoms
+        ("thread" or "inline"), the thread pool size, whether independent
+        atoms run concurrently, atom and rerun timeouts, and whether reruns
+        recompute only the atoms downstream of a change.
+    """
+    return _read_section(config_path, "execution", EXECUTION_CONFIG_DEFAULTS)
+
+
+COMPRESSION_CONFIG_DEFAULTS = {
+    "enabled": True,
+    "level": 6,
+    "min_bytes": 1024,
+}
+
+
+def read_compression_config(config_path: str = "preswald.toml") -> dict:
+    """
+    Read the [compression] section from the TOML config, filling in defaults.
+
+    Args:
+        config_path: Path to preswald.toml
+
+    Returns:
+        dict: Compression settings, i.e. whether messages to clients that ask for it
+        are zlib-compressed, the zlib level and the smallest message compressed.
+    """
+    return _read_section(config_path, "compression", COMPRESSION_CONFIG_DEFAULTS)
+
+
 def read_port_from_config(config_path: str, port: int):
     try:
         if os.path.exists(config_path):
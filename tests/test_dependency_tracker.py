@@ -0,0 +1,113 @@
+import asyncio
+import threading
+
+from preswald.interfaces.dependency_tracker import (
+    get_current_context,
+    pop_context,
+    push_context,
+    track_dependency,
+    tracking,
+)
+
+
+class RecordingWorkflow:
+    def __init__(self):
+        self.edges = []
+        self._lock = threading.Lock()
+
+    def register_dependency(self, atom_name, dep_name):
+        with self._lock:
+            self.edges.append((atom_name, dep_name))
+
+
+class Context:
+    def __init__(self, workflow, atom_name):
+        self.workflow = workflow
+        self.atom_name = atom_name
+
+
+def test_nested_contexts_restore_on_pop():
+    workflow = RecordingWorkflow()
+    outer, inner = Context(workflow, "outer"), Context(workflow, "inner")
+
+    outer_token = push_context(outer)
+    inner_token = push_context(inner)
+    assert get_current_context() is inner
+
+    pop_context(inner_token)
+    assert get_current_context() is outer
+    pop_context(outer_token)
+    assert get_current_context() is None
+
+
+def test_threads_see_only_their_own_stack():
+    workflow = RecordingWorkflow()
+    barrier = threading.Barrier(2)
+    errors = []
+
+    def run(name):
+        try:
+            outer = Context(workflow, f"{name}-outer")
+            outer_token = push_context(outer)
+            barrier.wait()  # both threads have pushed before either reads
+            assert get_current_context() is outer
+
+            inner = Context(workflow, f"{name}-inner")
+            inner_token = push_context(inner)
+            barrier.wait()
+            track_dependency(f"{name}-dep")
+            assert get_current_context() is inner
+
+            pop_context(inner_token)
+            barrier.wait()  # the other thread popping must not affect this one
+            assert get_current_context() is outer
+            pop_context(outer_token)
+            assert get_current_context() is None
+        except Exception as e:  # surfaced in the main thread below
+            errors.append(e)
+            barrier.abort()
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert sorted(workflow.edges) == [("a-inner", "a-dep"), ("b-inner", "b-dep")]
+    assert get_current_context() is None
+
+
+def test_tasks_interleaving_on_one_loop_keep_separate_stacks():
+    workflow = RecordingWorkflow()
+
+    async def run(name, delay):
+        with tracking(Context(workflow, name)) as ctx:
+            await asyncio.sleep(delay)
+            assert get_current_context() is ctx
+            track_dependency(f"{name}-dep")
+            token = push_context(Context(workflow, f"{name}-nested"))
+            await asyncio.sleep(0)
+            pop_context(token)
+            assert get_current_context() is ctx
+        assert get_current_context() is None
+
+    async def main():
+        await asyncio.gather(run("first", 0.01), run("second", 0), run("third", 0.005))
+
+    asyncio.run(main())
+
+    assert sorted(workflow.edges) == [
+        ("first", "first-dep"),
+        ("second", "second-dep"),
+        ("third", "third-dep"),
+    ]
+
+
+def test_reads_outside_an_atom_are_ignored():
+    workflow = RecordingWorkflow()
+    track_dependency("anything")
+
+    with tracking(Context(workflow, "atom")):
+        track_dependency("atom")  # reading its own value
+    assert workflow.edges == []
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+from preswald.engine.base_service import BasePreswaldService
+from preswald.engine.executor import ExecutionBackend
+from preswald.interfaces.tracked_value import TrackedValue
+from preswald.interfaces.workflow import AtomStatus
+
+
+def build_session(service, session_id, barrier):
+    """
+    A session whose `filtered` atom reads a widget through the service and a tracked
+    value, meeting the other session's atoms at `barrier` between the two reads.
+    """
+    session = service.create_session(session_id)
+    workflow = session.workflow
+    widget, filtered = f"{session_id}_widget", f"{session_id}_filtered"
+    component_id = f"{session_id}-threshold"
+    session.set_widget_states({component_id: len(session_id)})
+
+    def produce():
+        barrier.wait()
+        return TrackedValue(10, widget)
+
+    def consume(*_):
+        threshold = service.get_component_state(component_id)
+        barrier.wait()  # the other session's atom reads its widget in between
+        return TrackedValue(10, widget).value + threshold
+
+    workflow.atom(name=widget, dependencies=[])(produce)
+    workflow.atom(name=filtered, dependencies=[])(consume)
+    workflow.register_component_producer(component_id, widget)
+    return session
+
+
+def edges(workflow):
+    return {(atom_name, dep) for atom_name, deps in workflow._dependencies.items() for dep in deps}
+
+
+def assert_isolated(sessions):
+    for session in sessions:
+        session_id = session.session_id
+        results = session.workflow.context.results
+        assert results[f"{session_id}_filtered"].status == AtomStatus.COMPLETED
+        assert results[f"{session_id}_filtered"].value == 10 + len(session_id)
+        assert edges(session.workflow) == {(f"{session_id}_filtered", f"{session_id}_widget")}
+
+
+def test_sessions_interleaving_on_one_loop():
+    service = BasePreswaldService()
+    barrier = threading.Barrier(2, timeout=5)
+    sessions = [build_session(service, session_id, barrier) for session_id in ("a", "bb")]
+    backend = ExecutionBackend(backend="thread")
+
+    async def rerun(session):
+        with session.activate():
+            await backend.run(session.workflow.execute)
+
+    async def main():
+        await asyncio.gather(*(rerun(session) for session in sessions))
+
+    try:
+        asyncio.run(main())
+    finally:
+        backend.shutdown(wait=True)
+
+    assert_isolated(sessions)
+
+
+def test_sessions_interleaving_on_worker_threads():
+    service = BasePreswaldService()
+    barrier = threading.Barrier(2, timeout=5)
+    sessions = [build_session(service, session_id, barrier) for session_id in ("a", "bb")]
+    errors = []
+
+    def rerun(session):
+        try:
+            with session.activate():
+                session.workflow.execute()
+        except Exception as e:  # surfaced in the main thread below
+            errors.append(e)
+            barrier.abort()
+
+    threads = [threading.Thread(target=rerun, args=(session,)) for session in sessions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert_isolated(sessions)